@@ -24,7 +24,7 @@ def render_ig_preview(
     Render with: st.components.v1.html(html, height=height)
 
     Args:
-        image_b64: Base64-encoded image (JPEG or PNG, no data URI prefix).
+        image_b64: Base64-encoded image (JPEG, PNG or WebP, no data URI prefix).
         caption: The caption text (already chosen by language/variant).
         hashtags: Space-separated hashtag string (e.g. "#sitges #hotel").
         hotel_name: Display name for the profile header.
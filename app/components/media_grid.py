@@ -1,57 +1,44 @@
 """
 Reusable thumbnail grid component.
-Downloads Drive thumbnails server-side and embeds as base64 data URIs.
-Each thumbnail has View + Delete buttons.
+Loads precomputed WebP thumbnails (thumbnail_store) and embeds them as base64
+data URIs. Each thumbnail has View + Delete buttons.
 """
 import base64
-import io
+from typing import Optional
 
 import streamlit as st
-from PIL import Image
 
-from src.services.google_drive import get_drive_service, download_file_bytes
 from src.services.media_queries import delete_media
+from src.services.thumbnail_store import (
+    THUMB_MIME,
+    THUMB_SIZES,
+    ensure_thumbnail,
+    ensure_thumbnails,
+)
 
 
-THUMB_SIZE = 300  # px
+THUMB_SIZE = THUMB_SIZES[0]  # px — grid tiles
+PREVIEW_SIZE = THUMB_SIZES[-1]  # px — post previews
 
 
 @st.cache_data(ttl=3600)
-def _fetch_thumbnail_b64(file_id: str) -> str:
-    """Download a Drive file, resize to thumbnail, return base64 JPEG. Cached 1h."""
-    try:
-        service = get_drive_service()
-        meta = service.files().get(fileId=file_id, fields="thumbnailLink").execute()
-        link = meta.get("thumbnailLink")
-        if link:
-            link = link.replace("=s220", f"=s{THUMB_SIZE}")
-            import urllib.request
-            data = urllib.request.urlopen(link, timeout=10).read()
-            return base64.b64encode(data).decode()
-    except Exception:
-        pass
-
-    try:
-        raw = download_file_bytes(file_id)
-        img = Image.open(io.BytesIO(raw))
-        img.load()
-        if img.mode not in ("RGB", "L"):
-            img = img.convert("RGB")
-        img.thumbnail((THUMB_SIZE, THUMB_SIZE), Image.LANCZOS)
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=80)
-        return base64.b64encode(buf.getvalue()).decode()
-    except Exception:
-        return ""
+def _fetch_thumbnail_b64(file_id: str, size: int = THUMB_SIZE) -> str:
+    """Base64 WebP thumbnail from the thumbnail store. Cached 1h.
+    Media indexed before thumbnails existed are backfilled from Drive once."""
+    data = ensure_thumbnail(file_id, size)
+    return base64.b64encode(data).decode() if data else ""
 
 
 @st.cache_data(ttl=3600)
-def _fetch_thumbnails_batch(file_ids: tuple[str, ...]) -> dict[str, str]:
-    """Fetch base64 thumbnails for a batch of file IDs."""
-    result = {}
-    for fid in file_ids:
-        result[fid] = _fetch_thumbnail_b64(fid)
-    return result
+def _fetch_thumbnails_batch(
+    file_ids: tuple[str, ...],
+    stored: Optional[dict[str, Optional[dict]]] = None,
+) -> dict[str, str]:
+    """Fetch base64 thumbnails for a batch of file IDs. `stored` holds the
+    rows' thumbnails column where known. Missing ones are backfilled with one
+    batched Drive lookup for the whole page."""
+    thumbs = ensure_thumbnails(list(file_ids), THUMB_SIZE, stored)
+    return {fid: base64.b64encode(data).decode() if data else "" for fid, data in thumbs.items()}
 
 
 def render_media_grid(
@@ -74,8 +61,12 @@ def render_media_grid(
 
     # Fetch base64 thumbnails for visible items
     file_ids = tuple(m["drive_file_id"] for m in media_items if m.get("drive_file_id"))
+    stored = {
+        m["drive_file_id"]: m["thumbnails"]
+        for m in media_items if m.get("drive_file_id") and "thumbnails" in m
+    }
     with st.spinner("Loading thumbnails..."):
-        thumbs = _fetch_thumbnails_batch(file_ids)
+        thumbs = _fetch_thumbnails_batch(file_ids, stored)
 
     grid_cols = st.columns(cols)
 
@@ -92,7 +83,7 @@ def render_media_grid(
             if b64:
                 st.markdown(
                     f"""<div class="thumb-container">
-                        <img src="data:image/jpeg;base64,{b64}" alt="{name}" />
+                        <img src="data:{THUMB_MIME};base64,{b64}" alt="{name}" />
                         <span class="thumb-badge">{category}</span>
                         <span class="thumb-quality">{quality}</span>
                     </div>""",
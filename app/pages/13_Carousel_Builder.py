@@ -2,7 +2,6 @@
 View 13 — Carousel Builder (AI Lab)
 Build multi-image carousel posts for Instagram — manual or AI-assisted.
 """
-import base64
 import io
 import os
 import sys
@@ -16,8 +15,14 @@ import streamlit as st
 from PIL import Image
 
 from app.components.ui import sidebar_css, page_title
+from app.components.media_grid import (
+    PREVIEW_SIZE,
+    THUMB_MIME,
+    _fetch_thumbnail_b64,
+    _fetch_thumbnails_batch,
+)
 from src.services.media_queries import fetch_all_media, fetch_distinct_values
-from src.services.google_drive import download_file_bytes, get_drive_service
+from src.services.google_drive import download_file_bytes
 from src.services.carousel_queries import (
     save_carousel_draft,
     fetch_carousel_drafts,
@@ -45,51 +50,6 @@ def _ensure_heif():
         _heif_registered = True
 
 
-# --- Thumbnail helpers (same approach as Gallery page / media_grid.py) ---
-THUMB_SIZE = 300
-
-@st.cache_data(ttl=3600)
-def _fetch_thumbnail_b64(file_id: str) -> str:
-    """Download a Drive file, resize to thumbnail, return base64 JPEG. Cached 1h.
-    Two-tier: Drive thumbnailLink (fast) → fallback to Pillow resize."""
-    # Tier 1: Drive thumbnail API
-    try:
-        service = get_drive_service()
-        meta = service.files().get(fileId=file_id, fields="thumbnailLink").execute()
-        link = meta.get("thumbnailLink")
-        if link:
-            link = link.replace("=s220", f"=s{THUMB_SIZE}")
-            import urllib.request
-            data = urllib.request.urlopen(link, timeout=10).read()
-            return base64.b64encode(data).decode()
-    except Exception:
-        pass
-
-    # Tier 2: Download + Pillow resize (handles HEIC)
-    try:
-        _ensure_heif()
-        raw = download_file_bytes(file_id)
-        img = Image.open(io.BytesIO(raw))
-        img.load()
-        if img.mode not in ("RGB", "L"):
-            img = img.convert("RGB")
-        img.thumbnail((THUMB_SIZE, THUMB_SIZE), Image.LANCZOS)
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=80)
-        return base64.b64encode(buf.getvalue()).decode()
-    except Exception:
-        return ""
-
-
-@st.cache_data(ttl=3600)
-def _fetch_thumbnails_batch(file_ids: tuple[str, ...]) -> dict[str, str]:
-    """Fetch base64 thumbnails for a batch of file IDs."""
-    result = {}
-    for fid in file_ids:
-        result[fid] = _fetch_thumbnail_b64(fid)
-    return result
-
-
 @st.cache_data(ttl=300)
 def _download_thumb(drive_file_id: str) -> bytes:
     return download_file_bytes(drive_file_id)
@@ -106,11 +66,6 @@ def _to_jpeg_bytes(raw_bytes: bytes) -> bytes:
     return buf.getvalue()
 
 
-def _to_jpeg_b64(raw_bytes: bytes) -> str:
-    """Convert any image format (HEIC, PNG, JPEG) to JPEG base64 string."""
-    return base64.b64encode(_to_jpeg_bytes(raw_bytes)).decode()
-
-
 # ---- Page setup ----
 sidebar_css()
 page_title("Carousel Builder", "Multi-image Instagram carousel posts")
@@ -320,7 +275,7 @@ with st.expander(
                 st.session_state["cb_gallery_page"] = page_idx + 1
                 st.rerun()
 
-    # Batch-fetch thumbnails for visible page (Drive API + HEIC-safe)
+    # Batch-fetch thumbnails for visible page (precomputed WebP)
     _page_file_ids = tuple(m["drive_file_id"] for m in page_media if m.get("drive_file_id"))
     with st.spinner("Loading thumbnails..."):
         _page_thumbs = _fetch_thumbnails_batch(_page_file_ids)
@@ -342,7 +297,7 @@ with st.expander(
                 if b64:
                     border = "3px solid #ff6b35" if is_selected else "none"
                     st.markdown(
-                        f'<img src="data:image/jpeg;base64,{b64}" '
+                        f'<img src="data:{THUMB_MIME};base64,{b64}" '
                         f'style="width:120px;border-radius:6px;border:{border};" />',
                         unsafe_allow_html=True,
                     )
@@ -397,7 +352,7 @@ else:
                 b64 = _sel_thumbs.get(fid, "")
                 if b64:
                     st.markdown(
-                        f'<img src="data:image/jpeg;base64,{b64}" '
+                        f'<img src="data:{THUMB_MIME};base64,{b64}" '
                         f'style="width:100%;border-radius:6px;" />',
                         unsafe_allow_html=True,
                     )
@@ -433,7 +388,7 @@ else:
 
     from app.components.ig_preview import render_ig_preview_carousel
 
-    # Collect b64 images — convert HEIC/PNG to JPEG for preview
+    # Collect b64 images — preview-size thumbnails (HEIC already converted)
     first_m = media_by_id.get(selected_ids[0])
     if first_m and first_m.get("drive_file_id"):
         try:
@@ -441,11 +396,9 @@ else:
             for mid in selected_ids:
                 m = media_by_id.get(mid)
                 if m and m.get("drive_file_id"):
-                    try:
-                        b = _download_thumb(m["drive_file_id"])
-                        all_b64.append(_to_jpeg_b64(b))
-                    except Exception:
-                        pass
+                    b64 = _fetch_thumbnail_b64(m["drive_file_id"], PREVIEW_SIZE)
+                    if b64:
+                        all_b64.append(b64)
 
             # Build stacked multilingual caption for preview.
             # Read from BOTH widget keys AND backup keys (widget keys
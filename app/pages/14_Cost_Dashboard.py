@@ -92,6 +92,7 @@ if rows:
             "Model": r.get("model", "—"),
             "Tokens In": r.get("input_tokens") or "—",
             "Tokens Out": r.get("output_tokens") or "—",
+            "Cache Read": r.get("cache_read_tokens") or params.get("cache_read_tokens") or "—",
             "Runtime": f"{predict_time:.1f}s" if predict_time else "—",
         })
     st.dataframe(display_rows, use_container_width=True, hide_index=True)
@@ -2,8 +2,10 @@
 Upload Media — add new images/videos to the library.
 
 Uploads to Google Drive (main folder), runs Claude Vision analysis,
-and inserts into media_library. Duplicate detection: filename + file_size.
+and inserts into media_library. Duplicate detection: content MD5, then
+filename + file_size for rows indexed before hashes were recorded.
 """
+import hashlib
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -22,6 +24,7 @@ from src.services.google_drive import (
 )
 from src.services.media_indexer import process_image_bytes, process_video_bytes
 from src.services.media_queries import (
+    find_duplicate_by_md5,
     find_duplicate_by_name_size,
     find_any_with_filename,
 )
@@ -70,7 +73,7 @@ def _rename_on_collision(filename: str) -> str:
 st.markdown(
     "Select one or more files. Each file will be uploaded to Google Drive "
     "and analyzed with Claude Vision (tags, category, quality score, description). "
-    "Duplicate detection uses filename + file size."
+    "Duplicate detection compares file contents (and filename + size for older entries)."
 )
 
 uploaded = st.file_uploader(
@@ -112,13 +115,17 @@ for i, f in enumerate(uploaded, 1):
                 status.update(label=f"Skipped `{filename}` — unsupported", state="error")
                 continue
 
-            # Duplicate check
-            dup = find_duplicate_by_name_size(filename, size)
+            # Duplicate check — identical bytes first, then legacy name + size
+            dup = find_duplicate_by_md5(hashlib.md5(raw_bytes).hexdigest())
+            reason = "identical content"
+            if not dup:
+                dup = find_duplicate_by_name_size(filename, size)
+                reason = "identical file size"
             if dup:
                 analyzed = dup.get("analyzed_at") or "unknown date"
                 st.warning(
-                    f"Skipped `{filename}` — already in your library "
-                    f"(uploaded {analyzed}, identical file size)."
+                    f"Skipped `{filename}` — already in your library as "
+                    f"`{dup.get('file_name')}` (uploaded {analyzed}, {reason})."
                 )
                 summary["skipped_dup"] += 1
                 status.update(label=f"Skipped `{filename}` — duplicate", state="complete")
@@ -29,7 +29,7 @@ def _download_and_encode(drive_file_id: str) -> str:
     """Download image from Drive and return base64. Cached 5 min."""
     from src.services.google_drive import download_file_bytes
     image_bytes = download_file_bytes(drive_file_id)
-    return encode_image_bytes(image_bytes)
+    return encode_image_bytes(image_bytes, profile="captioning")
 
 
 sidebar_css()
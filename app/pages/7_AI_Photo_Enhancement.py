@@ -228,7 +228,7 @@ if enh_meta and os.path.exists(enh_meta.get("tmp_path", "")):
         if st.button("Re-analyze with Claude Vision", use_container_width=True, key="enh_reanalyze"):
             with st.spinner("Re-analyzing enhanced image..."):
                 try:
-                    enhanced_b64 = encode_image_bytes(enhanced_bytes)
+                    enhanced_b64 = encode_image_bytes(enhanced_bytes, profile="tagging")
                     vision_result = vision_reanalyze(enhanced_b64, media_type="image/jpeg")
                     st.session_state["enh_vision_result"] = vision_result
                 except Exception as e:
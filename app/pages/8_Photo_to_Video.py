@@ -283,7 +283,6 @@ with tab_video:
         with st.expander("View prompt sent to Claude"):
             from src.prompts.creative_transform import MOTION_PROMPT_SYSTEM, MOTION_PROMPT_TEMPLATE
             _preview_user = MOTION_PROMPT_TEMPLATE.format(
-                hotel_context=HOTEL_CONTEXT,
                 category=media.get("category", ""),
                 subcategory=media.get("subcategory", ""),
                 ambiance=", ".join(media.get("ambiance", [])) if isinstance(media.get("ambiance"), list) else media.get("ambiance", ""),
@@ -294,7 +293,7 @@ with tab_video:
                 creative_brief=ai_brief or "Liberté créative — propose le mouvement le plus cinématique pour cette photo",
             )
             st.markdown("**System prompt:**")
-            st.code(MOTION_PROMPT_SYSTEM, language=None)
+            st.code(f"{MOTION_PROMPT_SYSTEM}\n\nHotel context:\n{HOTEL_CONTEXT}", language=None)
             st.markdown("**User prompt:**")
             st.code(_preview_user, language=None)
             if ai_include_photo:
@@ -303,7 +302,7 @@ with tab_video:
         if st.button("Generate AI Prompt", type="primary", key="cs_gen_prompt"):
             with st.spinner("Claude is writing a cinematic motion prompt..."):
                 try:
-                    b64 = encode_image_bytes(image_bytes) if ai_include_photo else None
+                    b64 = encode_image_bytes(image_bytes, profile="scenario") if ai_include_photo else None
                     ai_result = generate_motion_prompt_ai(
                         media,
                         creative_brief=ai_brief,
@@ -578,7 +577,7 @@ with tab_scenarios:
     if st.button("Generate Scenarios", type="primary", key="cs_gen_scenarios"):
         with st.spinner("Claude is brainstorming creative scenarios..."):
             try:
-                b64 = encode_image_bytes(image_bytes) if include_photo else None
+                b64 = encode_image_bytes(image_bytes, profile="scenario") if include_photo else None
                 result = generate_scenarios(
                     media=media,
                     creative_brief=creative_brief,
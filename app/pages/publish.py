@@ -13,7 +13,7 @@ import streamlit as st
 import streamlit.components.v1 as components
 
 from app.components.ui import sidebar_css, page_title
-from app.components.media_grid import _fetch_thumbnail_b64
+from app.components.media_grid import PREVIEW_SIZE, _fetch_thumbnail_b64
 from app.components.ig_preview import render_ig_preview, render_ig_preview_carousel
 from src.services.posts_queries import fetch_posts, update_post, update_post_status
 from src.services.publisher import publish_post, _resolve_post_caption
@@ -105,7 +105,7 @@ for post in posts:
                         m = _fetch_media(mid)
                         if m.get("drive_file_id"):
                             try:
-                                images_b64.append(_fetch_thumbnail_b64(m["drive_file_id"]))
+                                images_b64.append(_fetch_thumbnail_b64(m["drive_file_id"], PREVIEW_SIZE))
                             except Exception:
                                 pass
                     if images_b64:
@@ -131,7 +131,7 @@ for post in posts:
                 else:  # feed
                     media = _fetch_media(post.get("media_id"))
                     if media.get("drive_file_id"):
-                        b64 = _fetch_thumbnail_b64(media["drive_file_id"])
+                        b64 = _fetch_thumbnail_b64(media["drive_file_id"], PREVIEW_SIZE)
                         caption_text = post.get("caption_es", "") or ""
                         hashtag_str = " ".join(f"#{h}" for h in (post.get("hashtags") or []))
                         html, height = render_ig_preview(b64, caption_text, hashtag_str)
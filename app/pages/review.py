@@ -13,7 +13,7 @@ import streamlit as st
 import streamlit.components.v1 as components
 
 from app.components.ui import sidebar_css, page_title
-from app.components.media_grid import _fetch_thumbnail_b64
+from app.components.media_grid import THUMB_MIME, _fetch_thumbnail_b64
 from app.components.ig_preview import render_ig_preview, render_ig_preview_carousel
 from src.services.posts_queries import (
     fetch_posts,
@@ -168,7 +168,7 @@ def _render_post_card(post: dict, allow_actions: bool = True):
                         try:
                             b64 = _fetch_thumbnail_b64(first_media["drive_file_id"])
                             st.markdown(
-                                f'<img src="data:image/jpeg;base64,{b64}" style="width:100%;border-radius:8px;">',
+                                f'<img src="data:{THUMB_MIME};base64,{b64}" style="width:100%;border-radius:8px;">',
                                 unsafe_allow_html=True,
                             )
                             st.caption(f"{len(media_ids)} images")
@@ -190,7 +190,7 @@ def _render_post_card(post: dict, allow_actions: bool = True):
                         try:
                             b64 = _fetch_thumbnail_b64(media["drive_file_id"])
                             st.markdown(
-                                f'<img src="data:image/jpeg;base64,{b64}" style="width:100%;border-radius:8px;">',
+                                f'<img src="data:{THUMB_MIME};base64,{b64}" style="width:100%;border-radius:8px;">',
                                 unsafe_allow_html=True,
                             )
                         except Exception:
@@ -203,7 +203,7 @@ def _render_post_card(post: dict, allow_actions: bool = True):
                     try:
                         b64 = _fetch_thumbnail_b64(media["drive_file_id"])
                         st.markdown(
-                            f'<img src="data:image/jpeg;base64,{b64}" style="width:100%;border-radius:8px;">',
+                            f'<img src="data:{THUMB_MIME};base64,{b64}" style="width:100%;border-radius:8px;">',
                             unsafe_allow_html=True,
                         )
                     except Exception:
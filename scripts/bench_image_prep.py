@@ -0,0 +1,95 @@
+"""
+Benchmark image preprocessing: legacy path (encode_image_bytes full decode +
+get_aspect_ratio) vs prepare_image (single open, JPEG draft / reduce).
+Usage:
+  python scripts/bench_image_prep.py                   # synthetic 48 MP + 12 MP JPEGs
+  python scripts/bench_image_prep.py photo1.jpg a.heic # your own files
+  python scripts/bench_image_prep.py --repeat 5
+"""
+import argparse
+import base64
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from PIL import Image
+
+from src.utils import MAX_IMAGE_DIMENSION, _ensure_heif, get_aspect_ratio, prepare_image
+
+
+def legacy_prepare(image_bytes: bytes) -> tuple[str, str]:
+    """The pre-prepare_image path: full-resolution decode, then a second open."""
+    _ensure_heif()
+    img = Image.open(io.BytesIO(image_bytes))
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    w, h = img.size
+    if max(w, h) > MAX_IMAGE_DIMENSION:
+        ratio = MAX_IMAGE_DIMENSION / max(w, h)
+        img = img.resize((int(w * ratio), int(h * ratio)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    b64 = base64.standard_b64encode(buffer.getvalue()).decode("utf-8")
+    return b64, get_aspect_ratio(image_bytes)
+
+
+def synthetic_jpeg(width: int, height: int) -> bytes:
+    """Smooth gradient + noise, so the JPEG is photo-sized rather than trivial."""
+    rng = np.random.default_rng(0)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    shape = (height, width)
+    base = np.stack([np.broadcast_to(c, shape) for c in ((x + y) / 2, y, x)], axis=-1)
+    noisy = base + rng.normal(0, 12, size=(height, width, 1)).astype(np.float32)
+    img = Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8), "RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def _time(fn, data: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image preprocessing benchmark")
+    parser.add_argument("files", nargs="*", help="Image files (default: synthetic JPEGs)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per sample (best is kept)")
+    args = parser.parse_args()
+
+    if args.files:
+        samples = [(Path(p).name, Path(p).read_bytes()) for p in args.files]
+    else:
+        print("Generating synthetic JPEGs...")
+        samples = [
+            ("synthetic 8000x6000 (48 MP)", synthetic_jpeg(8000, 6000)),
+            ("synthetic 4032x3024 (12 MP)", synthetic_jpeg(4032, 3024)),
+            ("synthetic 1600x1200", synthetic_jpeg(1600, 1200)),
+        ]
+
+    print(f"{'sample':<32} {'size':>8} {'legacy':>9} {'prepare':>9} {'speedup':>8}")
+    for name, data in samples:
+        legacy = _time(legacy_prepare, data, args.repeat)
+        new = _time(prepare_image, data, args.repeat)
+        old_b64, old_ar = legacy_prepare(data)
+        prepared = prepare_image(data)
+        assert prepared.aspect_ratio == old_ar, (prepared.aspect_ratio, old_ar)
+        print(f"{name:<32} {len(data) / 1e6:>6.1f}MB {legacy * 1000:>7.0f}ms "
+              f"{new * 1000:>7.0f}ms {legacy / new:>7.1f}x")
+        print(f"{'':<32} payload {len(old_b64) / 1e3:.0f}kB -> {len(prepared.b64) / 1e3:.0f}kB, "
+              f"orientation={prepared.orientation}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Offline evaluation of vision image sizes: re-tag a sample of analysed library
+photos at several resolutions and report tag agreement with the stored
+analysis_raw, plus upload bytes, billed input tokens and latency per size.
+Use it to pick the smallest IMAGE_PROFILES size that keeps tagging quality.
+
+The largest size (the 2048 px the library was indexed at) doubles as the noise
+floor: its agreement with analysis_raw is what a re-run at equal quality gets.
+
+Usage:
+  python scripts/eval_image_resolution.py                     # 20 photos at 512..2048 px
+  python scripts/eval_image_resolution.py --sample 50 --sizes 768,1024,1568
+  python scripts/eval_image_resolution.py --json results.json
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database import get_supabase, TABLE_MEDIA_LIBRARY
+from src.services.claude_client import get_anthropic_client
+from src.services.google_drive import download_file_bytes
+from src.services.rate_limiter import call_with_rate_limit
+from src.services.vision_analyzer import MODEL, build_image_request, parse_analysis
+from src.utils import IMAGE_PROFILES, _fit_within, prepare_image
+
+DEFAULT_SIZES = [512, 768, 1024, 1568, 2048]
+LIST_FIELDS = ("ambiance", "elements", "season")
+
+
+def fetch_sample(n: int, seed: int, pool: int = 1000) -> list[dict]:
+    """Random analysed images that have a stored analysis_raw."""
+    rows = (
+        get_supabase()
+        .table(TABLE_MEDIA_LIBRARY)
+        .select("drive_file_id, file_name, analysis_raw")
+        .eq("media_type", "image")
+        .eq("status", "analyzed")
+        .not_.is_("analysis_raw", "null")
+        .limit(pool)
+        .execute()
+        .data
+    )
+    random.Random(seed).shuffle(rows)
+    return rows[:n]
+
+
+def _jaccard(a, b) -> float:
+    a, b = set(a or []), set(b or [])
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def compare(stored: dict, analysis: dict) -> dict:
+    """Agreement of a fresh analysis with the stored one."""
+    scores = {
+        "category": float(stored.get("category") == analysis["category"]),
+        "subcategory": float(stored.get("subcategory") == analysis["subcategory"]),
+        "ig_quality_diff": abs(int(stored.get("ig_quality") or 0) - analysis["ig_quality"]),
+    }
+    for field in LIST_FIELDS:
+        scores[field] = _jaccard(stored.get(field), analysis[field])
+    return scores
+
+
+def analyze_at(image_bytes: bytes, max_dim: int, model: str) -> dict:
+    """One uncached vision call at `max_dim`. Returns analysis + cost metrics."""
+    prepared = prepare_image(image_bytes, max_dim)
+    width, height = _fit_within(prepared.width, prepared.height, max_dim)
+    client = get_anthropic_client()
+    t0 = time.perf_counter()
+    response = call_with_rate_limit(
+        client.messages.create, **build_image_request(prepared.b64, "image/jpeg", model)
+    )
+    latency = time.perf_counter() - t0
+    return {
+        "analysis": parse_analysis(response.content[0].text).model_dump(),
+        "payload_kb": len(prepared.b64) * 3 / 4 / 1024,
+        "pixels": f"{width}x{height}",
+        "input_tokens": response.usage.input_tokens,
+        "latency_s": latency,
+    }
+
+
+def summarize(results: list[dict]) -> dict:
+    keys = ("category", "subcategory", "ig_quality_diff") + LIST_FIELDS
+    summary = {k: statistics.mean(r["scores"][k] for r in results) for k in keys}
+    for k in ("payload_kb", "input_tokens", "latency_s"):
+        summary[k] = statistics.mean(r[k] for r in results)
+    summary["latency_p50"] = statistics.median(r["latency_s"] for r in results)
+    summary["n"] = len(results)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vision image-size evaluation")
+    parser.add_argument("--sample", type=int, default=20, help="Number of library photos")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated longest-side sizes in px")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--model", default=MODEL, help="Claude model")
+    parser.add_argument("--json", help="Write per-image results to this file")
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    sample = fetch_sample(args.sample, args.seed)
+    print(f"Evaluating {len(sample)} photos at {sizes} px "
+          f"({len(sample) * len(sizes)} Claude calls, model {args.model})")
+    print(f"Current profiles: {IMAGE_PROFILES}")
+
+    per_size: dict[int, list[dict]] = {size: [] for size in sizes}
+    for i, row in enumerate(sample, 1):
+        print(f"[{i}/{len(sample)}] {row['file_name']}")
+        try:
+            image_bytes = download_file_bytes(row["drive_file_id"])
+        except Exception as e:
+            print(f"  download failed: {e}")
+            continue
+        for size in sizes:
+            try:
+                result = analyze_at(image_bytes, size, args.model)
+            except Exception as e:
+                print(f"  {size}px failed: {e}")
+                continue
+            result["scores"] = compare(row["analysis_raw"], result["analysis"])
+            result["drive_file_id"] = row["drive_file_id"]
+            per_size[size].append(result)
+
+    print(f"\n{'size':>6} {'n':>3} {'cat':>5} {'subcat':>6} {'ambi':>5} {'elem':>5} "
+          f"{'season':>6} {'q±':>5} {'KB':>6} {'tokens':>6} {'lat s':>6}")
+    summaries = {}
+    for size in sizes:
+        if not per_size[size]:
+            continue
+        s = summaries[size] = summarize(per_size[size])
+        print(f"{size:>6} {s['n']:>3} {s['category']:>5.0%} {s['subcategory']:>6.0%} "
+              f"{s['ambiance']:>5.2f} {s['elements']:>5.2f} {s['season']:>6.2f} "
+              f"{s['ig_quality_diff']:>5.2f} {s['payload_kb']:>6.0f} {s['input_tokens']:>6.0f} "
+              f"{s['latency_p50']:>6.2f}")
+    print("\ncat/subcat: exact match with analysis_raw; ambi/elem/season: mean Jaccard; "
+          "q±: mean |ig_quality diff|; lat: median seconds")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(
+            {"sizes": sizes, "summary": summaries, "results": per_size}, indent=2, default=str,
+        ))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 """
 CLI for the media indexer.
 Usage:
-  python scripts/run_indexer.py                    # index all
+  python scripts/run_indexer.py                    # incremental (Drive changes since last run)
+  python scripts/run_indexer.py --full             # full Drive scan, index everything new
   python scripts/run_indexer.py --limit 5          # index first 5 files
   python scripts/run_indexer.py --dry-run          # download but don't call Claude
-  python scripts/run_indexer.py --reindex-errors   # retry failed files
+  python scripts/run_indexer.py --reindex-errors   # retry failed files (full scan)
   python scripts/run_indexer.py --folder-id XYZ    # custom folder ID
+  python scripts/run_indexer.py --workers 8 --max-rps 1.5  # more concurrency
+  python scripts/run_indexer.py --multi-scene      # pack short video scenes per request
+  python scripts/run_indexer.py --vision-batch 8   # up to 8 photos per Claude request
+  python scripts/run_indexer.py --batch-api --reindex-all  # re-tag everything via Message Batches
+  python scripts/run_indexer.py --batch-api --fake-batch   # offline batch flow (fake endpoint)
+  python scripts/run_indexer.py --backfill-thumbnails      # WebP thumbnails for older media
 """
 import argparse
 import sys
@@ -15,7 +22,16 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.services.media_indexer import run_indexer
+from src.services.media_indexer import (
+    run_indexer,
+    run_incremental_indexer,
+    run_batch_indexer,
+    backfill_thumbnails,
+    DEFAULT_WORKERS,
+    BATCH_POLL_INTERVAL,
+)
+from src.services.rate_limiter import DEFAULT_MAX_RPS
+from src.services.vision_analyzer import MAX_IMAGES_PER_REQUEST
 
 
 def main():
@@ -30,31 +46,126 @@ def main():
     )
     parser.add_argument(
         "--reindex-errors", action="store_true",
-        help="Re-process files that previously failed"
+        help="Re-process files that previously failed (implies --full)"
     )
+    parser.add_argument(
+        "--incremental", dest="full", action="store_false",
+        help="Only ingest Drive changes since the last run (default)"
+    )
+    parser.add_argument(
+        "--full", dest="full", action="store_true",
+        help="Walk the whole Drive folder instead of reading the changes feed"
+    )
+    parser.add_argument(
+        "--batch-api", action="store_true",
+        help="Analyse images via the Anthropic Message Batches API (implies --full)"
+    )
+    parser.add_argument(
+        "--reindex-all", action="store_true",
+        help="With --batch-api: re-analyse every image, e.g. after a prompt/model change"
+    )
+    parser.add_argument(
+        "--fake-batch", action="store_true",
+        help="With --batch-api: use a local fake batch endpoint (no API calls, "
+             "results kept in memory, nothing written to Supabase)"
+    )
+    parser.add_argument(
+        "--batch-poll-interval", type=float, default=BATCH_POLL_INTERVAL,
+        help=f"Seconds between batch status checks (default {BATCH_POLL_INTERVAL})"
+    )
+    parser.set_defaults(full=False)
     parser.add_argument(
         "--folder-id", type=str, default=None,
         help="Google Drive folder ID (overrides .env)"
     )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Worker threads per pipeline stage (default {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--max-rps", type=float, default=DEFAULT_MAX_RPS,
+        help=f"Max Claude requests per second (default {DEFAULT_MAX_RPS})"
+    )
+    parser.add_argument(
+        "--multi-scene", action="store_true",
+        help="Analyse several short video scenes per Claude request"
+    )
+    parser.add_argument(
+        "--vision-batch", type=int, default=1, metavar="N",
+        help=f"Analyse up to N queued photos per Claude request (e.g. {MAX_IMAGES_PER_REQUEST})"
+    )
+    parser.add_argument(
+        "--backfill-thumbnails", action="store_true",
+        help="Only build missing thumbnails for already-indexed media (no Claude calls)"
+    )
     args = parser.parse_args()
+    full = args.full or args.reindex_errors or args.batch_api
 
     print("=" * 50)
     print("  InstaHotel Media Indexer")
     print("=" * 50)
+    if args.backfill_thumbnails:
+        stats = backfill_thumbnails(limit=args.limit, workers=args.workers)
+        return 0 if stats["errors"] == 0 else 1
+    print(f"  SCAN: {'Full Drive walk' if full else 'Incremental (Drive changes feed)'}")
+    if args.batch_api:
+        print(f"  BATCH: Message Batches API{' (fake endpoint)' if args.fake_batch else ''}")
     if args.dry_run:
         print("  MODE: Dry run (no Claude calls)")
     if args.limit:
         print(f"  LIMIT: {args.limit} files")
     if args.reindex_errors:
         print("  REINDEX: Error files will be retried")
+    print(f"  WORKERS: {args.workers} per stage, max {args.max_rps} req/s")
+    if args.multi_scene:
+        print("  VIDEO: Multi-scene requests")
+    if args.vision_batch > 1:
+        print(f"  IMAGES: Up to {args.vision_batch} photos per request")
     print()
 
-    stats = run_indexer(
-        folder_id=args.folder_id,
-        limit=args.limit,
-        dry_run=args.dry_run,
-        reindex_errors=args.reindex_errors,
-    )
+    if args.batch_api:
+        base_url = state_store = writer = None
+        if args.fake_batch:
+            from src.services.fake_batch_api import MemoryMediaWriter, start_fake_batch_server
+            _, base_url = start_fake_batch_server()
+            state_store, writer = {}, MemoryMediaWriter()
+        stats = run_batch_indexer(
+            folder_id=args.folder_id,
+            limit=args.limit,
+            dry_run=args.dry_run,
+            reindex_errors=args.reindex_errors,
+            reindex_all=args.reindex_all,
+            workers=args.workers,
+            max_rps=args.max_rps,
+            multi_scene=args.multi_scene,
+            base_url=base_url,
+            poll_interval=args.batch_poll_interval,
+            state_store=state_store,
+            writer=writer,
+        )
+        if writer is not None:
+            print(f"  Fake batch: {len(writer.rows)} rows kept in memory, none written")
+    elif full:
+        stats = run_indexer(
+            folder_id=args.folder_id,
+            limit=args.limit,
+            dry_run=args.dry_run,
+            reindex_errors=args.reindex_errors,
+            workers=args.workers,
+            max_rps=args.max_rps,
+            multi_scene=args.multi_scene,
+            vision_batch=args.vision_batch,
+        )
+    else:
+        stats = run_incremental_indexer(
+            folder_id=args.folder_id,
+            limit=args.limit,
+            dry_run=args.dry_run,
+            workers=args.workers,
+            max_rps=args.max_rps,
+            multi_scene=args.multi_scene,
+            vision_batch=args.vision_batch,
+        )
 
     return 0 if stats["errors"] == 0 else 1
 
@@ -30,6 +30,7 @@ TABLE_GENERATED_MUSIC = "generated_music"
 TABLE_CAROUSEL_DRAFTS = "carousel_drafts"
 TABLE_COST_LOG = "cost_log"
 TABLE_POSTS = "posts"
+TABLE_INDEXER_STATE = "indexer_state"
 
 
 def _get_secret(key: str) -> Optional[str]:
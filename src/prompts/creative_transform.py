@@ -84,9 +84,6 @@ Maximum 150 words."""
 
 MOTION_PROMPT_TEMPLATE = """Generate a video prompt for this hotel photo.
 
-Hotel context:
-{hotel_context}
-
 Photo:
 - Category: {category}
 - Subcategory: {subcategory}
@@ -200,9 +197,6 @@ Photo:
 - Visible elements: {elements}
 - Description: {description_en}
 
-Hotel context:
-{hotel_context}
-
 {character_roster}
 
 Creative brief: {creative_brief}
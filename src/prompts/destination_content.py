@@ -12,6 +12,7 @@ NOT tourist clichés. Noucentista is mentioned naturally, never as the main subj
 
 # Import the comprehensive Sitges context from the dedicated module
 from src.prompts.sitges_context import SITGES_FULL_CONTEXT
+from src.prompts.creative_transform import HOTEL_CONTEXT
 
 DESTINATION_CONTEXT = SITGES_FULL_CONTEXT + """
 CONTENT ANGLE (for destination posts):
@@ -100,6 +101,13 @@ Format rules:
 
 Reply ONLY with a valid JSON object (no markdown, no comments)."""
 
+# Static context appended to DESTINATION_CAPTION_SYSTEM (prompt-cached, not per call)
+DESTINATION_CAPTION_CONTEXT = f"""Destination context:
+{DESTINATION_CONTEXT}
+
+Hotel context (for subtle mention):
+{HOTEL_CONTEXT}"""
+
 DESTINATION_CAPTION_TEMPLATE = """Write Instagram captions about this Sitges destination topic.
 
 Topic: {topic}
@@ -109,12 +117,6 @@ Photo context:
 - Elements: {elements}
 - Description: {description_en}
 
-Destination context:
-{destination_context}
-
-Hotel context (for subtle mention):
-{hotel_context}
-
 Editorial context:
 - Season: {season}
 - Theme: {theme}
@@ -78,7 +78,7 @@ def _get_media_and_image(slot: dict, include_image: bool = True) -> tuple[Option
     if include_image and media.get("drive_file_id"):
         try:
             raw = download_file_bytes(media["drive_file_id"])
-            image_b64 = encode_image_bytes(raw)
+            image_b64 = encode_image_bytes(raw, profile="captioning")
         except Exception:
             pass  # proceed without image
 
@@ -565,6 +565,8 @@ def batch_composite(
             }
             if drive_fid:
                 row["drive_file_id"] = drive_fid
+            if result.get("video_probe"):
+                row["video_probe"] = result["video_probe"]
             client.table(TABLE_CREATIVE_JOBS).insert(row).execute()
 
             update_calendar_creative_status(cal_id, "composite_done")
@@ -206,7 +206,7 @@ def _generate_feed_post(post_id, media, season, tone, model, include_image):
     if include_image and media.get("drive_file_id"):
         try:
             img_bytes = download_file_bytes(media["drive_file_id"])
-            image_b64 = encode_image_bytes(img_bytes)
+            image_b64 = encode_image_bytes(img_bytes, profile="captioning")
         except Exception:
             pass
 
@@ -325,7 +325,7 @@ def _generate_reel_post(post_id, media, post_type, season, tone, model):
         raise ValueError("Media has no drive_file_id")
 
     image_bytes = download_file_bytes(drive_file_id)
-    image_b64 = encode_image_bytes(image_bytes)
+    image_b64 = encode_image_bytes(image_bytes, profile="scenario")
 
     # Step 2: Generate 3 scenarios
     scenario_result = generate_scenarios(
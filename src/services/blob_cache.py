@@ -0,0 +1,219 @@
+"""
+Local on-disk cache for Drive originals, behind google_drive.download_file_bytes.
+
+Blobs are content-addressed (stored once per md5, whatever the drive_file_id)
+under `.drive_blob_cache/`; a SQLite index maps file ids to blobs and records
+the Drive `md5Checksum` / `modifiedTime` each copy was downloaded at, so a
+changed file misses. Least-recently-used blobs are evicted beyond
+`max_bytes`.
+
+Safe across threads and processes: blobs are written to a temp file and
+renamed into place, the index is SQLite in WAL mode, and a blob evicted by
+another process just reads as a miss.
+
+Set DRIVE_CACHE_DISABLED=1 to bypass it; DRIVE_CACHE_MAX_BYTES sets the size cap.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+_project_root = Path(__file__).parent.parent.parent
+CACHE_DIR = _project_root / ".drive_blob_cache"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+MAX_BLOB_BYTES = 64 * 1024 * 1024  # larger files (videos) are never cached
+
+
+class BlobCache:
+    """Content-addressed LRU cache of file bytes, keyed by Drive file id."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root or CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.root / "index.sqlite3"), timeout=30, check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " md5 TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file_id TEXT PRIMARY KEY,"
+            " md5 TEXT NOT NULL,"
+            " modified_time TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_accessed ON blobs(accessed_at)")
+        self._conn.commit()
+
+    def _blob_path(self, md5: str) -> Path:
+        return self.root / "blobs" / md5[:2] / md5
+
+    def _lookup(self, file_id: str, md5_checksum: Optional[str], modified_time: Optional[str]) -> Optional[str]:
+        """md5 of a cached blob that is valid for this file version, if any."""
+        row = self._conn.execute(
+            "SELECT md5, modified_time FROM files WHERE file_id = ?", (file_id,)
+        ).fetchone()
+        if md5_checksum:
+            if row is not None and row[0] == md5_checksum:
+                return md5_checksum
+            # Same bytes cached under another file id (copies, re-uploads)
+            blob = self._conn.execute("SELECT 1 FROM blobs WHERE md5 = ?", (md5_checksum,)).fetchone()
+            return md5_checksum if blob else None
+        if row is not None and modified_time and row[1] == modified_time:
+            return row[0]
+        return None
+
+    def get(
+        self,
+        file_id: str,
+        md5_checksum: Optional[str] = None,
+        modified_time: Optional[str] = None,
+    ) -> Optional[bytes]:
+        """Cached bytes for this file version, or None.
+
+        A copy is valid when its md5 equals `md5_checksum`; files without an
+        md5 (e.g. Google-native formats) are matched on `modified_time`.
+        """
+        with self._lock:
+            md5 = self._lookup(file_id, md5_checksum, modified_time)
+        data = None
+        if md5 is not None:
+            try:
+                data = self._blob_path(md5).read_bytes()
+            except OSError:
+                data = None  # evicted by another process
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE blobs SET accessed_at = ? WHERE md5 = ?", (time.time(), md5))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (file_id, md5, modified_time) VALUES (?, ?, ?)",
+                (file_id, md5, modified_time),
+            )
+            self._conn.commit()
+        return data
+
+    def put(
+        self,
+        file_id: str,
+        data: bytes,
+        md5_checksum: Optional[str] = None,
+        modified_time: Optional[str] = None,
+    ):
+        """Store downloaded bytes. Skipped when too large, or when they don't
+        match `md5_checksum` (the file changed mid-download)."""
+        if len(data) > MAX_BLOB_BYTES:
+            return
+        md5 = hashlib.md5(data).hexdigest()
+        if md5_checksum and md5 != md5_checksum:
+            return
+        path = self._blob_path(md5)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp, path)  # atomic — readers never see a partial blob
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (md5, size, accessed_at) VALUES (?, ?, ?)",
+                (md5, len(data), now),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (file_id, md5, modified_time) VALUES (?, ?, ?)",
+                (file_id, md5, modified_time),
+            )
+            evicted = self._evict()
+            self._conn.commit()
+        for old in evicted:
+            try:
+                self._blob_path(old).unlink()
+            except OSError:
+                pass
+
+    def _evict(self) -> list[str]:
+        """Drop least-recently-used blobs beyond max_bytes. Returns their md5s."""
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        evicted = []
+        if total <= self.max_bytes:
+            return evicted
+        for md5, size in self._conn.execute(
+            "SELECT md5, size FROM blobs ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append(md5)
+            total -= size
+        self._conn.executemany("DELETE FROM blobs WHERE md5 = ?", [(m,) for m in evicted])
+        self._conn.executemany("DELETE FROM files WHERE md5 = ?", [(m,) for m in evicted])
+        return evicted
+
+    def stats(self) -> dict:
+        """Hit/miss counters (this process) and current size."""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "blobs": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            md5s = [m for (m,) in self._conn.execute("SELECT md5 FROM blobs").fetchall()]
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+        for md5 in md5s:
+            try:
+                self._blob_path(md5).unlink()
+            except OSError:
+                pass
+
+
+# Singleton
+_blob_cache: Optional[BlobCache] = None
+_blob_cache_lock = threading.Lock()
+
+
+def get_blob_cache() -> Optional[BlobCache]:
+    """Get or create the shared cache. Returns None when disabled or unusable."""
+    global _blob_cache
+    if os.getenv("DRIVE_CACHE_DISABLED") == "1":
+        return None
+    with _blob_cache_lock:
+        if _blob_cache is None:
+            try:
+                max_bytes = int(os.getenv("DRIVE_CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES)
+                _blob_cache = BlobCache(max_bytes=max_bytes)
+            except (OSError, sqlite3.Error):
+                return None  # read-only filesystem etc. — run uncached
+        return _blob_cache
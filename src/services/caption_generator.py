@@ -6,16 +6,14 @@ import json
 import re
 from typing import Optional
 
-import anthropic
-
 from src.prompts.caption_generation import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE, VIDEO_INSTRUCTION
 from src.prompts.tone_variants import get_tone_instruction, get_tone_system_addendum
 from src.prompts.destination_content import (
     DESTINATION_CAPTION_SYSTEM,
+    DESTINATION_CAPTION_CONTEXT,
     DESTINATION_CAPTION_TEMPLATE,
-    DESTINATION_CONTEXT,
 )
-from src.prompts.creative_transform import HOTEL_CONTEXT
+from src.services.claude_client import cached_system, get_anthropic_client, token_cost, usage_tokens
 
 # Available models for AI Lab
 AVAILABLE_MODELS = {
@@ -28,17 +26,6 @@ AVAILABLE_MODELS = {
 DEFAULT_MODEL = "claude-sonnet-4-6"
 
 
-def _get_client() -> anthropic.Anthropic:
-    """Get Anthropic client, supporting st.secrets or env var."""
-    api_key = None
-    try:
-        import streamlit as st
-        api_key = st.secrets.get("ANTHROPIC_API_KEY")
-    except Exception:
-        pass
-    return anthropic.Anthropic(api_key=api_key) if api_key else anthropic.Anthropic()
-
-
 def _parse_json_response(text: str) -> dict:
     """Parse Claude's JSON response, stripping markdown fences if present."""
     text = text.strip()
@@ -48,10 +35,22 @@ def _parse_json_response(text: str) -> dict:
     return json.loads(text)
 
 
-def compute_cost(model: str, input_tokens: int, output_tokens: int) -> float:
-    """Compute cost in USD for a given model and token counts."""
+def compute_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_creation_tokens: int = 0,
+) -> float:
+    """Compute cost in USD for a given model and token counts (incl. prompt cache)."""
     info = AVAILABLE_MODELS.get(model, AVAILABLE_MODELS[DEFAULT_MODEL])
-    return (input_tokens * info["input_per_mtok"] + output_tokens * info["output_per_mtok"]) / 1_000_000
+    tokens = {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "cache_creation_tokens": cache_creation_tokens,
+    }
+    return token_cost(tokens, info["input_per_mtok"], info["output_per_mtok"])
 
 
 def build_prompt(media: dict, theme: str, season: str, cta_type: str, tone: str = "default") -> str:
@@ -92,15 +91,15 @@ def generate_captions(
     Returns dict with keys: short, storytelling, hashtags, _usage
     (_usage contains model, input_tokens, output_tokens, cost_usd)
     """
-    client = _get_client()
+    client = get_anthropic_client()
 
     prompt_text = user_prompt if user_prompt is not None else build_prompt(media, theme, season, cta_type, tone=tone)
 
-    # Build system prompt with tone addendum
-    sys_prompt = system_prompt if system_prompt is not None else SYSTEM_PROMPT
-    tone_addendum = get_tone_system_addendum(tone)
-    if tone_addendum and system_prompt is None:
-        sys_prompt = sys_prompt + "\n\n" + tone_addendum
+    # Build system prompt: static part cached, tone addendum after the breakpoint
+    if system_prompt is not None:
+        sys_blocks = cached_system(system_prompt)
+    else:
+        sys_blocks = cached_system(SYSTEM_PROMPT, get_tone_system_addendum(tone))
 
     content = []
     if include_image and image_base64:
@@ -119,7 +118,7 @@ def generate_captions(
     response = client.messages.create(
         model=model,
         max_tokens=2000,
-        system=sys_prompt,
+        system=sys_blocks,
         messages=[{"role": "user", "content": content}],
     )
 
@@ -127,20 +126,17 @@ def generate_captions(
     result = _parse_json_response(raw_text)
 
     # Attach usage metadata
-    input_tokens = response.usage.input_tokens
-    output_tokens = response.usage.output_tokens
-    cost = compute_cost(model, input_tokens, output_tokens)
+    tokens = usage_tokens(response.usage)
+    cost = compute_cost(model, **tokens)
 
     from src.services.cost_tracker import log_cost
     log_cost("claude", "generate_captions", cost, model=model,
-             input_tokens=input_tokens, output_tokens=output_tokens,
-             params={"source": "real_tokens"})
+             params={"source": "real_tokens"}, **tokens)
 
     result["_usage"] = {
         "model": model,
         "model_label": AVAILABLE_MODELS.get(model, {}).get("label", model),
-        "input_tokens": input_tokens,
-        "output_tokens": output_tokens,
+        **tokens,
         "cost_usd": cost,
     }
 
@@ -160,17 +156,15 @@ def generate_destination_captions(
     """Generate destination-focused Instagram captions via Claude API.
 
     Same return shape as generate_captions(): short, storytelling, hashtags, _usage.
-    Uses DESTINATION_CAPTION_SYSTEM + DESTINATION_CAPTION_TEMPLATE.
+    Uses DESTINATION_CAPTION_SYSTEM + DESTINATION_CAPTION_CONTEXT (cached) + DESTINATION_CAPTION_TEMPLATE.
     """
-    client = _get_client()
+    client = get_anthropic_client()
 
     prompt_text = DESTINATION_CAPTION_TEMPLATE.format(
         topic=topic or "auto — pick the best destination angle based on the photo",
         category=media.get("category", ""),
         elements=", ".join(media.get("elements", [])) if isinstance(media.get("elements"), list) else media.get("elements", ""),
         description_en=media.get("description_en", ""),
-        destination_context=DESTINATION_CONTEXT,
-        hotel_context=HOTEL_CONTEXT,
         season=season,
         theme=theme,
         tone_instruction=get_tone_instruction(tone),
@@ -184,35 +178,33 @@ def generate_destination_captions(
         })
     content.append({"type": "text", "text": prompt_text})
 
-    sys_prompt = DESTINATION_CAPTION_SYSTEM
-    tone_addendum = get_tone_system_addendum(tone)
-    if tone_addendum:
-        sys_prompt = sys_prompt + "\n\n" + tone_addendum
+    # The Sitges + hotel context (~4.5K tokens) is static: cached in the system prompt
+    sys_blocks = cached_system(
+        f"{DESTINATION_CAPTION_SYSTEM}\n\n{DESTINATION_CAPTION_CONTEXT}",
+        get_tone_system_addendum(tone),
+    )
 
     response = client.messages.create(
         model=model,
         max_tokens=2000,
-        system=sys_prompt,
+        system=sys_blocks,
         messages=[{"role": "user", "content": content}],
     )
 
     raw_text = response.content[0].text
     result = _parse_json_response(raw_text)
 
-    input_tokens = response.usage.input_tokens
-    output_tokens = response.usage.output_tokens
-    cost = compute_cost(model, input_tokens, output_tokens)
+    tokens = usage_tokens(response.usage)
+    cost = compute_cost(model, **tokens)
 
     from src.services.cost_tracker import log_cost
     log_cost("claude", "generate_destination_captions", cost, model=model,
-             input_tokens=input_tokens, output_tokens=output_tokens,
-             params={"source": "real_tokens"})
+             params={"source": "real_tokens"}, **tokens)
 
     result["_usage"] = {
         "model": model,
         "model_label": AVAILABLE_MODELS.get(model, {}).get("label", model),
-        "input_tokens": input_tokens,
-        "output_tokens": output_tokens,
+        **tokens,
         "cost_usd": cost,
     }
 
@@ -3,10 +3,8 @@ AI-powered carousel generation — theme suggestions, image selection, caption w
 Uses Claude (Anthropic API) following the same pattern as caption_generator.py.
 """
 import json
-import os
 import re
 from collections import Counter
-from typing import Optional
 
 from src.prompts.carousel_prompts import (
     CAROUSEL_THEME_SYSTEM,
@@ -16,6 +14,7 @@ from src.prompts.carousel_prompts import (
     CAROUSEL_CAPTION_SYSTEM,
     CAROUSEL_CAPTION_TEMPLATE,
 )
+from src.services.claude_client import cached_system, get_anthropic_client, token_cost, usage_tokens
 
 
 DEFAULT_MODEL = "claude-sonnet-4-6"
@@ -26,22 +25,6 @@ COST_RATES = {
 }
 
 
-def _get_secret(key: str) -> Optional[str]:
-    try:
-        import streamlit as st
-        if key in st.secrets:
-            return st.secrets[key]
-    except Exception:
-        pass
-    return os.getenv(key)
-
-
-def _get_client():
-    import anthropic
-    key = _get_secret("ANTHROPIC_API_KEY")
-    return anthropic.Anthropic(api_key=key) if key else anthropic.Anthropic()
-
-
 def _parse_json(raw: str) -> dict:
     """Extract JSON from Claude response (may be wrapped in ```json blocks)."""
     match = re.search(r"```(?:json)?\s*([\s\S]*?)```", raw)
@@ -50,9 +33,8 @@ def _parse_json(raw: str) -> dict:
     return json.loads(raw)
 
 
-def _compute_cost(model: str, inp: int, out: int) -> float:
-    rates = COST_RATES.get(model, (3.0, 15.0))
-    return (inp * rates[0] + out * rates[1]) / 1_000_000
+def _compute_cost(model: str, tokens: dict) -> float:
+    return token_cost(tokens, *COST_RATES.get(model, (3.0, 15.0)))
 
 
 # ---------------------------------------------------------------------------
@@ -73,7 +55,7 @@ def suggest_carousel_themes(
 
     Returns: {themes: [...], _usage: {model, input_tokens, output_tokens, cost_usd}}
     """
-    client = _get_client()
+    client = get_anthropic_client()
 
     # Summarize media library for the prompt
     categories = list(set(m.get("category", "unknown") for m in media_list if m.get("category")))
@@ -107,27 +89,23 @@ def suggest_carousel_themes(
     response = client.messages.create(
         model=model,
         max_tokens=1500,
-        system=CAROUSEL_THEME_SYSTEM,
+        system=cached_system(CAROUSEL_THEME_SYSTEM),
         messages=[{"role": "user", "content": user_text}],
     )
 
     raw = response.content[0].text.strip()
     result = _parse_json(raw)
 
-    inp = response.usage.input_tokens
-    out = response.usage.output_tokens
-
-    cost = _compute_cost(model, inp, out)
+    tokens = usage_tokens(response.usage)
+    cost = _compute_cost(model, tokens)
 
     from src.services.cost_tracker import log_cost
     log_cost("claude", "carousel_suggest_themes", cost, model=model,
-             input_tokens=inp, output_tokens=out,
-             params={"source": "real_tokens"})
+             params={"source": "real_tokens"}, **tokens)
 
     result["_usage"] = {
         "model": model,
-        "input_tokens": inp,
-        "output_tokens": out,
+        **tokens,
         "cost_usd": cost,
     }
     return result
@@ -156,7 +134,7 @@ def select_carousel_images(
 
     Returns: {selected: [{media_id, position, reason}], carousel_title, hook_note, _usage}
     """
-    client = _get_client()
+    client = get_anthropic_client()
 
     # Build concise image list for Claude (limit to 100 to stay within context)
     candidates = sorted(media_list, key=lambda m: m.get("ig_quality", 0), reverse=True)[:100]
@@ -187,20 +165,16 @@ def select_carousel_images(
     raw = response.content[0].text.strip()
     result = _parse_json(raw)
 
-    inp = response.usage.input_tokens
-    out = response.usage.output_tokens
-
-    cost = _compute_cost(model, inp, out)
+    tokens = usage_tokens(response.usage)
+    cost = _compute_cost(model, tokens)
 
     from src.services.cost_tracker import log_cost
     log_cost("claude", "carousel_select_images", cost, model=model,
-             input_tokens=inp, output_tokens=out,
-             params={"source": "real_tokens"})
+             params={"source": "real_tokens"}, **tokens)
 
     result["_usage"] = {
         "model": model,
-        "input_tokens": inp,
-        "output_tokens": out,
+        **tokens,
         "cost_usd": cost,
     }
     return result
@@ -226,7 +200,7 @@ def generate_carousel_captions(
 
     Returns: {caption_es, caption_en, caption_fr, hashtags: [...], _usage}
     """
-    client = _get_client()
+    client = get_anthropic_client()
 
     # Build image descriptions
     desc_lines = []
@@ -245,27 +219,23 @@ def generate_carousel_captions(
     response = client.messages.create(
         model=model,
         max_tokens=1500,
-        system=CAROUSEL_CAPTION_SYSTEM,
+        system=cached_system(CAROUSEL_CAPTION_SYSTEM),
         messages=[{"role": "user", "content": user_text}],
     )
 
     raw = response.content[0].text.strip()
     result = _parse_json(raw)
 
-    inp = response.usage.input_tokens
-    out = response.usage.output_tokens
-
-    cost = _compute_cost(model, inp, out)
+    tokens = usage_tokens(response.usage)
+    cost = _compute_cost(model, tokens)
 
     from src.services.cost_tracker import log_cost
     log_cost("claude", "carousel_generate_captions", cost, model=model,
-             input_tokens=inp, output_tokens=out,
-             params={"source": "real_tokens"})
+             params={"source": "real_tokens"}, **tokens)
 
     result["_usage"] = {
         "model": model,
-        "input_tokens": inp,
-        "output_tokens": out,
+        **tokens,
         "cost_usd": cost,
     }
     return result
@@ -22,8 +22,14 @@ def log_cost(
     input_tokens: Optional[int] = None,
     output_tokens: Optional[int] = None,
     params: Optional[dict] = None,
+    cache_read_tokens: Optional[int] = None,
+    cache_creation_tokens: Optional[int] = None,
 ) -> None:
-    """Log an API cost to the database. Fire-and-forget (never raises)."""
+    """Log an API cost to the database. Fire-and-forget (never raises).
+
+    `cache_read_tokens` / `cache_creation_tokens` are Claude prompt-cache
+    counts (not included in `input_tokens`).
+    """
     try:
         row = {
             "tool": tool,
@@ -38,7 +44,20 @@ def log_cost(
             row["output_tokens"] = output_tokens
         if params:
             row["params"] = params
-        get_supabase().table(TABLE_COST_LOG).insert(row).execute()
+        cache = {
+            k: v for k, v in (
+                ("cache_read_tokens", cache_read_tokens),
+                ("cache_creation_tokens", cache_creation_tokens),
+            ) if v is not None
+        }
+        try:
+            get_supabase().table(TABLE_COST_LOG).insert({**row, **cache}).execute()
+        except Exception:
+            if not cache:
+                raise
+            # cache columns not migrated yet — keep the counts in params
+            row["params"] = {**(params or {}), **cache}
+            get_supabase().table(TABLE_COST_LOG).insert(row).execute()
     except Exception:
         pass  # never block the main flow
 
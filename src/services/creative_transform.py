@@ -18,8 +18,12 @@ from src.prompts.creative_transform import (
     SCENARIO_SYSTEM,
     SCENARIO_TEMPLATE,
 )
+from src.services.claude_client import cached_system, get_anthropic_client, token_cost, usage_tokens
 from src.services.cost_tracker import log_cost
 
+# Claude rates per MTok (input, output)
+CLAUDE_COST_RATES = {"claude-sonnet-4-6": (3.0, 15.0), "claude-haiku-4-5-20251001": (0.8, 4.0)}
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -44,10 +48,13 @@ def _get_replicate_client():
     return replicate_sdk.Client(api_token=key, timeout=Timeout(600, connect=30))
 
 
-def _get_anthropic_client():
-    import anthropic
-    key = _get_secret("ANTHROPIC_API_KEY")
-    return anthropic.Anthropic(api_key=key) if key else anthropic.Anthropic()
+def hotel_system_prompt(system: str, hotel_context: str) -> list[dict]:
+    """System prompt + hotel context as one cached prefix (static across calls)."""
+    return cached_system(f"{system}\n\nHotel context:\n{hotel_context}")
+
+
+def _claude_cost(model: str, tokens: dict) -> float:
+    return token_cost(tokens, *CLAUDE_COST_RATES.get(model, (3.0, 15.0)))
 
 
 def _ensure_png(image_bytes: bytes) -> bytes:
@@ -110,11 +117,10 @@ def generate_motion_prompt_ai(
 
     Returns: {prompt: str, _usage: {model, input_tokens, output_tokens, cost_usd}}
     """
-    client = _get_anthropic_client()
+    client = get_anthropic_client()
 
     from src.prompts.creative_transform import HOTEL_CONTEXT
     user_text = MOTION_PROMPT_TEMPLATE.format(
-        hotel_context=HOTEL_CONTEXT,
         category=media.get("category", ""),
         subcategory=media.get("subcategory", ""),
         ambiance=", ".join(media.get("ambiance", [])) if isinstance(media.get("ambiance"), list) else media.get("ambiance", ""),
@@ -136,29 +142,22 @@ def generate_motion_prompt_ai(
     response = client.messages.create(
         model=model,
         max_tokens=300,
-        system=MOTION_PROMPT_SYSTEM,
+        system=hotel_system_prompt(MOTION_PROMPT_SYSTEM, HOTEL_CONTEXT),
         messages=[{"role": "user", "content": content}],
     )
 
     prompt_text = response.content[0].text.strip()
-    inp = response.usage.input_tokens
-    out = response.usage.output_tokens
-
-    # Cost estimate (Sonnet rates)
-    cost_rates = {"claude-sonnet-4-6": (3.0, 15.0), "claude-haiku-4-5-20251001": (0.8, 4.0)}
-    rates = cost_rates.get(model, (3.0, 15.0))
-    cost = (inp * rates[0] + out * rates[1]) / 1_000_000
+    tokens = usage_tokens(response.usage)
+    cost = _claude_cost(model, tokens)
 
     log_cost("claude", "motion_prompt_ai", cost, model=model,
-             input_tokens=inp, output_tokens=out,
-             params={"source": "real_tokens"})
+             params={"source": "real_tokens"}, **tokens)
 
     return {
         "prompt": prompt_text,
         "_usage": {
             "model": model,
-            "input_tokens": inp,
-            "output_tokens": out,
+            **tokens,
             "cost_usd": cost,
         },
     }
@@ -185,7 +184,7 @@ def generate_scenarios(
     import json
     import re
 
-    client = _get_anthropic_client()
+    client = get_anthropic_client()
 
     if not hotel_context:
         from src.prompts.creative_transform import HOTEL_CONTEXT
@@ -211,7 +210,6 @@ def generate_scenarios(
         category=media.get("category", ""),
         elements=", ".join(media.get("elements", [])) if isinstance(media.get("elements"), list) else media.get("elements", ""),
         description_en=media.get("description_en", ""),
-        hotel_context=hotel_context,
         character_roster=character_roster,
         creative_brief=creative_brief or "Full creative freedom",
     )
@@ -227,7 +225,7 @@ def generate_scenarios(
     response = client.messages.create(
         model=model,
         max_tokens=2000,
-        system=SCENARIO_SYSTEM,
+        system=hotel_system_prompt(SCENARIO_SYSTEM, hotel_context),
         messages=[{"role": "user", "content": content}],
     )
 
@@ -238,20 +236,15 @@ def generate_scenarios(
         raw = match.group(1).strip()
     result = json.loads(raw)
 
-    inp = response.usage.input_tokens
-    out = response.usage.output_tokens
-    cost_rates = {"claude-sonnet-4-6": (3.0, 15.0), "claude-haiku-4-5-20251001": (0.8, 4.0)}
-    rates = cost_rates.get(model, (3.0, 15.0))
-    cost = (inp * rates[0] + out * rates[1]) / 1_000_000
+    tokens = usage_tokens(response.usage)
+    cost = _claude_cost(model, tokens)
 
     log_cost("claude", "generate_scenarios", cost, model=model,
-             input_tokens=inp, output_tokens=out,
-             params={"source": "real_tokens"})
+             params={"source": "real_tokens"}, **tokens)
 
     result["_usage"] = {
         "model": model,
-        "input_tokens": inp,
-        "output_tokens": out,
+        **tokens,
         "cost_usd": cost,
     }
 
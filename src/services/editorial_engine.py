@@ -136,6 +136,7 @@ def _fetch_analyzed_media() -> list[dict]:
         .select("id,category,subcategory,ambiance,season,elements,ig_quality,aspect_ratio,media_type,file_name,drive_file_id,used_count,last_used_at,description_fr")
         .eq("status", "analyzed")
         .eq("is_excluded", False)
+        .eq("drive_removed", False)
         .execute()
     )
     return result.data
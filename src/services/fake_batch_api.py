@@ -0,0 +1,204 @@
+"""
+Fake Anthropic Message Batches endpoint — lets the `--batch-api` indexer flow
+run offline (no API key, no cost).
+
+Implements the three routes the SDK uses:
+  POST /v1/messages/batches                 create a batch
+  GET  /v1/messages/batches/{id}            retrieve (ends after `polls_until_ended` polls)
+  GET  /v1/messages/batches/{id}/results    JSONL results
+
+Every request gets a deterministic, schema-valid VisionAnalysis derived from
+its custom_id. custom_ids listed in `fail_ids` come back as `errored`.
+
+Fake analyses must never reach production tables: `run_indexer.py --fake-batch`
+pairs the endpoint with a MemoryMediaWriter and an in-memory batch state.
+
+Usage:
+  python -m src.services.fake_batch_api --port 8765
+  python scripts/run_indexer.py --batch-api --fake-batch --limit 20
+"""
+import argparse
+import hashlib
+import http.server
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+_CATEGORIES = ["room", "common", "exterior", "food", "experience", "destination"]
+_SUBCATEGORIES = ["suite", "terrace", "lobby", "breakfast", "spa", "beach"]
+_AMBIANCE = ["bright", "warm", "romantic", "art_nouveau", "mediterranean", "cozy"]
+
+
+def fake_analysis(custom_id: str) -> dict:
+    """Deterministic VisionAnalysis-shaped dict for a request id."""
+    h = int(hashlib.md5(custom_id.encode()).hexdigest(), 16)
+    return {
+        "category": _CATEGORIES[h % len(_CATEGORIES)],
+        "subcategory": _SUBCATEGORIES[(h >> 4) % len(_SUBCATEGORIES)],
+        "ambiance": [_AMBIANCE[(h >> 8) % len(_AMBIANCE)]],
+        "season": ["any_season"],
+        "elements": ["decor", "natural_light"],
+        "ig_quality": 1 + (h >> 12) % 10,
+        "description_fr": f"Photo factice {custom_id}",
+        "description_en": f"Fake photo {custom_id}",
+    }
+
+
+class MemoryMediaWriter:
+    """Stand-in for MediaWriteBuffer that keeps rows in memory, keyed by drive_file_id."""
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, row: dict, on_done: Optional[Callable[[Optional[Exception]], None]] = None):
+        with self._lock:
+            self.rows[row["drive_file_id"]] = row
+        if on_done is not None:
+            on_done(None)
+
+    def flush(self) -> list:
+        return []
+
+    def close(self):
+        pass
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+class _FakeBatchStore:
+    def __init__(self, polls_until_ended: int, fail_ids: set[str]):
+        self.polls_until_ended = polls_until_ended
+        self.fail_ids = fail_ids
+        self.batches: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+
+def _make_handler(store: _FakeBatchStore):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _batch_object(self, batch: dict) -> dict:
+            ended = batch["polls"] >= store.polls_until_ended
+            n = len(batch["requests"])
+            failed = sum(1 for r in batch["requests"] if r["custom_id"] in store.fail_ids)
+            host = f"http://{self.headers.get('Host')}"
+            return {
+                "id": batch["id"],
+                "type": "message_batch",
+                "processing_status": "ended" if ended else "in_progress",
+                "request_counts": {
+                    "processing": 0 if ended else n,
+                    "succeeded": n - failed if ended else 0,
+                    "errored": failed if ended else 0,
+                    "canceled": 0,
+                    "expired": 0,
+                },
+                "created_at": _iso(batch["created_at"]),
+                "expires_at": _iso(batch["created_at"] + timedelta(hours=24)),
+                "ended_at": _iso(datetime.now(timezone.utc)) if ended else None,
+                "archived_at": None,
+                "cancel_initiated_at": None,
+                "results_url": f"{host}/v1/messages/batches/{batch['id']}/results" if ended else None,
+            }
+
+        def do_POST(self):
+            if self.path.split("?")[0] != "/v1/messages/batches":
+                return self._send_json({"type": "error", "error": {"type": "not_found_error"}}, 404)
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            with store.lock:
+                batch_id = f"msgbatch_fake_{len(store.batches) + 1:04d}"
+                batch = {
+                    "id": batch_id,
+                    "requests": body.get("requests", []),
+                    "created_at": datetime.now(timezone.utc),
+                    "polls": 0,
+                }
+                store.batches[batch_id] = batch
+            self._send_json(self._batch_object(batch))
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if len(parts) < 4 or parts[:3] != ["v1", "messages", "batches"]:
+                return self._send_json({"type": "error", "error": {"type": "not_found_error"}}, 404)
+            batch = store.batches.get(parts[3])
+            if batch is None:
+                return self._send_json({"type": "error", "error": {"type": "not_found_error"}}, 404)
+
+            if len(parts) == 4:
+                with store.lock:
+                    batch["polls"] += 1
+                return self._send_json(self._batch_object(batch))
+
+            lines = []
+            for req in batch["requests"]:
+                cid = req["custom_id"]
+                if cid in store.fail_ids:
+                    result = {
+                        "type": "errored",
+                        "error": {"type": "error", "error": {
+                            "type": "invalid_request_error", "message": "fake failure",
+                        }},
+                    }
+                else:
+                    result = {
+                        "type": "succeeded",
+                        "message": {
+                            "id": f"msg_fake_{cid}",
+                            "type": "message",
+                            "role": "assistant",
+                            "model": req.get("params", {}).get("model", "fake"),
+                            "content": [{"type": "text", "text": json.dumps(fake_analysis(cid))}],
+                            "stop_reason": "end_turn",
+                            "stop_sequence": None,
+                            "usage": {"input_tokens": 1500, "output_tokens": 150},
+                        },
+                    }
+                lines.append(json.dumps({"custom_id": cid, "result": result}))
+            body = ("\n".join(lines) + "\n").encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/binary")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def start_fake_batch_server(
+    port: int = 0,
+    polls_until_ended: int = 2,
+    fail_ids: Optional[set[str]] = None,
+) -> tuple[http.server.ThreadingHTTPServer, str]:
+    """Start the fake endpoint in a background thread. Returns (server, base_url)."""
+    store = _FakeBatchStore(polls_until_ended, set(fail_ids or ()))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), _make_handler(store))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Anthropic Message Batches endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--polls", type=int, default=2, help="Polls before a batch ends")
+    args = parser.parse_args()
+    server, url = start_fake_batch_server(args.port, args.polls)
+    print(f"Fake Message Batches API listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -8,20 +8,34 @@ Auth priority (first match wins):
   2. User OAuth token (legacy) — expires when in Testing mode.
      - Local: .google_token_drive.json
      - Streamlit Cloud: st.secrets["GOOGLE_DRIVE_TOKEN"]
+
+Services are per-thread (see _DriveServicePool), so listing, downloads and
+uploads can run from any number of worker threads.
 """
+import hashlib
 import io
 import json
 import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
+import httplib2
 from dotenv import load_dotenv
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google.oauth2.service_account import Credentials as ServiceAccountCredentials
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
 
+from src.services.blob_cache import get_blob_cache
+
 _project_root = Path(__file__).parent.parent.parent
 load_dotenv(_project_root / ".env")
 
@@ -40,12 +54,10 @@ VIDEO_MIMES = {
     "video/webm", "video/mpeg", "video/3gpp",
 }
 MEDIA_MIMES = IMAGE_MIMES | VIDEO_MIMES
+FOLDER_MIME = "application/vnd.google-apps.folder"
 
-# Singletons — separate services for read (SA-preferred) and write (OAuth-only)
-_drive_service = None
-_drive_creds = None
-_drive_service_write = None
-_drive_creds_write = None
+# HTTP timeout (seconds) of each pooled connection
+HTTP_TIMEOUT = 120
 
 
 def _load_service_account() -> Optional[ServiceAccountCredentials]:
@@ -67,6 +79,16 @@ def _load_service_account() -> Optional[ServiceAccountCredentials]:
     return None
 
 
+def _save_user_token(creds):
+    """Persist refreshed user OAuth tokens (no-op for service accounts)."""
+    if not isinstance(creds, Credentials):
+        return
+    try:
+        TOKEN_FILE.write_text(creds.to_json())
+    except Exception:
+        pass
+
+
 def _authenticate_user() -> Credentials:
     """Return user OAuth credentials. Used for WRITES (uploads, folder creation)
     since service accounts have no storage quota on non-Workspace Drives.
@@ -87,10 +109,7 @@ def _authenticate_user() -> Credentials:
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
-            try:
-                TOKEN_FILE.write_text(creds.to_json())
-            except Exception:
-                pass
+            _save_user_token(creds)
         else:
             from google_auth_oauthlib.flow import InstalledAppFlow
             flow = InstalledAppFlow.from_client_secrets_file(str(CREDS_FILE), SCOPES)
@@ -110,78 +129,396 @@ def _authenticate():
     return _authenticate_user()
 
 
+class _DriveServicePool:
+    """Drive services for one credential role, one per thread.
+
+    httplib2 connections are not thread-safe, so every thread gets its own
+    service and connection; all of them share one credentials object. Token
+    refresh is single-flight: when several threads see an expired token at
+    once, one refreshes and the others reuse its token. Services are built
+    from a discovery document parsed once per process.
+    """
+
+    def __init__(self, authenticate, on_refresh=None):
+        self._authenticate = authenticate
+        self._on_refresh = on_refresh
+        self._lock = threading.Lock()
+        self._creds = None
+        self._generation = 0
+        self._local = threading.local()
+
+    def _share_refresh(self, creds):
+        """Serialize refreshes of `creds` and skip those already done."""
+        refresh = creds.refresh
+
+        def _refresh(request):
+            token = creds.token
+            with self._lock:
+                if creds.token != token and creds.valid:
+                    return  # another thread refreshed while we waited
+                refresh(request)
+                if self._on_refresh is not None:
+                    self._on_refresh(creds)
+
+        creds.refresh = _refresh
+        return creds
+
+    def credentials(self):
+        with self._lock:
+            if self._creds is None:
+                self._creds = self._share_refresh(self._authenticate())
+                self._generation += 1
+            creds = self._creds
+        if not creds.valid:
+            creds.refresh(Request())
+        return creds
+
+    def service(self):
+        creds = self.credentials()
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            http = AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+            local.service = build_from_document(_drive_discovery_doc(), http=http)
+            local.generation = self._generation
+        return local.service
+
+    def reset(self):
+        """Drop the credentials; every thread rebuilds its service on next use."""
+        with self._lock:
+            self._creds = None
+            self._generation += 1
+
+
+_discovery_doc: Optional[str] = None
+
+
+def _drive_discovery_doc() -> str:
+    global _discovery_doc
+    if _discovery_doc is None:
+        _discovery_doc = get_static_doc("drive", "v3")
+    return _discovery_doc
+
+
+# Separate pools for read (SA-preferred) and write (OAuth-only)
+_read_pool = _DriveServicePool(_authenticate, on_refresh=_save_user_token)
+_write_pool = _DriveServicePool(_authenticate_user, on_refresh=_save_user_token)
+
+
 def _reset_drive_service():
     """Clear cached services so next call re-authenticates."""
-    global _drive_service, _drive_creds, _drive_service_write, _drive_creds_write
-    _drive_service = None
-    _drive_creds = None
-    _drive_service_write = None
-    _drive_creds_write = None
+    _read_pool.reset()
+    _write_pool.reset()
 
 
 def get_drive_service():
-    """Drive service for READS (list, download). Uses service account when
-    configured, else user OAuth. Service accounts don't expire.
+    """Drive service for READS (list, download), private to the calling thread.
+    Uses service account when configured, else user OAuth. Service accounts
+    don't expire.
     """
-    global _drive_service, _drive_creds
-    if _drive_service is None or (_drive_creds and _drive_creds.expired):
-        _drive_creds = _authenticate()
-        _drive_service = build("drive", "v3", credentials=_drive_creds)
-    return _drive_service
+    return _read_pool.service()
 
 
 def get_drive_service_write():
-    """Drive service for WRITES (upload, create folder, delete). Always uses
-    user OAuth — service accounts have no storage quota on non-Workspace Drives.
+    """Drive service for WRITES (upload, create folder, delete), private to the
+    calling thread. Always uses user OAuth — service accounts have no storage
+    quota on non-Workspace Drives.
     """
-    global _drive_service_write, _drive_creds_write
-    if _drive_service_write is None or (_drive_creds_write and _drive_creds_write.expired):
-        _drive_creds_write = _authenticate_user()
-        _drive_service_write = build("drive", "v3", credentials=_drive_creds_write)
-    return _drive_service_write
+    return _write_pool.service()
 
 
-def list_media_files(folder_id: Optional[str] = None) -> list[dict]:
+# Calls per batch HTTP request — the Drive API maximum
+DRIVE_BATCH_SIZE = 100
+
+
+# 403 reasons that mean "slow down" rather than "no access"
+_RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+
+def _http_status(exc: Exception) -> Optional[int]:
+    resp = getattr(exc, "resp", None)
+    return getattr(resp, "status", None)
+
+
+def _error_reasons(exc: Exception) -> set[str]:
+    """`reason` values of a Drive HttpError's error body (empty if none)."""
+    try:
+        error = json.loads(exc.content)["error"]
+    except (AttributeError, TypeError, ValueError, KeyError):
+        return set()
+    details = (error.get("errors") or []) + (error.get("details") or [])
+    return {d.get("reason") for d in details if isinstance(d, dict) and d.get("reason")}
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Worth a second try: not a 404, and a 403 only when it is a rate limit."""
+    status = _http_status(exc)
+    if status == 404:
+        return False
+    if status == 403:
+        return bool(_error_reasons(exc) & _RATE_LIMIT_REASONS)
+    return True
+
+
+def execute_batched(requests: list, service=None) -> list[tuple[Optional[dict], Optional[Exception]]]:
+    """Run Drive API requests (files().get, files().list, ...) as batch HTTP
+    requests of up to DRIVE_BATCH_SIZE calls.
+
+    Returns one (response, exception) pair per request, in order — a failing
+    item never fails the others. Items that fail inside a batch (rate limits,
+    transient errors) are retried once on their own; 404s and permission
+    403s are not retried.
+    All requests must come from `service` (default: the read service).
     """
-    Recursively list all image and video files in the Drive folder.
-    Returns list of dicts with: id, name, mimeType, size, modifiedTime, _path.
-    Filters out non-media files (PDFs, Excel, etc).
+    if service is None:
+        service = get_drive_service()
+    results: list[tuple[Optional[dict], Optional[Exception]]] = [(None, None)] * len(requests)
+    if len(requests) == 1:
+        try:
+            results[0] = (requests[0].execute(), None)
+        except Exception as e:
+            results[0] = (None, e)
+        return results
+
+    for start in range(0, len(requests), DRIVE_BATCH_SIZE):
+        chunk = range(start, min(start + DRIVE_BATCH_SIZE, len(requests)))
+
+        def _callback(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        batch = service.new_batch_http_request(callback=_callback)
+        for i in chunk:
+            batch.add(requests[i], request_id=str(i))
+        try:
+            batch.execute()
+        except Exception as e:
+            for i in chunk:
+                results[i] = (None, e)  # whole batch failed — retried one by one below
+
+    for i, (response, exc) in enumerate(results):
+        if exc is not None and _is_retryable(exc):
+            try:
+                results[i] = (requests[i].execute(), None)
+            except Exception as e:
+                results[i] = (None, e)
+    return results
+
+
+def get_files_metadata(file_ids: list[str], fields: str) -> dict[str, Optional[dict]]:
+    """files().get for many ids in batch requests. Returns {file_id: metadata},
+    None for ids that could not be fetched (deleted, no access, ...)."""
+    ids = list(dict.fromkeys(file_ids))
+    if not ids:
+        return {}
+    service = get_drive_service()
+    responses = execute_batched(
+        [service.files().get(fileId=fid, fields=fields) for fid in ids], service,
+    )
+    return {fid: response for fid, (response, _) in zip(ids, responses)}
+
+
+def get_thumbnail_links(file_ids: list[str], size: Optional[int] = None) -> dict[str, Optional[str]]:
+    """Drive thumbnailLink for many files in one round trip per 100 ids.
+    `size` rewrites the link's default 220 px longest side."""
+    links = {}
+    for fid, meta in get_files_metadata(file_ids, "thumbnailLink").items():
+        link = (meta or {}).get("thumbnailLink")
+        if link and size:
+            link = link.replace("=s220", f"=s{size}")
+        links[fid] = link
+    return links
+
+
+# Listing concurrency: folder pages per batch HTTP request, batches in flight
+LIST_BATCH_SIZE = DRIVE_BATCH_SIZE
+LIST_CONCURRENCY = 4
+_LIST_FIELDS = "nextPageToken, files(id, name, mimeType, size, modifiedTime, md5Checksum)"
+
+
+def _folder_list_request(service, folder_id: str, page_token: Optional[str]):
+    return service.files().list(
+        q=f"'{folder_id}' in parents and trashed = false",
+        fields=_LIST_FIELDS,
+        pageSize=1000,
+        pageToken=page_token,
+    )
+
+
+def _list_folder_pages(pages: list[tuple[str, str, Optional[str]]]) -> list[tuple[str, str, dict]]:
+    """Fetch one page for each (folder_id, path, page_token) — as a single
+    batch HTTP request when there are several. Returns (folder_id, path,
+    response); raises if a page still fails after its individual retry."""
+    service = get_drive_service()
+    responses = execute_batched(
+        [_folder_list_request(service, fid, token) for fid, _, token in pages], service,
+    )
+    results = []
+    for (fid, path, _), (resp, exc) in zip(pages, responses):
+        if exc is not None:
+            raise exc
+        results.append((fid, path, resp))
+    return results
+
+
+def iter_media_files(
+    folder_id: Optional[str] = None,
+    max_concurrency: int = LIST_CONCURRENCY,
+    batch_size: int = LIST_BATCH_SIZE,
+) -> Iterator[dict]:
+    """
+    Breadth-first walk of the Drive folder, yielding media files as they are
+    discovered. Sibling folders are listed concurrently (up to `max_concurrency`
+    requests in flight), several folder pages per Drive batch HTTP request.
+    Yields dicts with: id, name, mimeType, size, modifiedTime, md5Checksum, _path.
     """
     if folder_id is None:
         folder_id = os.getenv("DRIVE_FOLDER_ID")
     if not folder_id:
         raise ValueError("DRIVE_FOLDER_ID not set")
 
+    pending: deque[tuple[str, str, Optional[str]]] = deque([(folder_id, "", None)])
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="drive-list") as pool:
+        running = set()
+        while pending or running:
+            # Spread the frontier over the free slots, batch_size pages max per request
+            free = max_concurrency - len(running)
+            while pending and free > 0:
+                size = min(batch_size, max(1, -(-len(pending) // free)))
+                chunk = [pending.popleft() for _ in range(min(size, len(pending)))]
+                running.add(pool.submit(_list_folder_pages, chunk))
+                free -= 1
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                for fid, path, resp in fut.result():
+                    for f in resp.get("files", []):
+                        f["_path"] = path + "/" + f["name"]
+                        if f["mimeType"] == FOLDER_MIME:
+                            pending.append((f["id"], f["_path"], None))
+                        elif f["mimeType"] in MEDIA_MIMES:
+                            yield f
+                    if resp.get("nextPageToken"):
+                        pending.append((fid, path, resp["nextPageToken"]))
+
+
+def list_media_files(folder_id: Optional[str] = None) -> list[dict]:
+    """
+    Recursively list all image and video files in the Drive folder.
+    Returns list of dicts with: id, name, mimeType, size, modifiedTime,
+    md5Checksum, _path.
+    Filters out non-media files (PDFs, Excel, etc).
+    """
+    return list(iter_media_files(folder_id))
+
+
+# Fields requested for each changed file in the Changes feed
+_CHANGE_FILE_FIELDS = "id, name, mimeType, size, modifiedTime, md5Checksum, trashed, parents"
+
+
+def get_changes_start_token() -> str:
+    """Return the Drive changes page token for 'now' (start of a new feed)."""
     service = get_drive_service()
-    all_files = []
-
-    def _scan(fid: str, path: str = ""):
-        page_token = None
-        while True:
-            resp = service.files().list(
-                q=f"'{fid}' in parents and trashed = false",
-                fields="nextPageToken, files(id, name, mimeType, size, modifiedTime)",
-                pageSize=1000,
-                pageToken=page_token,
-            ).execute()
-
-            for f in resp.get("files", []):
-                f["_path"] = path + "/" + f["name"]
-                if f["mimeType"] == "application/vnd.google-apps.folder":
-                    _scan(f["id"], f["_path"])
-                elif f["mimeType"] in MEDIA_MIMES:
-                    all_files.append(f)
-
-            page_token = resp.get("nextPageToken")
-            if not page_token:
-                break
-
-    _scan(folder_id)
-    return all_files
-
-
-def download_file_bytes(file_id: str) -> bytes:
-    """Download a file from Drive and return its bytes.
+    resp = service.changes().getStartPageToken().execute()
+    return resp["startPageToken"]
+
+
+def list_changes(page_token: str) -> tuple[list[dict], str]:
+    """
+    List every change since `page_token` (follows nextPageToken).
+    Returns (changes, new_start_page_token). Each change has: fileId, removed,
+    and (unless removed) file with id, name, mimeType, size, modifiedTime,
+    md5Checksum, trashed, parents. A no-op poll costs a single API call.
+    """
+    service = get_drive_service()
+    changes = []
+    while True:
+        resp = service.changes().list(
+            pageToken=page_token,
+            spaces="drive",
+            includeRemoved=True,
+            pageSize=1000,
+            fields=f"nextPageToken, newStartPageToken, "
+                   f"changes(fileId, removed, file({_CHANGE_FILE_FIELDS}))",
+        ).execute()
+        changes.extend(resp.get("changes", []))
+        if "newStartPageToken" in resp:
+            return changes, resp["newStartPageToken"]
+        page_token = resp["nextPageToken"]
+
+
+_FOLDER_FIELDS = "name, parents, trashed"
+
+
+def prefetch_folders(
+    files: list[dict],
+    folder_cache: dict[str, dict],
+    root_folder_id: Optional[str] = None,
+):
+    """Fill `folder_cache` with the ancestor folders of `files` (up to
+    `root_folder_id`), one batch request per tree level, so
+    resolve_path_under() then makes no calls."""
+    wanted = {p for f in files for p in (f.get("parents") or [])[:1]}
+    while True:
+        missing = [fid for fid in wanted if fid not in folder_cache and fid != root_folder_id]
+        if not missing:
+            return
+        wanted = set()
+        for fid, folder in get_files_metadata(missing, _FOLDER_FIELDS).items():
+            folder = folder or {"name": "", "parents": [], "trashed": True}
+            folder_cache[fid] = folder
+            if not folder.get("trashed"):
+                wanted.update((folder.get("parents") or [])[:1])
+
+
+def resolve_path_under(
+    file: dict,
+    root_folder_id: str,
+    folder_cache: Optional[dict[str, dict]] = None,
+) -> Optional[str]:
+    """
+    Build the `_path` of a file relative to root_folder_id by walking its parents.
+    Returns None if the file is not inside root_folder_id (or its folder is trashed).
+    `folder_cache` memoizes folder lookups ({id: {name, parents, trashed}})
+    across calls so sibling files cost no extra requests; fill it for many
+    files at once with prefetch_folders().
+    """
+    if folder_cache is None:
+        folder_cache = {}
+    service = get_drive_service()
+    parts = [file["name"]]
+    parents = file.get("parents") or []
+    seen = set()
+    while parents:
+        parent_id = parents[0]
+        if parent_id == root_folder_id:
+            return "/" + "/".join(reversed(parts))
+        if parent_id in seen:
+            return None
+        seen.add(parent_id)
+        folder = folder_cache.get(parent_id)
+        if folder is None:
+            try:
+                folder = service.files().get(
+                    fileId=parent_id, fields=_FOLDER_FIELDS,
+                ).execute()
+            except Exception:
+                folder = {"name": "", "parents": [], "trashed": True}
+            folder_cache[parent_id] = folder
+        if folder.get("trashed"):
+            return None
+        parts.append(folder.get("name", ""))
+        parents = folder.get("parents") or []
+    return None
+
+
+def _is_auth_error(exc: Exception) -> bool:
+    """Stale or revoked token — worth one retry with fresh credentials."""
+    err_msg = str(exc).lower()
+    return ("invalid_grant" in err_msg or "expired" in err_msg
+            or "401" in err_msg or "credentials" in err_msg)
+
+
+def _download_bytes(file_id: str) -> bytes:
+    """Download a file from Drive into memory.
 
     Retries once with fresh credentials on auth errors (stale token).
     """
@@ -196,14 +533,239 @@ def download_file_bytes(file_id: str) -> bytes:
                 _, done = downloader.next_chunk()
             return buffer.getvalue()
         except Exception as exc:
-            err_msg = str(exc).lower()
-            if attempt == 0 and ("invalid_grant" in err_msg or "expired" in err_msg
-                                 or "401" in err_msg or "credentials" in err_msg):
+            if attempt == 0 and _is_auth_error(exc):
                 _reset_drive_service()
                 continue
             raise
 
 
+def _file_version(file_id: str) -> tuple[Optional[str], Optional[str]]:
+    """(md5Checksum, modifiedTime) of a Drive file — one small metadata call."""
+    try:
+        meta = get_drive_service().files().get(
+            fileId=file_id, fields="md5Checksum, modifiedTime",
+        ).execute()
+    except Exception:
+        return None, None
+    return meta.get("md5Checksum"), meta.get("modifiedTime")
+
+
+def download_file_bytes(
+    file_id: str,
+    md5_checksum: Optional[str] = None,
+    modified_time: Optional[str] = None,
+) -> bytes:
+    """Download a file from Drive and return its bytes.
+
+    Served from the local blob cache (see blob_cache) when the cached copy
+    matches the file's current version: pass the `md5Checksum` /
+    `modifiedTime` you already have (e.g. from a listing), otherwise one
+    metadata call fetches them. Retries once with fresh credentials on auth
+    errors (stale token).
+    """
+    cache = get_blob_cache()
+    if cache is None:
+        return _download_bytes(file_id)
+    if md5_checksum is None and modified_time is None:
+        md5_checksum, modified_time = _file_version(file_id)
+    if md5_checksum is None and modified_time is None:
+        return _download_bytes(file_id)  # nothing to validate a cached copy against
+
+    data = cache.get(file_id, md5_checksum, modified_time)
+    if data is None:
+        data = _download_bytes(file_id)
+        cache.put(file_id, data, md5_checksum, modified_time)
+    return data
+
+
+# Chunk size for streamed downloads — peak memory per download is one chunk
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class _HashingWriter:
+    """File-like sink that md5-hashes everything written through it."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.md5 = hashlib.md5()
+
+    def write(self, data: bytes) -> int:
+        self.md5.update(data)
+        return self._fh.write(data)
+
+
+# Ranged downloads — files at least RANGED_DOWNLOAD_MIN_BYTES are split into
+# RANGE_PART_SIZE byte ranges fetched by RANGE_CONCURRENCY threads at once.
+# Smaller files keep the single-stream path (one request below 8 MB).
+RANGED_DOWNLOAD_MIN_BYTES = 32 * 1024 * 1024
+RANGE_PART_SIZE = DOWNLOAD_CHUNK_SIZE
+RANGE_CONCURRENCY = 4
+RANGE_RETRIES = 3
+_TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+# Workers shared by every ranged download — long-lived threads keep their
+# per-thread Drive service (_read_pool) and TLS connection across files
+RANGE_POOL_WORKERS = 8
+
+_range_executor: Optional[ThreadPoolExecutor] = None
+_range_executor_lock = threading.Lock()
+
+
+def _get_range_executor() -> ThreadPoolExecutor:
+    """Get or create the shared ranged-download executor (singleton)."""
+    global _range_executor
+    with _range_executor_lock:
+        if _range_executor is None:
+            _range_executor = ThreadPoolExecutor(
+                max_workers=RANGE_POOL_WORKERS, thread_name_prefix="drive-range",
+            )
+        return _range_executor
+
+
+def read_file_range(file_id: str, start: int, end: int) -> bytes:
+    """Bytes `start`..`end` (inclusive) of a Drive file — one ranged GET.
+
+    Fewer bytes come back when `end` is past the end of the file. Retries
+    with fresh credentials on auth errors and with backoff on rate limits,
+    5xx and connection errors.
+    """
+    for attempt in range(RANGE_RETRIES):
+        try:
+            request = get_drive_service().files().get_media(fileId=file_id)
+            request.headers["Range"] = f"bytes={start}-{end}"
+            data = request.execute()
+            # A server that ignores Range sends the whole file
+            return data[start:end + 1] if len(data) > end - start + 1 else data
+        except Exception as exc:
+            status = _http_status(exc)
+            if attempt == RANGE_RETRIES - 1:
+                raise
+            if _is_auth_error(exc):
+                _reset_drive_service()
+            elif status is not None and status not in _TRANSIENT_STATUSES:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def _file_md5(path: str) -> str:
+    h = hashlib.md5()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(DOWNLOAD_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _download_streamed(file_id: str, dest_path: str) -> str:
+    """Stream a Drive file to `dest_path` chunk by chunk. Returns its md5 hex.
+
+    Retries once with fresh credentials on auth errors (stale token).
+    """
+    for attempt in range(2):
+        try:
+            service = get_drive_service()
+            request = service.files().get_media(fileId=file_id)
+            with open(dest_path, "wb") as fh:
+                sink = _HashingWriter(fh)
+                downloader = MediaIoBaseDownload(sink, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+                done = False
+                while not done:
+                    _, done = downloader.next_chunk()
+            return sink.md5.hexdigest()
+        except Exception as exc:
+            if attempt == 0 and _is_auth_error(exc):
+                _reset_drive_service()
+                continue
+            raise
+
+
+def _download_ranged(file_id: str, dest_path: str, size: int, concurrency: int) -> str:
+    """Fetch byte ranges concurrently into a preallocated file. Returns its md5 hex.
+
+    Parts run on the shared range executor, each worker reading through its
+    own pooled Drive service. At most `concurrency` parts of this file are in
+    flight (and in memory) at once; each range retries on its own (see
+    read_file_range).
+    """
+    with open(dest_path, "wb") as fh:
+        fh.truncate(size)
+    write_lock = threading.Lock()
+    pool = _get_range_executor()
+    with open(dest_path, "r+b") as fh:
+        def _part(start: int):
+            end = min(start + RANGE_PART_SIZE, size) - 1
+            data = read_file_range(file_id, start, end)
+            if len(data) != end - start + 1:
+                raise IOError(f"Short range read for {file_id}: bytes {start}-{end}, got {len(data)}")
+            with write_lock:
+                fh.seek(start)
+                fh.write(data)
+
+        running = set()
+        try:
+            for start in range(0, size, RANGE_PART_SIZE):
+                if len(running) >= concurrency:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        fut.result()
+                running.add(pool.submit(_part, start))
+            done, running = wait(running)
+            for fut in done:
+                fut.result()
+        finally:
+            for fut in running:  # on error, stop queued parts before fh closes
+                fut.cancel()
+            wait(running)
+    return _file_md5(dest_path)
+
+
+def download_file_to_path(
+    file_id: str,
+    dest_path: str,
+    size: Optional[int] = None,
+    md5_checksum: Optional[str] = None,
+    concurrency: int = RANGE_CONCURRENCY,
+) -> str:
+    """Download a Drive file to `dest_path`. Returns its md5 hex.
+
+    Files of RANGED_DOWNLOAD_MIN_BYTES or more are fetched as parallel byte
+    ranges, smaller ones streamed over one connection. Pass the `size` and
+    `md5Checksum` from a listing when you have them, otherwise one metadata
+    call fetches them. The result is checked against `md5Checksum` (when
+    Drive has one) and an IOError raised on mismatch.
+    """
+    if size is None:
+        meta = get_drive_service().files().get(fileId=file_id, fields="size, md5Checksum").execute()
+        size = int(meta.get("size") or 0)
+        md5_checksum = md5_checksum or meta.get("md5Checksum")
+    if size >= RANGED_DOWNLOAD_MIN_BYTES and concurrency > 1:
+        md5 = _download_ranged(file_id, dest_path, size, concurrency)
+    else:
+        md5 = _download_streamed(file_id, dest_path)
+    if md5_checksum and md5 != md5_checksum:
+        raise IOError(f"md5 mismatch for {file_id}: expected {md5_checksum}, got {md5}")
+    return md5
+
+
+def download_to_temp_file(
+    file_id: str,
+    suffix: str = "",
+    size: Optional[int] = None,
+    md5_checksum: Optional[str] = None,
+) -> tuple[str, str]:
+    """Download a Drive file into a new temp file. Returns (path, md5 hex).
+
+    The caller owns the file and must delete it. Used for videos, which
+    OpenCV needs as a path anyway — memory stays at a few chunks whatever
+    the clip size. See download_file_to_path for `size` / `md5_checksum`.
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="instahotel_")
+    os.close(fd)
+    try:
+        return path, download_file_to_path(file_id, path, size, md5_checksum)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+
 def classify_media_type(mime_type: str) -> Optional[str]:
     """Return 'image' or 'video' based on MIME type, or None for junk."""
     if mime_type in IMAGE_MIMES:
@@ -217,19 +779,15 @@ def classify_media_type(mime_type: str) -> Optional[str]:
 # Upload helpers — write generated media back to Drive
 # ---------------------------------------------------------------------------
 
-def get_or_create_folder(name: str, parent_id: str) -> str:
-    """Find or create a folder under parent_id. Returns folder ID."""
-    service = get_drive_service_write()
-    # Search for existing
+def _find_folder_request(service, name: str, parent_id: str):
     q = (
         f"name = '{name}' and '{parent_id}' in parents "
         f"and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
     )
-    resp = service.files().list(q=q, fields="files(id)", pageSize=1).execute()
-    files = resp.get("files", [])
-    if files:
-        return files[0]["id"]
-    # Create
+    return service.files().list(q=q, fields="files(id)", pageSize=1)
+
+
+def _create_folder(service, name: str, parent_id: str) -> str:
     meta = {
         "name": name,
         "mimeType": "application/vnd.google-apps.folder",
@@ -239,6 +797,27 @@ def get_or_create_folder(name: str, parent_id: str) -> str:
     return folder["id"]
 
 
+def get_or_create_folder(name: str, parent_id: str) -> str:
+    """Find or create a folder under parent_id. Returns folder ID."""
+    return get_or_create_folders([name], parent_id)[name]
+
+
+def get_or_create_folders(names: list[str], parent_id: str) -> dict[str, str]:
+    """Find or create several sibling folders under parent_id — the lookups
+    share one batch request. Returns {name: folder_id}."""
+    service = get_drive_service_write()
+    responses = execute_batched(
+        [_find_folder_request(service, name, parent_id) for name in names], service,
+    )
+    ids = {}
+    for name, (resp, exc) in zip(names, responses):
+        if exc is not None:
+            raise exc
+        files = resp.get("files", [])
+        ids[name] = files[0]["id"] if files else _create_folder(service, name, parent_id)
+    return ids
+
+
 def upload_file_to_drive(
     file_bytes: bytes,
     filename: str,
@@ -288,7 +867,8 @@ def ensure_generated_folders() -> dict[str, str]:
         raise ValueError("DRIVE_FOLDER_ID not set")
 
     gen_id = get_or_create_folder("Generated", root_id)
-    _FOLDER_CACHE["videos"] = get_or_create_folder("Videos", gen_id)
-    _FOLDER_CACHE["music"] = get_or_create_folder("Music", gen_id)
-    _FOLDER_CACHE["enhanced"] = get_or_create_folder("Enhanced", gen_id)
+    folders = get_or_create_folders(["Videos", "Music", "Enhanced"], gen_id)
+    _FOLDER_CACHE["videos"] = folders["Videos"]
+    _FOLDER_CACHE["music"] = folders["Music"]
+    _FOLDER_CACHE["enhanced"] = folders["Enhanced"]
     return _FOLDER_CACHE
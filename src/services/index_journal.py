@@ -0,0 +1,202 @@
+"""
+Crash-safe checkpoint journal for indexing runs.
+
+Append-only JSONL file recording, per Drive file, which pipeline stage has
+completed: downloaded → encoded → analysed → persisted. Each line is flushed
+and fsync'ed, so a run killed at any point can be resumed:
+
+  - analysed  → the Claude result is in the journal; only the DB write is redone
+  - encoded   → the encoded image is spooled next to the journal; analysis resumes
+  - downloaded / nothing → the file is downloaded again (free)
+
+A paid Claude call is therefore never repeated for a file whose analysis
+reached the journal. Entries are keyed by drive_file_id and guarded by the
+file's md5Checksum, so a file edited since the crash is analysed afresh.
+
+`failed` is terminal like `persisted`: the file's spooled payload is deleted
+and `compact()` drops the entry. Unfinished entries older than
+`MAX_ENTRY_AGE` are expired by `compact()` too. One run owns the journal at a
+time — a second IndexJournal on the same directory raises JournalLockedError.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_project_root = Path(__file__).parent.parent.parent
+JOURNAL_DIR = _project_root / ".indexer_journal"
+MAX_ENTRY_AGE = timedelta(days=7)
+
+STAGE_DOWNLOADED = "downloaded"
+STAGE_ENCODED = "encoded"
+STAGE_ANALYSED = "analysed"
+STAGE_PERSISTED = "persisted"
+STAGE_FAILED = "failed"
+_STAGE_ORDER = {
+    STAGE_DOWNLOADED: 1,
+    STAGE_ENCODED: 2,
+    STAGE_ANALYSED: 3,
+    STAGE_PERSISTED: 4,
+    STAGE_FAILED: 4,
+}
+_TERMINAL_STAGES = (STAGE_PERSISTED, STAGE_FAILED)
+
+
+class JournalLockedError(RuntimeError):
+    """Another indexer run holds the journal directory."""
+
+
+def _lock_file(fh):
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+def _unlock_file(fh):
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    else:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class IndexJournal:
+    """Thread-safe append-only stage journal (one per indexing directory)."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or JOURNAL_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_fh = open(self.directory / "journal.lock", "a+")
+        try:
+            _lock_file(self._lock_fh)
+        except OSError:
+            self._lock_fh.close()
+            raise JournalLockedError(
+                f"{self.directory} is in use by another indexer run"
+            ) from None
+        self.path = self.directory / "journal.jsonl"
+        self._payload_dir = self.directory / "payloads"
+        self._payload_dir.mkdir(exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._load()
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        """Replay the journal to rebuild the latest state per file."""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash mid-write
+                self._apply(rec)
+
+    def _apply(self, rec: dict):
+        """Latest record wins; payload fields carry over within one attempt."""
+        prev = self._entries.get(rec["file_id"])
+        if (prev is not None and rec.get("md5") == prev.get("md5")
+                and _STAGE_ORDER[rec["stage"]] > _STAGE_ORDER[prev["stage"]]):
+            merged = dict(prev)
+            merged.update(rec)
+            rec = merged
+        self._entries[rec["file_id"]] = rec
+
+    def record(self, file_id: str, stage: str, md5: Optional[str] = None, **data):
+        """Append a stage-completion record and fsync it."""
+        rec = {
+            "file_id": file_id,
+            "stage": stage,
+            "md5": md5,
+            "ts": datetime.now(timezone.utc).isoformat(),
+            **data,
+        }
+        line = json.dumps(rec, default=str)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._apply(rec)
+        if stage == STAGE_ANALYSED or stage in _TERMINAL_STAGES:
+            self._payload_path(file_id).unlink(missing_ok=True)  # no longer needed
+
+    def _payload_path(self, file_id: str) -> Path:
+        return self._payload_dir / f"{file_id}.b64"
+
+    def save_payload(self, file_id: str, image_b64: str):
+        """Spool an encoded image so a restart can skip download + encode."""
+        tmp = self._payload_path(file_id).with_suffix(".tmp")
+        tmp.write_text(image_b64, encoding="ascii")
+        os.replace(tmp, self._payload_path(file_id))
+
+    def load_payload(self, file_id: str) -> Optional[str]:
+        path = self._payload_path(file_id)
+        return path.read_text(encoding="ascii") if path.exists() else None
+
+    def resume_point(self, file_info: dict) -> Optional[dict]:
+        """Latest journal entry for a file, or None if it must start over.
+
+        Returns None when the file's md5Checksum no longer matches the
+        journal (edited since), or when the stage's payload is missing.
+        """
+        with self._lock:
+            entry = self._entries.get(file_info["id"])
+        if entry is None:
+            return None
+        md5 = file_info.get("md5Checksum")
+        if md5 and entry.get("md5") and md5 != entry["md5"]:
+            return None
+        if entry["stage"] == STAGE_ENCODED and not self._payload_path(file_info["id"]).exists():
+            return None
+        if entry["stage"] == STAGE_DOWNLOADED or entry["stage"] in _TERMINAL_STAGES:
+            return None  # raw bytes are not spooled / already in the DB / gave up
+        return entry
+
+    def pending_count(self) -> int:
+        """Files with a journaled stage short of persisted or failed."""
+        with self._lock:
+            return sum(1 for e in self._entries.values() if e["stage"] not in _TERMINAL_STAGES)
+
+    def compact(self, max_age: timedelta = MAX_ENTRY_AGE):
+        """Rewrite the journal keeping only unfinished files younger than
+        `max_age`, and delete every payload no kept entry needs."""
+        cutoff = datetime.now(timezone.utc) - max_age
+        with self._lock:
+            keep = {
+                k: v for k, v in self._entries.items()
+                if v["stage"] not in _TERMINAL_STAGES
+                and datetime.fromisoformat(v["ts"]) >= cutoff
+            }
+            for path in self._payload_dir.iterdir():
+                entry = keep.get(path.stem)
+                if entry is None or entry["stage"] != STAGE_ENCODED or path.suffix != ".b64":
+                    path.unlink(missing_ok=True)
+            self._fh.close()
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                for rec in keep.values():
+                    fh.write(json.dumps(rec, default=str) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, self.path)
+            self._entries = keep
+            self._fh = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        """Close the journal and release the run lock."""
+        with self._lock:
+            self._fh.close()
+            if not self._lock_fh.closed:
+                _unlock_file(self._lock_fh)
+                self._lock_fh.close()
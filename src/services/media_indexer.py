@@ -1,28 +1,86 @@
 """
 Media Indexer — orchestrates Drive → Vision → Supabase pipeline.
 Handles both images and videos, with dedup, error handling, and rate limiting.
+
+`run_indexer` is a staged pipeline: each stage (Drive download, decode/encode,
+Claude analysis, DB write) has its own bounded worker pool, connected by
+bounded queues so memory stays capped while stages overlap. Claude calls are
+paced by the shared token bucket in `src.services.rate_limiter`.
 """
+import base64
+import hashlib
 import json
+import os
+import queue
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
+
+import anthropic
 
-from src.database import get_supabase, TABLE_MEDIA_LIBRARY
+from src.database import get_supabase, TABLE_MEDIA_LIBRARY, TABLE_INDEXER_STATE
 from src.services.google_drive import (
+    DRIVE_BATCH_SIZE,
+    MEDIA_MIMES,
     list_media_files,
+    iter_media_files,
     download_file_bytes,
+    download_to_temp_file,
     classify_media_type,
+    get_changes_start_token,
+    list_changes,
+    prefetch_folders,
+    resolve_path_under,
+)
+from src.services.index_journal import (
+    IndexJournal,
+    STAGE_ANALYSED,
+    STAGE_DOWNLOADED,
+    STAGE_ENCODED,
+    STAGE_FAILED,
+    STAGE_PERSISTED,
+)
+from src.services.media_writer import get_media_writer
+from src.services.rate_limiter import (
+    DEFAULT_MAX_RPS,
+    configure_claude_limiter,
+)
+from src.services.thumbnail_store import (
+    backfill_thumbnails as backfill_thumbnails_for,
+    drive_thumbnail_links,
+    store_thumbnails,
+)
+from src.services.vision_cache import get_vision_cache
+from src.services.vision_analyzer import (
+    analyze_image,
+    analyze_images_batch,
+    build_image_request,
+    parse_analysis,
+    MODEL,
 )
-from src.services.vision_analyzer import analyze_image, MODEL
-from src.services.video_analyzer import analyze_video
-from src.utils import encode_image_bytes, get_aspect_ratio
+from src.services.video_analyzer import (
+    analyze_prepared_video,
+    analyze_video,
+    prepare_video_in_pool,
+)
+from src.utils import image_max_dim, prepare_image
+
+
+# Pipeline concurrency
+DEFAULT_WORKERS = 4
 
+# indexer_state key holding the Drive Changes feed position
+STATE_CHANGES_TOKEN = "drive_changes_page_token"
 
-# Rate limiting
-DELAY_BETWEEN_CALLS = 1.5  # seconds between Claude API calls
-MAX_RETRIES = 3
-RETRY_BASE_DELAY = 5  # seconds, exponential backoff
+# Message Batches API (bulk re-index at half price, no per-request rate limits)
+STATE_PENDING_BATCH = "message_batch_pending"
+BATCH_POLL_INTERVAL = 30  # seconds between batch status checks
+MAX_BATCH_BYTES = 200 * 1024 * 1024  # API limit is 256 MB per batch
+MAX_BATCH_REQUESTS = 100_000
 
 
 def get_indexed_file_ids() -> set[str]:
@@ -52,56 +110,177 @@ def _upsert_media(data: dict):
     ).execute()
 
 
-def _call_with_retry(fn, *args, **kwargs):
-    """Call a function with exponential backoff on rate limit errors."""
-    for attempt in range(MAX_RETRIES):
-        try:
-            return fn(*args, **kwargs)
-        except Exception as e:
-            error_str = str(e).lower()
-            if "429" in error_str or "rate" in error_str or "overloaded" in error_str:
-                delay = RETRY_BASE_DELAY * (2 ** attempt)
-                print(f"    Rate limited, retrying in {delay}s (attempt {attempt + 1}/{MAX_RETRIES})...")
-                time.sleep(delay)
-            else:
-                raise
-    # Final attempt without catch
-    return fn(*args, **kwargs)
+def _load_state(key: str) -> Optional[dict]:
+    """Read a value from the indexer_state key/value table."""
+    client = get_supabase()
+    result = (
+        client.table(TABLE_INDEXER_STATE)
+        .select("value")
+        .eq("key", key)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0]["value"] if result.data else None
 
 
-def process_image(file_info: dict, dry_run: bool = False) -> dict:
-    """Process a single image: download, analyze, store."""
-    file_id = file_info["id"]
-    file_name = file_info["name"]
-    mime_type = file_info.get("mimeType", "image/jpeg")
-    file_size = int(file_info.get("size", 0))
+def _save_state(key: str, value: dict):
+    """Write a value to the indexer_state key/value table."""
+    client = get_supabase()
+    client.table(TABLE_INDEXER_STATE).upsert({
+        "key": key,
+        "value": value,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }, on_conflict="key").execute()
 
-    # Download
-    image_bytes = download_file_bytes(file_id)
 
-    # Encode + get aspect ratio
-    image_b64 = encode_image_bytes(image_bytes, mime_type)
-    aspect_ratio = get_aspect_ratio(image_bytes)
+def _fetch_rows_by_file_ids(file_ids: list[str], columns: str) -> dict[str, dict]:
+    """Fetch media_library rows for the given drive_file_ids, keyed by id."""
+    client = get_supabase()
+    rows = {}
+    for i in range(0, len(file_ids), 200):
+        chunk = file_ids[i:i + 200]
+        result = (
+            client.table(TABLE_MEDIA_LIBRARY)
+            .select(columns)
+            .in_("drive_file_id", chunk)
+            .execute()
+        )
+        for row in result.data:
+            rows[row["drive_file_id"]] = row
+    return rows
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+# Columns copied from an already-analysed row when identical bytes are found
+_ANALYSIS_COLUMNS = (
+    "media_type", "category", "subcategory", "ambiance", "season", "elements",
+    "ig_quality", "aspect_ratio", "description_fr", "description_en",
+    "duration_seconds", "scenes", "analysis_raw", "analysis_model", "analyzed_at",
+    "thumbnails", "video_probe",
+)
+
+
+def _find_analyzed_by_md5(md5s: list[str]) -> dict[str, dict]:
+    """Return {md5_checksum: analysed row} for hashes already in media_library."""
+    md5s = sorted({m for m in md5s if m})
+    client = get_supabase()
+    found = {}
+    for i in range(0, len(md5s), 200):
+        chunk = md5s[i:i + 200]
+        result = (
+            client.table(TABLE_MEDIA_LIBRARY)
+            .select("drive_file_id, md5_checksum, " + ", ".join(_ANALYSIS_COLUMNS))
+            .in_("md5_checksum", chunk)
+            .eq("status", "analyzed")
+            .execute()
+        )
+        for row in result.data:
+            found.setdefault(row["md5_checksum"], row)
+    return found
+
+
+def _clone_analysis_row(source: dict, file_info: dict, md5_checksum: str) -> dict:
+    """Build a row for file_info that reuses source's analysis (identical bytes)."""
+    row = {col: source.get(col) for col in _ANALYSIS_COLUMNS}
+    row.update({
+        "drive_file_id": file_info["id"],
+        "file_name": file_info["name"],
+        "file_path": file_info.get("_path"),
+        "mime_type": file_info.get("mimeType"),
+        "file_size_bytes": int(file_info.get("size", 0)),
+        "md5_checksum": md5_checksum,
+        "status": "analyzed",
+    })
+    if file_info.get("modifiedTime"):
+        row["drive_modified_time"] = file_info["modifiedTime"]
+    return row
+
+
+def backfill_md5_checksums(files: list[dict]) -> int:
+    """Store Drive md5Checksum on indexed rows that don't have one yet.
+
+    Only touches rows with a NULL md5_checksum, so after the first full scan
+    this is a single cheap query. Returns the number of rows updated.
+    """
+    by_id = {f["id"]: f["md5Checksum"] for f in files if f.get("md5Checksum")}
+    client = get_supabase()
+    result = (
+        client.table(TABLE_MEDIA_LIBRARY)
+        .select("drive_file_id")
+        .is_("md5_checksum", "null")
+        .execute()
+    )
+    updated = 0
+    for row in result.data:
+        md5 = by_id.get(row["drive_file_id"])
+        if md5:
+            client.table(TABLE_MEDIA_LIBRARY).update(
+                {"md5_checksum": md5}
+            ).eq("drive_file_id", row["drive_file_id"]).execute()
+            updated += 1
+    return updated
 
-    if dry_run:
-        return {
-            "drive_file_id": file_id,
-            "file_name": file_name,
-            "status": "dry_run",
-            "aspect_ratio": aspect_ratio,
-        }
 
-    # Analyze with Claude
-    analysis = _call_with_retry(analyze_image, image_b64)
-    raw_data = analysis.model_dump()
+def backfill_thumbnails(limit: Optional[int] = None, workers: int = DEFAULT_WORKERS) -> dict:
+    """Build thumbnails for analysed rows indexed before they existed.
 
-    # Build row
+    Sources are Drive's own thumbnails (or the original), so this costs no
+    Claude calls. Returns stats {processed, errors}.
+    """
+    query = (
+        get_supabase()
+        .table(TABLE_MEDIA_LIBRARY)
+        .select("drive_file_id, file_name")
+        .eq("status", "analyzed")
+        .is_("thumbnails", "null")
+    )
+    if limit:
+        query = query.limit(limit)
+    rows = query.execute().data
+    print(f"Backfilling thumbnails for {len(rows)} media")
+    stats = {"processed": 0, "errors": 0}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="thumbs") as pool:
+        futures = {}
+        for start in range(0, len(rows), DRIVE_BATCH_SIZE):
+            chunk = rows[start:start + DRIVE_BATCH_SIZE]
+            links = drive_thumbnail_links([r["drive_file_id"] for r in chunk])
+            for r in chunk:
+                fid = r["drive_file_id"]
+                futures[pool.submit(backfill_thumbnails_for, fid, links.get(fid) or "")] = r
+        for i, fut in enumerate(as_completed(futures), 1):
+            row = futures[fut]
+            ok = fut.result() is not None
+            stats["processed" if ok else "errors"] += 1
+            print(f"[{i}/{len(rows)}] {row['file_name']} -> {'OK' if ok else 'FAILED'}")
+    return stats
+
+
+def _build_image_row(
+    drive_file_id: str,
+    file_name: str,
+    mime_type: str,
+    file_size_bytes: int,
+    analysis,
+    aspect_ratio: str,
+    file_path: Optional[str] = None,
+    drive_modified_time: Optional[str] = None,
+    md5_checksum: Optional[str] = None,
+    thumbnails: Optional[dict] = None,
+) -> dict:
+    """Build a media_library row from a VisionAnalysis."""
     row = {
-        "drive_file_id": file_id,
+        "drive_file_id": drive_file_id,
         "file_name": file_name,
-        "file_path": file_info.get("_path"),
         "mime_type": mime_type,
-        "file_size_bytes": file_size,
+        "file_size_bytes": file_size_bytes,
         "media_type": "image",
         "category": analysis.category,
         "subcategory": analysis.subcategory,
@@ -112,44 +291,39 @@ def process_image(file_info: dict, dry_run: bool = False) -> dict:
         "aspect_ratio": aspect_ratio,
         "description_fr": analysis.description_fr,
         "description_en": analysis.description_en,
-        "analysis_raw": raw_data,
+        "analysis_raw": analysis.model_dump(),
         "analysis_model": MODEL,
         "analyzed_at": datetime.now(timezone.utc).isoformat(),
         "status": "analyzed",
     }
-
-    _upsert_media(row)
+    if file_path is not None:
+        row["file_path"] = file_path
+    if drive_modified_time is not None:
+        row["drive_modified_time"] = drive_modified_time
+    if md5_checksum is not None:
+        row["md5_checksum"] = md5_checksum
+    if thumbnails:
+        row["thumbnails"] = thumbnails
     return row
 
 
-def process_video(file_info: dict, dry_run: bool = False) -> dict:
-    """Process a single video: download, detect scenes, analyze, store."""
-    file_id = file_info["id"]
-    file_name = file_info["name"]
-    mime_type = file_info.get("mimeType", "video/mp4")
-    file_size = int(file_info.get("size", 0))
-
-    # Download
-    video_bytes = download_file_bytes(file_id)
-
-    if dry_run:
-        return {
-            "drive_file_id": file_id,
-            "file_name": file_name,
-            "status": "dry_run",
-            "file_size_bytes": file_size,
-        }
-
-    # Full video analysis pipeline
-    result = _call_with_retry(analyze_video, video_bytes, file_name)
-
-    # Build row
+def _build_video_row(
+    drive_file_id: str,
+    file_name: str,
+    mime_type: str,
+    file_size_bytes: int,
+    result: dict,
+    file_path: Optional[str] = None,
+    drive_modified_time: Optional[str] = None,
+    md5_checksum: Optional[str] = None,
+    thumbnails: Optional[dict] = None,
+) -> dict:
+    """Build a media_library row from an analyze_video() result."""
     row = {
-        "drive_file_id": file_id,
+        "drive_file_id": drive_file_id,
         "file_name": file_name,
-        "file_path": file_info.get("_path"),
         "mime_type": mime_type,
-        "file_size_bytes": file_size,
+        "file_size_bytes": file_size_bytes,
         "media_type": "video",
         "category": result.get("category"),
         "subcategory": result.get("subcategory"),
@@ -167,11 +341,407 @@ def process_video(file_info: dict, dry_run: bool = False) -> dict:
         "analyzed_at": datetime.now(timezone.utc).isoformat(),
         "status": "analyzed",
     }
-
-    _upsert_media(row)
+    if file_path is not None:
+        row["file_path"] = file_path
+    if drive_modified_time is not None:
+        row["drive_modified_time"] = drive_modified_time
+    if md5_checksum is not None:
+        row["md5_checksum"] = md5_checksum
+    if result.get("video_probe"):
+        row["video_probe"] = {**result["video_probe"], "md5": md5_checksum}
+    if thumbnails:
+        row["thumbnails"] = thumbnails
     return row
 
 
+def _build_error_row(file_info: dict, media_type: Optional[str], exc: Exception) -> dict:
+    """Build the status='error' row saved when a file fails to index."""
+    return {
+        "drive_file_id": file_info["id"],
+        "file_name": file_info["name"],
+        "file_path": file_info.get("_path"),
+        "mime_type": file_info.get("mimeType", ""),
+        "file_size_bytes": int(file_info.get("size", 0)),
+        "media_type": media_type or "image",
+        "status": "error",
+        "error_message": f"{type(exc).__name__}: {exc}",
+    }
+
+
+# ---------------------------------------------------------------------------
+# Pipeline stages — each takes and returns an _IndexJob
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _IndexJob:
+    """One file travelling through the indexing pipeline."""
+    file_info: dict
+    media_type: str
+    data: Optional[bytes] = None
+    video_path: Optional[str] = None  # videos are streamed to a temp file, not held in memory
+    video: Optional[dict] = None  # prepare_video() output: scenes + encoded keyframes
+    image_b64: Optional[str] = None
+    aspect_ratio: Optional[str] = None
+    thumbnails: Optional[dict] = None  # thumbnail_store paths by size
+    row: Optional[dict] = None
+    cloned_from: Optional[str] = None
+    resumed: bool = False
+    error: Optional[Exception] = None
+
+
+def _stage_download(job: _IndexJob, journal: Optional[IndexJournal] = None) -> _IndexJob:
+    """Download the original (videos go to a temp file, large ones as parallel
+    byte ranges, md5-verified). If Drive gave no
+    md5Checksum, hash the bytes and reuse an existing analysis of identical
+    content when there is one."""
+    if job.media_type == "video":
+        suffix = os.path.splitext(job.file_info["name"])[1] or ".mp4"
+        size = job.file_info.get("size")
+        job.video_path, md5 = download_to_temp_file(
+            job.file_info["id"], suffix, int(size) if size else None, job.file_info.get("md5Checksum"),
+        )
+    else:
+        job.data = download_file_bytes(
+            job.file_info["id"], job.file_info.get("md5Checksum"), job.file_info.get("modifiedTime"),
+        )
+        md5 = None
+    if not job.file_info.get("md5Checksum"):
+        md5 = md5 or hashlib.md5(job.data).hexdigest()
+        job.file_info["md5Checksum"] = md5
+        source = _find_analyzed_by_md5([md5]).get(md5)
+        if source is not None:
+            job.row = _clone_analysis_row(source, job.file_info, md5)
+            job.cloned_from = source["drive_file_id"]
+            _release_job_data(job)
+    if journal is not None:
+        journal.record(job.file_info["id"], STAGE_DOWNLOADED, job.file_info.get("md5Checksum"))
+    return job
+
+
+def _release_job_data(job: _IndexJob):
+    """Drop downloaded bytes and delete the video temp file, if any."""
+    job.data = None
+    if job.video_path is not None:
+        try:
+            os.unlink(job.video_path)
+        except OSError:
+            pass
+        job.video_path = None
+
+
+def _make_thumbnails(drive_file_id: str, jpeg_b64: Optional[str]) -> Optional[dict]:
+    """Store WebP thumbnails from an already-resized JPEG. Best effort — a
+    failure never fails indexing (pages backfill missing thumbnails)."""
+    if not jpeg_b64:
+        return None
+    try:
+        return store_thumbnails(drive_file_id, base64.b64decode(jpeg_b64))
+    except Exception:
+        return None
+
+
+def _stage_prepare(
+    job: _IndexJob,
+    journal: Optional[IndexJournal] = None,
+    thumbnails: bool = True,
+    dry_run: bool = False,
+) -> _IndexJob:
+    """Decode + resize + base64 images. Videos are decoded, scene-split and
+    keyframe-encoded in the video process pool; the temp file goes once done.
+    Thumbnails are made from the resized image (videos: first keyframe).
+    A dry run leaves videos alone — its row needs none of that work."""
+    if dry_run and job.media_type == "video":
+        return job
+    if job.row is None and job.media_type == "video" and job.video_path is not None:
+        job.video = prepare_video_in_pool(job.video_path)
+        _release_job_data(job)
+        if thumbnails:
+            first = next((frames[0] for frames in job.video["frames"] if frames), None)
+            job.thumbnails = _make_thumbnails(job.file_info["id"], first)
+    elif job.row is None and job.media_type == "image":
+        prepared = prepare_image(job.data, image_max_dim("tagging"))
+        job.image_b64 = prepared.b64
+        job.aspect_ratio = prepared.aspect_ratio
+        job.data = None  # free the original bytes early
+        if thumbnails:
+            job.thumbnails = _make_thumbnails(job.file_info["id"], job.image_b64)
+        if journal is not None:
+            file_id = job.file_info["id"]
+            journal.save_payload(file_id, job.image_b64)
+            journal.record(file_id, STAGE_ENCODED, job.file_info.get("md5Checksum"),
+                           aspect_ratio=job.aspect_ratio)
+    return job
+
+
+def _stage_analyze(
+    job: _IndexJob,
+    dry_run: bool = False,
+    journal: Optional[IndexJournal] = None,
+    multi_scene: bool = False,
+) -> _IndexJob:
+    """Call Claude (rate limited) and build the media_library row.
+
+    The row is journaled right after the call, before anything else can fail,
+    so a crash never costs the same analysis twice.
+    """
+    if job.row is not None:  # cloned or resumed from the journal — nothing to analyse
+        return job
+    info = job.file_info
+    file_size = int(info.get("size", 0))
+
+    if dry_run:
+        job.row = {
+            "drive_file_id": info["id"],
+            "file_name": info["name"],
+            "status": "dry_run",
+        }
+        if job.media_type == "image":
+            job.row["aspect_ratio"] = job.aspect_ratio
+        else:
+            job.row["file_size_bytes"] = file_size
+            _release_job_data(job)
+        return job
+
+    if job.media_type == "image":
+        analysis = analyze_image(job.image_b64)
+        _set_image_row(job, analysis)
+    else:
+        try:
+            # Scene calls are rate limited + retried individually
+            if job.video is not None:
+                result = analyze_prepared_video(job.video, info["name"], multi_scene=multi_scene)
+            else:
+                result = analyze_video(job.video_path or job.data, info["name"], multi_scene=multi_scene)
+        finally:
+            job.video = None
+            _release_job_data(job)
+        job.row = _build_video_row(
+            info["id"], info["name"], info.get("mimeType", "video/mp4"),
+            file_size, result, file_path=info.get("_path"),
+            drive_modified_time=info.get("modifiedTime"),
+            md5_checksum=info.get("md5Checksum"), thumbnails=job.thumbnails,
+        )
+    if journal is not None:
+        journal.record(info["id"], STAGE_ANALYSED, info.get("md5Checksum"), row=job.row)
+    return job
+
+
+def _set_image_row(job: _IndexJob, analysis):
+    info = job.file_info
+    job.row = _build_image_row(
+        info["id"], info["name"], info.get("mimeType", "image/jpeg"),
+        int(info.get("size", 0)), analysis, job.aspect_ratio, file_path=info.get("_path"),
+        drive_modified_time=info.get("modifiedTime"),
+        md5_checksum=info.get("md5Checksum"), thumbnails=job.thumbnails,
+    )
+
+
+def _stage_analyze_batch(
+    jobs: list[_IndexJob],
+    dry_run: bool = False,
+    journal: Optional[IndexJournal] = None,
+    multi_scene: bool = False,
+):
+    """Analyze jobs that queued up together: images still needing Claude share
+    analyze_images_batch requests; the rest go through _stage_analyze.
+
+    If the batched call fails outright, each image falls back to its own call.
+    Errors are recorded per job.
+    """
+    images = [j for j in jobs if j.row is None and j.media_type == "image" and not dry_run]
+    if len(images) > 1:
+        try:
+            analyses = analyze_images_batch(
+                [j.image_b64 for j in images], max_per_request=len(images),
+            )
+        except Exception:
+            analyses = None  # single calls below
+        if analyses is not None:
+            for job, analysis in zip(images, analyses):
+                _set_image_row(job, analysis)
+                if journal is not None:
+                    journal.record(job.file_info["id"], STAGE_ANALYSED,
+                                   job.file_info.get("md5Checksum"), row=job.row)
+    for job in jobs:
+        try:
+            _stage_analyze(job, dry_run=dry_run, journal=journal, multi_scene=multi_scene)
+        except Exception as e:
+            job.error = e
+            _release_job_data(job)
+
+
+_STAGE_DONE = object()
+
+
+def _start_stage(
+    name: str,
+    fn: Callable[[_IndexJob], _IndexJob],
+    inbox: queue.Queue,
+    outbox: queue.Queue,
+    workers: int,
+    batch_fn: Optional[Callable[[list[_IndexJob]], None]] = None,
+    batch_size: int = 1,
+) -> list[threading.Thread]:
+    """Start `workers` threads that apply `fn` to jobs from inbox → outbox.
+
+    Jobs that already carry an error skip `fn` and flow through to the
+    persist stage. When the last worker sees the end-of-input
+    marker, it forwards a single marker downstream.
+
+    With `batch_fn`, a worker also takes up to `batch_size - 1` more jobs
+    already waiting in the inbox (it never waits for them) and hands them
+    to `batch_fn` together; `batch_fn` updates the jobs in place.
+    """
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def _take() -> list:
+        batch = [inbox.get()]
+        while batch_fn is not None and len(batch) < batch_size and batch[-1] is not _STAGE_DONE:
+            try:
+                batch.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _apply(jobs: list[_IndexJob]):
+        if batch_fn is not None and len(jobs) > 1:
+            try:
+                batch_fn(jobs)
+            except Exception as e:
+                for job in jobs:
+                    job.error = e
+                    _release_job_data(job)
+            return
+        for job in jobs:
+            try:
+                fn(job)
+            except Exception as e:
+                job.error = e
+                _release_job_data(job)
+
+    def _worker():
+        while True:
+            batch = _take()
+            done = batch[-1] is _STAGE_DONE
+            if done:
+                batch.pop()
+            _apply([job for job in batch if job.error is None])
+            for job in batch:
+                outbox.put(job)
+            if done:
+                inbox.put(_STAGE_DONE)  # let sibling workers see it too
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    outbox.put(_STAGE_DONE)
+                return
+
+    threads = [
+        threading.Thread(target=_worker, name=f"indexer-{name}-{i}", daemon=True)
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def _start_persist_worker(
+    inbox: queue.Queue,
+    outbox: queue.Queue,
+    dry_run: bool = False,
+    journal: Optional[IndexJournal] = None,
+    writer=None,
+) -> threading.Thread:
+    """Hand analysed rows (or error rows) to the shared write-behind buffer.
+
+    A job moves on to `outbox` only once its row is actually written, so the
+    journal's `persisted` mark and the printed status reflect the DB. Jobs
+    that failed upstream are journaled as `failed`. A failed write of a
+    journaled analysis writes no error row: the file stays pending, and the
+    next run persists the paid result from the journal. The end-of-input
+    marker forces a final flush and is always forwarded, even if a job
+    blows up here.
+    """
+    writer = writer or get_media_writer()
+
+    def _error_row(job: _IndexJob):
+        writer.add(_build_error_row(job.file_info, job.media_type, job.error))
+
+    def _has_journaled_analysis(job: _IndexJob) -> bool:
+        entry = journal.resume_point(job.file_info) if journal is not None else None
+        return entry is not None and entry["stage"] == STAGE_ANALYSED
+
+    def _persist(job: _IndexJob):
+        if job.error is not None:
+            _error_row(job)
+            if journal is not None:
+                journal.record(job.file_info["id"], STAGE_FAILED,
+                               job.file_info.get("md5Checksum"), error=str(job.error))
+            outbox.put(job)
+            return
+        if dry_run:
+            outbox.put(job)
+            return
+
+        def _on_written(exc, job=job):
+            try:
+                if exc is None:
+                    if journal is not None:
+                        journal.record(job.file_info["id"], STAGE_PERSISTED,
+                                       job.file_info.get("md5Checksum"))
+                else:
+                    job.error = exc
+                    if not _has_journaled_analysis(job):
+                        _error_row(job)
+            finally:
+                outbox.put(job)
+
+        writer.add(job.row, on_done=_on_written)
+
+    def _worker():
+        try:
+            while True:
+                job = inbox.get()
+                if job is _STAGE_DONE:
+                    writer.flush()
+                    return
+                try:
+                    _persist(job)
+                except Exception as e:
+                    print(f"  ERROR persisting {job.file_info['name']}: {e}")
+                    job.error = job.error or e
+                    outbox.put(job)
+        finally:
+            outbox.put(_STAGE_DONE)
+
+    thread = threading.Thread(target=_worker, name="indexer-persist", daemon=True)
+    thread.start()
+    return thread
+
+
+def process_image(file_info: dict, dry_run: bool = False) -> dict:
+    """Process a single image: download, analyze, store."""
+    job = _IndexJob(file_info=file_info, media_type="image")
+    job = _stage_download(job)
+    job = _stage_prepare(job, thumbnails=not dry_run, dry_run=dry_run)
+    job = _stage_analyze(job, dry_run=dry_run)
+    if not dry_run:
+        _upsert_media(job.row)
+    return job.row
+
+
+def process_video(file_info: dict, dry_run: bool = False) -> dict:
+    """Process a single video: download, detect scenes, analyze, store."""
+    job = _IndexJob(file_info=file_info, media_type="video")
+    job = _stage_download(job)
+    job = _stage_analyze(job, dry_run=dry_run)
+    if not dry_run:
+        _upsert_media(job.row)
+    return job.row
+
+
 def process_image_bytes(
     image_bytes: bytes,
     filename: str,
@@ -181,34 +751,27 @@ def process_image_bytes(
 ) -> dict:
     """Analyze an image from raw bytes and upsert to media_library.
 
-    Used by the Upload Media page after uploading to Drive.
+    Used by the Upload Media page after uploading to Drive. The row is
+    written synchronously so a failed write surfaces to the caller.
     """
-    image_b64 = encode_image_bytes(image_bytes, mime_type)
-    aspect_ratio = get_aspect_ratio(image_bytes)
+    md5 = hashlib.md5(image_bytes).hexdigest()
+    source = _find_analyzed_by_md5([md5]).get(md5)
+    if source is not None:
+        row = _clone_analysis_row(source, {
+            "id": drive_file_id, "name": filename,
+            "mimeType": mime_type, "size": file_size_bytes,
+        }, md5)
+        _upsert_media(row)
+        return row
 
-    analysis = _call_with_retry(analyze_image, image_b64)
-    raw_data = analysis.model_dump()
+    prepared = prepare_image(image_bytes, image_max_dim("tagging"))
 
-    row = {
-        "drive_file_id": drive_file_id,
-        "file_name": filename,
-        "mime_type": mime_type,
-        "file_size_bytes": file_size_bytes,
-        "media_type": "image",
-        "category": analysis.category,
-        "subcategory": analysis.subcategory,
-        "ambiance": analysis.ambiance,
-        "season": analysis.season,
-        "elements": analysis.elements,
-        "ig_quality": analysis.ig_quality,
-        "aspect_ratio": aspect_ratio,
-        "description_fr": analysis.description_fr,
-        "description_en": analysis.description_en,
-        "analysis_raw": raw_data,
-        "analysis_model": MODEL,
-        "analyzed_at": datetime.now(timezone.utc).isoformat(),
-        "status": "analyzed",
-    }
+    analysis = analyze_image(prepared.b64)
+
+    row = _build_image_row(
+        drive_file_id, filename, mime_type, file_size_bytes, analysis, prepared.aspect_ratio,
+        md5_checksum=md5, thumbnails=_make_thumbnails(drive_file_id, prepared.b64),
+    )
     _upsert_media(row)
     return row
 
@@ -222,120 +785,733 @@ def process_video_bytes(
 ) -> dict:
     """Analyze a video from raw bytes and upsert to media_library.
 
-    Used by the Upload Media page after uploading to Drive.
+    Used by the Upload Media page after uploading to Drive. The row is
+    written synchronously so a failed write surfaces to the caller.
     """
-    result = _call_with_retry(analyze_video, video_bytes, filename)
+    md5 = hashlib.md5(video_bytes).hexdigest()
+    source = _find_analyzed_by_md5([md5]).get(md5)
+    if source is not None:
+        row = _clone_analysis_row(source, {
+            "id": drive_file_id, "name": filename,
+            "mimeType": mime_type, "size": file_size_bytes,
+        }, md5)
+        _upsert_media(row)
+        return row
 
-    row = {
-        "drive_file_id": drive_file_id,
-        "file_name": filename,
-        "mime_type": mime_type,
-        "file_size_bytes": file_size_bytes,
-        "media_type": "video",
-        "category": result.get("category"),
-        "subcategory": result.get("subcategory"),
-        "ambiance": result.get("ambiance", []),
-        "season": result.get("season", []),
-        "elements": result.get("elements", []),
-        "ig_quality": result.get("ig_quality"),
-        "aspect_ratio": result.get("aspect_ratio"),
-        "description_fr": result.get("description_fr"),
-        "description_en": result.get("description_en"),
-        "duration_seconds": result.get("duration_seconds"),
-        "scenes": result.get("scenes"),
-        "analysis_raw": result.get("analysis_raw"),
-        "analysis_model": result.get("analysis_model", MODEL),
-        "analyzed_at": datetime.now(timezone.utc).isoformat(),
-        "status": "analyzed",
-    }
+    result = analyze_video(video_bytes, filename)
+
+    row = _build_video_row(
+        drive_file_id, filename, mime_type, file_size_bytes, result, md5_checksum=md5,
+    )
     _upsert_media(row)
     return row
 
 
-def run_indexer(
+def _list_pending(
     folder_id: Optional[str] = None,
     limit: Optional[int] = None,
     dry_run: bool = False,
     reindex_errors: bool = False,
-):
-    """
-    Main indexer loop: list files, skip already-indexed, process each.
-    Yields progress dicts for each file processed.
-    """
+    reindex_all: bool = False,
+) -> list[dict]:
+    """List Drive media and keep the files that need (re-)analysis."""
     print("Listing media files from Google Drive...")
     all_files = list_media_files(folder_id)
     print(f"Found {len(all_files)} media files")
 
+    if not dry_run:
+        backfilled = backfill_md5_checksums(all_files)
+        if backfilled:
+            print(f"Recorded md5Checksum on {backfilled} existing rows")
+
     # Dedup
-    indexed_ids = get_indexed_file_ids()
-    if reindex_errors:
-        error_ids = get_error_file_ids()
-        to_process = [
-            f for f in all_files
-            if f["id"] not in indexed_ids or f["id"] in error_ids
-        ]
-        print(f"Reindexing {len(error_ids)} error files + {len(to_process) - len(error_ids)} new files")
+    if reindex_all:
+        to_process = list(all_files)
+        print(f"Reindexing all {len(to_process)} files")
     else:
-        to_process = [f for f in all_files if f["id"] not in indexed_ids]
+        indexed_ids = get_indexed_file_ids()
+        if reindex_errors:
+            error_ids = get_error_file_ids()
+            to_process = [
+                f for f in all_files
+                if f["id"] not in indexed_ids or f["id"] in error_ids
+            ]
+            print(f"Reindexing {len(error_ids)} error files + {len(to_process) - len(error_ids)} new files")
+        else:
+            to_process = [f for f in all_files if f["id"] not in indexed_ids]
 
-    print(f"Already indexed: {len(indexed_ids)}, to process: {len(to_process)}")
+        print(f"Already indexed: {len(indexed_ids)}, to process: {len(to_process)}")
 
     if limit:
         to_process = to_process[:limit]
         print(f"Limited to {limit} files")
+    return to_process
 
-    total = len(to_process)
-    stats = {"processed": 0, "errors": 0, "images": 0, "videos": 0}
 
-    for i, file_info in enumerate(to_process, 1):
-        file_name = file_info["name"]
-        mime_type = file_info.get("mimeType", "")
-        media_type = classify_media_type(mime_type)
+def run_indexer(
+    folder_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+    reindex_errors: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    max_rps: float = DEFAULT_MAX_RPS,
+    multi_scene: bool = False,
+    vision_batch: int = 1,
+):
+    """
+    Main indexer: list files, skip already-indexed, then push each file through
+    the download → prepare → analyze → persist pipeline.
+
+    `workers` bounds the download, prepare and analyze pools (the DB writer is
+    a single thread; video decoding runs in a process pool sized to the
+    cores). `max_rps` caps Claude requests per second.
+    `multi_scene` packs short video scenes into shared requests (analyze_video).
+    `vision_batch` > 1 lets up to that many queued images share one Claude
+    request (analyze_images_batch).
+    Returns the stats dict: processed, errors, images, videos.
+    """
+    # Stream the listing into the pipeline: downloads start with the first page
+    print("Listing media files from Google Drive (streaming into the pipeline)...")
+    indexed_ids = get_indexed_file_ids()
+    error_ids = get_error_file_ids() if reindex_errors else set()
+    listed: list[dict] = []
+    pending = _iter_pending(iter_media_files(folder_id), indexed_ids, error_ids, limit, listed)
+    stats = _run_pipeline(
+        pending, dry_run=dry_run, workers=workers, max_rps=max_rps, multi_scene=multi_scene,
+        vision_batch=vision_batch,
+    )
+
+    print(f"Listed {len(listed)} media files, already indexed: {len(indexed_ids)}")
+    if not dry_run and listed:
+        backfilled = backfill_md5_checksums(listed)
+        if backfilled:
+            print(f"Recorded md5Checksum on {backfilled} existing rows")
+    return stats
+
+
+def _iter_pending(
+    files: Iterable[dict],
+    indexed_ids: set[str],
+    error_ids: set[str],
+    limit: Optional[int],
+    listed: list[dict],
+) -> Iterator[dict]:
+    """Yield listed files that need analysis; every listed file is appended to `listed`."""
+    yielded = 0
+    for f in files:
+        listed.append(f)
+        if f["id"] in indexed_ids and f["id"] not in error_ids:
+            continue
+        yield f
+        yielded += 1
+        if limit and yielded >= limit:
+            print(f"Limited to {limit} files")
+            return
+
+
+def _run_pipeline(
+    to_process: Iterable[dict],
+    dry_run: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    max_rps: float = DEFAULT_MAX_RPS,
+    multi_scene: bool = False,
+    vision_batch: int = 1,
+    writer=None,
+) -> dict:
+    """Push files through download → prepare → analyze → persist. Returns stats.
+
+    `to_process` may be a lazy iterable (e.g. a streaming Drive listing); the
+    total is then only known once it is exhausted. `writer` replaces the
+    shared media_library writer.
+    """
+    total = len(to_process) if isinstance(to_process, list) else None
+    stats = {"processed": 0, "errors": 0, "images": 0, "videos": 0, "cloned": 0, "resumed": 0}
+    if total == 0:
+        return stats
+
+    workers = max(1, workers)
+    configure_claude_limiter(max_rps)
+    print(f"Pipeline: {workers} workers/stage, max {max_rps} Claude req/s")
 
-        print(f"[{i}/{total}] {media_type}: {file_name}", end=" ", flush=True)
+    # Bounded queues between stages — backpressure keeps downloaded bytes capped
+    q_download: queue.Queue = queue.Queue(maxsize=workers * 2)
+    q_prepare: queue.Queue = queue.Queue(maxsize=workers * 2)
+    q_analyze: queue.Queue = queue.Queue(maxsize=max(workers * 2, vision_batch))
+    q_persist: queue.Queue = queue.Queue(maxsize=workers * 2)
+    q_done: queue.Queue = queue.Queue()
 
+    journal = None if dry_run else IndexJournal()
+    if journal is not None and journal.pending_count():
+        print(f"Journal: {journal.pending_count()} files from an interrupted run can resume")
+
+    threads = []
+    threads += _start_stage(
+        "download", lambda j: _stage_download(j, journal=journal), q_download, q_prepare, workers,
+    )
+    # Video preprocessing runs in a process pool; these threads just feed it
+    threads += _start_stage(
+        "prepare",
+        lambda j: _stage_prepare(j, journal=journal, thumbnails=not dry_run, dry_run=dry_run),
+        q_prepare, q_analyze, workers,
+    )
+    threads += _start_stage(
+        "analyze",
+        lambda j: _stage_analyze(j, dry_run=dry_run, journal=journal, multi_scene=multi_scene),
+        q_analyze, q_persist, workers,
+        batch_fn=(lambda jobs: _stage_analyze_batch(
+            jobs, dry_run=dry_run, journal=journal, multi_scene=multi_scene,
+        )) if vision_batch > 1 else None,
+        batch_size=vision_batch,
+    )
+    threads.append(_start_persist_worker(
+        q_persist, q_done, dry_run=dry_run, journal=journal, writer=writer,
+    ))
+
+    # Identical bytes already analysed under another drive_file_id → clone, skip Claude.
+    # Looked up in chunks as files arrive, so a streaming listing isn't drained first.
+    known_hashes: dict[str, dict] = {}
+    feed_error: list[Exception] = []
+
+    def _chunks(files: Iterable[dict], size: int = 50) -> Iterator[list[dict]]:
+        chunk = []
+        for f in files:
+            chunk.append(f)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _feed():
         try:
-            if media_type == "image":
-                result = process_image(file_info, dry_run=dry_run)
-                stats["images"] += 1
-            elif media_type == "video":
-                result = process_video(file_info, dry_run=dry_run)
-                stats["videos"] += 1
-            else:
-                print("SKIP (unsupported)")
-                continue
+            for chunk in _chunks(to_process):
+                known_hashes.update(_find_analyzed_by_md5(
+                    [f.get("md5Checksum") for f in chunk if f.get("md5Checksum") not in known_hashes]
+                ))
+                for file_info in chunk:
+                    _route(file_info)
+        except Exception as e:
+            feed_error.append(e)  # re-raised once in-flight files are persisted
+        finally:
+            q_download.put(_STAGE_DONE)
 
+    def _route(file_info: dict):
+        media_type = classify_media_type(file_info.get("mimeType", ""))
+        if media_type is None:
+            q_done.put(_IndexJob(file_info=file_info, media_type=""))
+            return
+        job = _IndexJob(file_info=file_info, media_type=media_type)
+        source = known_hashes.get(file_info.get("md5Checksum"))
+        if source is not None:
+            job.row = _clone_analysis_row(source, file_info, file_info["md5Checksum"])
+            job.cloned_from = source["drive_file_id"]
+            q_persist.put(job)
+            return
+        # Resume from the journal: skip stages an interrupted run already paid for
+        entry = journal.resume_point(file_info) if journal is not None else None
+        if entry is not None and entry["stage"] == STAGE_ANALYSED:
+            job.row = entry["row"]
+            job.resumed = True
+            q_persist.put(job)
+            return
+        if entry is not None and entry["stage"] == STAGE_ENCODED:
+            job.image_b64 = journal.load_payload(file_info["id"])
+            job.aspect_ratio = entry.get("aspect_ratio")
+            if job.image_b64 is not None:
+                job.resumed = True
+                q_analyze.put(job)
+                return
+        q_download.put(job)
+
+    feeder = threading.Thread(target=_feed, name="indexer-feed", daemon=True)
+    feeder.start()
+
+    # Collect results as they complete (completion order, not listing order)
+    i = 0
+    while True:
+        job = q_done.get()
+        if job is _STAGE_DONE:
+            break
+        i += 1
+        file_name = job.file_info["name"]
+        print(f"[{i}/{total or '?'}] {job.media_type or '?'}: {file_name}", end=" ", flush=True)
+
+        if not job.media_type:
+            print("SKIP (unsupported)")
+        elif job.error is not None:
+            print(f"ERROR: {job.error}")
+            stats["errors"] += 1
+        else:
+            stats["images" if job.media_type == "image" else "videos"] += 1
+            result = job.row or {}
             status = result.get("status", "?")
             quality = result.get("ig_quality", "?")
             category = result.get("category", "?")
+            if job.cloned_from:
+                status = f"cloned from {job.cloned_from}"
+                stats["cloned"] += 1
+            elif job.resumed:
+                status = f"{status} (resumed from journal)"
+                stats["resumed"] += 1
             print(f"-> {status} | {category} | quality={quality}")
             stats["processed"] += 1
 
-        except Exception as e:
-            print(f"ERROR: {e}")
-            stats["errors"] += 1
-            # Save error to DB
-            try:
-                _upsert_media({
-                    "drive_file_id": file_info["id"],
-                    "file_name": file_name,
-                    "file_path": file_info.get("_path"),
-                    "mime_type": mime_type,
-                    "file_size_bytes": int(file_info.get("size", 0)),
-                    "media_type": media_type or "image",
-                    "status": "error",
-                    "error_message": f"{type(e).__name__}: {e}",
-                })
-            except Exception:
-                pass
-
-        # Rate limit between Claude calls
-        if not dry_run and i < total:
-            time.sleep(DELAY_BETWEEN_CALLS)
+    feeder.join()
+    for t in threads:
+        t.join()
+    if journal is not None:
+        journal.compact()
+        journal.close()
+    if feed_error:
+        raise feed_error[0]
 
     print(f"\n{'=' * 50}")
     print(f"Indexing complete!")
     print(f"  Processed: {stats['processed']} ({stats['images']} images, {stats['videos']} videos)")
+    print(f"  Reused analysis (identical bytes): {stats['cloned']}")
+    print(f"  Resumed from journal: {stats['resumed']}")
+    cache = get_vision_cache()
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"  Vision cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['entries']} entries)")
+    print(f"  Errors: {stats['errors']}")
+    print(f"  Total: {i}")
+    return stats
+
+
+def _classify_changes(
+    changes: list[dict],
+    root_folder_id: str,
+) -> tuple[list[dict], list[str], list[dict]]:
+    """
+    Sort Drive changes into (to_analyse, to_remove, to_relocate).
+
+    - to_analyse: new media in the library tree, previous errors, and files
+      whose Drive modifiedTime is newer than the one stored at analysis time
+      (unless md5Checksum shows the bytes are unchanged)
+    - to_remove: indexed files that were trashed, deleted or moved out of the tree
+    - to_relocate: indexed files that were only renamed or moved within the
+      tree, or restored after being marked drive_removed
+
+    Folder renames/moves are not propagated to the paths of their children.
+    """
+    latest: dict[str, dict] = {}
+    for change in changes:
+        latest[change["fileId"]] = change  # feed is chronological — last wins
+
+    known = _fetch_rows_by_file_ids(
+        list(latest),
+        "drive_file_id, file_name, file_path, status, drive_removed, "
+        "drive_modified_time, md5_checksum",
+    )
+
+    to_analyse, to_remove, to_relocate = [], [], []
+    folder_cache: dict[str, dict] = {}
+    prefetch_folders(
+        [c["file"] for c in latest.values()
+         if c.get("file") and not c.get("removed") and not c["file"].get("trashed")
+         and c["file"].get("mimeType") in MEDIA_MIMES],
+        folder_cache, root_folder_id,
+    )
+    for file_id, change in latest.items():
+        f = change.get("file") or {}
+        path = None
+        if not change.get("removed") and not f.get("trashed") and f.get("mimeType") in MEDIA_MIMES:
+            path = resolve_path_under(f, root_folder_id, folder_cache)
+
+        row = known.get(file_id)
+        if path is None:
+            if row is not None and not row.get("drive_removed"):
+                to_remove.append(file_id)
+            continue
+
+        f["_path"] = path
+        stored = _parse_ts(row.get("drive_modified_time")) if row else None
+        current = _parse_ts(f.get("modifiedTime"))
+        same_bytes = bool(row and row.get("md5_checksum")
+                          and row["md5_checksum"] == f.get("md5Checksum"))
+        content_changed = bool(stored and current and current > stored) and not same_bytes
+        if row is None or row.get("status") == "error" or content_changed:
+            to_analyse.append(f)
+            if row is not None and row.get("drive_removed"):
+                to_relocate.append(f)  # re-analysed rows must come back too
+        elif (row.get("drive_removed") or row.get("file_path") != path
+              or row.get("file_name") != f["name"] or stored is None):
+            to_relocate.append(f)
+
+    return to_analyse, to_remove, to_relocate
+
+
+def run_incremental_indexer(
+    folder_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    max_rps: float = DEFAULT_MAX_RPS,
+    multi_scene: bool = False,
+    vision_batch: int = 1,
+):
+    """
+    Incremental indexer driven by the Google Drive Changes feed.
+
+    Reads the page token saved by the previous run and ingests only media that
+    were added, modified, trashed or moved since then. A run with no changes
+    costs one Drive call plus one DB read. The first run (no saved token)
+    falls back to a full `run_indexer` scan and starts the feed from there.
+
+    The token only advances after a complete, non-dry run — a `limit`ed run
+    replays the same changes next time (already-indexed files are skipped).
+    """
+    if folder_id is None:
+        folder_id = os.getenv("DRIVE_FOLDER_ID")
+    if not folder_id:
+        raise ValueError("DRIVE_FOLDER_ID not set")
+
+    state = _load_state(STATE_CHANGES_TOKEN)
+    if not state or not state.get("token"):
+        print("No saved Drive changes token — running a full scan first")
+        start_token = get_changes_start_token()
+        stats = run_indexer(
+            folder_id=folder_id, limit=limit, dry_run=dry_run,
+            workers=workers, max_rps=max_rps, multi_scene=multi_scene,
+            vision_batch=vision_batch,
+        )
+        if not dry_run and not limit:
+            _save_state(STATE_CHANGES_TOKEN, {"token": start_token})
+        return stats
+
+    print("Reading Drive changes since last run...")
+    changes, new_token = list_changes(state["token"])
+    print(f"Found {len(changes)} changes")
+
+    to_analyse, to_remove, to_relocate = _classify_changes(changes, folder_id)
+    print(
+        f"To analyse: {len(to_analyse)}, removed from Drive: {len(to_remove)}, "
+        f"renamed/moved: {len(to_relocate)}"
+    )
+
+    truncated = bool(limit) and len(to_analyse) > limit
+    if limit:
+        to_analyse = to_analyse[:limit]
+        print(f"Limited to {limit} files")
+
+    if not dry_run:
+        client = get_supabase()
+        if to_remove:
+            client.table(TABLE_MEDIA_LIBRARY).update(
+                {"drive_removed": True}
+            ).in_("drive_file_id", to_remove).execute()
+        for f in to_relocate:
+            update = {
+                "file_name": f["name"],
+                "file_path": f["_path"],
+                "drive_modified_time": f.get("modifiedTime"),
+                "drive_removed": False,
+            }
+            if f.get("md5Checksum"):
+                update["md5_checksum"] = f["md5Checksum"]
+            client.table(TABLE_MEDIA_LIBRARY).update(update).eq(
+                "drive_file_id", f["id"]
+            ).execute()
+
+    stats = _run_pipeline(
+        to_analyse, dry_run=dry_run, workers=workers, max_rps=max_rps, multi_scene=multi_scene,
+        vision_batch=vision_batch,
+    )
+    stats["removed"] = len(to_remove)
+    stats["relocated"] = len(to_relocate)
+
+    if not dry_run and not truncated:
+        _save_state(STATE_CHANGES_TOKEN, {"token": new_token})
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Bulk mode — Anthropic Message Batches API
+# ---------------------------------------------------------------------------
+
+def _get_batch_client(base_url: Optional[str] = None):
+    """Anthropic client for batch calls. `base_url` points at a fake endpoint."""
+    if base_url:
+        api_key = os.getenv("ANTHROPIC_API_KEY") or "fake-key"
+        return anthropic.Anthropic(api_key=api_key, base_url=base_url)
+    from src.services.claude_client import get_anthropic_client
+    return get_anthropic_client()
+
+
+def _prepare_batch_item(file_info: dict, store_thumbs: bool = True) -> dict:
+    """Download + encode one image and (unless `store_thumbs` is False) store
+    its thumbnails. Returns {params, aspect_ratio, size, thumbnails}."""
+    image_bytes = download_file_bytes(
+        file_info["id"], file_info.get("md5Checksum"), file_info.get("modifiedTime"),
+    )
+    if not file_info.get("md5Checksum"):
+        file_info["md5Checksum"] = hashlib.md5(image_bytes).hexdigest()
+    prepared = prepare_image(image_bytes, image_max_dim("tagging"))
+    return {
+        "params": build_image_request(prepared.b64),
+        "aspect_ratio": prepared.aspect_ratio,
+        "size": len(prepared.b64),
+        "thumbnails": _make_thumbnails(file_info["id"], prepared.b64) if store_thumbs else None,
+    }
+
+
+def _pending_batch_state(state: dict) -> dict:
+    """The part of the batch state saved in indexer_state (no error rows)."""
+    return {"batch_ids": state["batch_ids"], "files": state["files"]}
+
+
+def _submit_batches(
+    client,
+    images: list[dict],
+    workers: int,
+    save: Optional[Callable[[dict], None]] = None,
+    store_thumbs: bool = True,
+) -> dict:
+    """Preprocess images concurrently and submit them as message batch(es).
+
+    Batches are split only when the payload would exceed the API's size cap.
+    `save(state)` runs right after each batch is created, so its id is durable
+    before anything else can fail. Creation is never retried by the client —
+    a retry after a lost response would submit (and bill) the batch twice.
+    Returns the pending state: {batch_ids, files: {custom_id: {...}}, errors}.
+    """
+    state = {"batch_ids": [], "files": {}, "errors": []}
+    chunk: list[dict] = []
+    chunk_bytes = 0
+    create = client.with_options(max_retries=0).messages.batches.create
+
+    def _flush():
+        nonlocal chunk, chunk_bytes
+        if not chunk:
+            return
+        batch = create(requests=chunk)
+        state["batch_ids"].append(batch.id)
+        for request in chunk:
+            state["files"][request["custom_id"]]["batch_id"] = batch.id
+        if save is not None:
+            save(_pending_batch_state(state))
+        print(f"  Submitted batch {batch.id} ({len(chunk)} requests, {chunk_bytes // (1024 * 1024)} MB)")
+        chunk, chunk_bytes = [], 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch-prep") as pool:
+        futures = {
+            pool.submit(_prepare_batch_item, f, store_thumbs): (f"img-{idx:06d}", f)
+            for idx, f in enumerate(images)
+        }
+        for fut in as_completed(futures):
+            custom_id, file_info = futures[fut]
+            try:
+                item = fut.result()
+            except Exception as e:
+                print(f"  ERROR preparing {file_info['name']}: {e}")
+                state["errors"].append(_build_error_row(file_info, "image", e))
+                continue
+            if chunk and (chunk_bytes + item["size"] > MAX_BATCH_BYTES
+                          or len(chunk) >= MAX_BATCH_REQUESTS):
+                _flush()
+            chunk.append({"custom_id": custom_id, "params": item["params"]})
+            chunk_bytes += item["size"]
+            state["files"][custom_id] = {
+                "file_info": file_info,
+                "aspect_ratio": item["aspect_ratio"],
+                "thumbnails": item["thumbnails"],
+            }
+    _flush()
+    return state
+
+
+def _wait_for_batch(client, batch_id: str, poll_interval: float):
+    """Poll a batch until it ends. Transient errors are waited out."""
+    while True:
+        try:
+            batch = client.messages.batches.retrieve(batch_id)
+        except (anthropic.APIConnectionError, anthropic.InternalServerError) as e:
+            print(f"  {batch_id}: polling failed ({e}), retrying...")
+            time.sleep(poll_interval)
+            continue
+        counts = batch.request_counts
+        if batch.processing_status == "ended":
+            return
+        print(f"  {batch_id}: {batch.processing_status} "
+              f"({counts.processing} processing, {counts.succeeded} done)")
+        time.sleep(poll_interval)
+
+
+def _collect_batches(
+    client,
+    state: dict,
+    poll_interval: float,
+    save: Optional[Callable[[dict], None]] = None,
+    writer=None,
+) -> dict:
+    """Poll submitted batches until they end, then upsert one row per result.
+
+    Transient errors while polling are waited out rather than raised. A batch
+    the API no longer knows (expired, or created in another workspace) turns
+    its files into error rows instead of failing every later run. Once a
+    batch's rows are written it is dropped from the state and `save(state)`
+    runs, so a resumed run only collects what is left.
+    """
+    stats = {"processed": 0, "errors": 0, "images": 0, "videos": 0}
+    files = state.get("files", {})
+    writer = writer or get_media_writer()
+    write_failures = []
+
+    for batch_id in list(state.get("batch_ids", [])):
+        try:
+            _wait_for_batch(client, batch_id, poll_interval)
+            results = client.messages.batches.results(batch_id)
+        except anthropic.NotFoundError as e:
+            print(f"  {batch_id}: batch not found, marking its files as errors")
+            results = []
+            for meta in files.values():
+                # States saved before batch ids were tracked per file belong to every batch
+                if meta.get("batch_id", batch_id) == batch_id:
+                    stats["errors"] += 1
+                    writer.add(_build_error_row(meta["file_info"], "image", e))
+
+        for entry in results:
+            meta = files.get(entry.custom_id)
+            if meta is None:
+                continue
+            info = meta["file_info"]
+            try:
+                if entry.result.type != "succeeded":
+                    raise RuntimeError(f"Batch request {entry.result.type}")
+                analysis = parse_analysis(entry.result.message.content[0].text)
+                row = _build_image_row(
+                    info["id"], info["name"], info.get("mimeType", "image/jpeg"),
+                    int(info.get("size", 0)), analysis, meta["aspect_ratio"],
+                    file_path=info.get("_path"),
+                    drive_modified_time=info.get("modifiedTime"),
+                    md5_checksum=info.get("md5Checksum"),
+                    thumbnails=meta.get("thumbnails"),
+                )
+
+                def _on_written(exc, info=info):
+                    if exc is not None:
+                        write_failures.append((info, exc))
+
+                writer.add(row, on_done=_on_written)
+                stats["processed"] += 1
+                stats["images"] += 1
+            except Exception as e:
+                print(f"  ERROR {info['name']}: {e}")
+                stats["errors"] += 1
+                writer.add(_build_error_row(info, "image", e))
+
+        writer.flush()
+        state["batch_ids"].remove(batch_id)
+        if save is not None:
+            save(_pending_batch_state(state))
+
+    # Error rows for failed writes are queued here, not from inside the
+    # flush that reported them, so the final flush below picks them up
+    for info, exc in write_failures:
+        print(f"  ERROR saving {info['name']}: {exc}")
+        writer.add(_build_error_row(info, "image", exc))
+    writer.flush()
+    stats["processed"] -= len(write_failures)
+    stats["images"] -= len(write_failures)
+    stats["errors"] += len(write_failures)
+    return stats
+
+
+def run_batch_indexer(
+    folder_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+    reindex_errors: bool = False,
+    reindex_all: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    max_rps: float = DEFAULT_MAX_RPS,
+    multi_scene: bool = False,
+    base_url: Optional[str] = None,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+    state_store: Optional[dict] = None,
+    writer=None,
+):
+    """
+    Bulk indexer using the Anthropic Message Batches API.
+
+    Pending images (or every image with `reindex_all`, e.g. after changing
+    SYSTEM_PROMPT or MODEL) are downloaded and encoded up front, submitted as
+    one message batch and polled until done; results are upserted with the
+    same row shape as process_image. Videos and content-hash clones still go
+    through the regular pipeline.
+
+    Each batch id is saved in indexer_state as soon as the batch is created,
+    so a run that dies or errors afterwards — while preparing the next batch
+    or mid-wait — resumes collecting the same batch instead of paying again.
+
+    `base_url` targets a fake endpoint (see src.services.fake_batch_api).
+    `state_store` (a dict) and `writer` (anything with add/flush) replace
+    indexer_state and the media_library writer; with a `writer` given,
+    thumbnails are not stored and videos / clones only go through a dry run,
+    so a run against the fake endpoint never writes production tables.
+    """
+    client = _get_batch_client(base_url)
+    isolated = writer is not None
+    writer = writer or get_media_writer()
+
+    def save(pending: dict):
+        if state_store is not None:
+            state_store[STATE_PENDING_BATCH] = pending
+        else:
+            _save_state(STATE_PENDING_BATCH, pending)
+
+    if state_store is not None:
+        state = state_store.get(STATE_PENDING_BATCH)
+    else:
+        state = _load_state(STATE_PENDING_BATCH)
+    if state and state.get("batch_ids"):
+        print(f"Resuming {len(state['batch_ids'])} pending message batch(es)...")
+        stats = _collect_batches(client, state, poll_interval, save=save, writer=writer)
+        save({})
+        return stats
+
+    to_process = _list_pending(folder_id, limit, dry_run, reindex_errors, reindex_all)
+    images = [f for f in to_process if classify_media_type(f.get("mimeType", "")) == "image"]
+    others = [f for f in to_process if classify_media_type(f.get("mimeType", "")) != "image"]
+
+    if not reindex_all:
+        # Identical bytes already analysed — let the pipeline clone them for free
+        known_hashes = _find_analyzed_by_md5([f.get("md5Checksum") for f in images])
+        others += [f for f in images if f.get("md5Checksum") in known_hashes]
+        images = [f for f in images if f.get("md5Checksum") not in known_hashes]
+
+    print(f"Batch API: {len(images)} images, {len(others)} via regular pipeline")
+    if dry_run:
+        print("Dry run — no batch submitted")
+        return _run_pipeline(
+            to_process, dry_run=True, workers=workers, max_rps=max_rps,
+            multi_scene=multi_scene, writer=writer,
+        )
+
+    stats = {"processed": 0, "errors": 0, "images": 0, "videos": 0}
+    if images:
+        print("Preparing images for the message batch...")
+        state = _submit_batches(client, images, workers, save=save, store_thumbs=not isolated)
+        for row in state.pop("errors"):
+            stats["errors"] += 1
+            writer.add(row)
+        batch_stats = _collect_batches(client, state, poll_interval, save=save, writer=writer)
+        save({})
+        for key in stats:
+            stats[key] += batch_stats[key]
+
+    if others:
+        pipeline_stats = _run_pipeline(
+            others, dry_run=isolated, workers=workers, max_rps=max_rps,
+            multi_scene=multi_scene, writer=writer,
+        )
+        for key in stats:
+            stats[key] += pipeline_stats[key]
+
+    print(f"\n{'=' * 50}")
+    print(f"Batch indexing complete!")
+    print(f"  Processed: {stats['processed']} ({stats['images']} images, {stats['videos']} videos)")
     print(f"  Errors: {stats['errors']}")
-    print(f"  Total: {total}")
     return stats
@@ -14,7 +14,7 @@ from src.database import get_supabase, TABLE_MEDIA_LIBRARY, TABLE_TAG_CORRECTION
 def fetch_all_media(media_type: Optional[str] = None) -> list[dict]:
     """Fetch all analyzed media rows. Cached 60s."""
     client = get_supabase()
-    query = client.table(TABLE_MEDIA_LIBRARY).select("*").eq("status", "analyzed").eq("is_excluded", False)
+    query = client.table(TABLE_MEDIA_LIBRARY).select("*").eq("status", "analyzed").eq("is_excluded", False).eq("drive_removed", False)
     if media_type:
         query = query.eq("media_type", media_type)
     result = query.order("file_name").execute()
@@ -52,6 +52,22 @@ def find_duplicate_by_name_size(filename: str, size_bytes: int) -> Optional[dict
     return result.data[0] if result.data else None
 
 
+def find_duplicate_by_md5(md5_checksum: str) -> Optional[dict]:
+    """Return an existing media row whose original has identical bytes.
+
+    Used to detect real duplicates on user upload. Not cached — must be fresh.
+    """
+    client = get_supabase()
+    result = (
+        client.table(TABLE_MEDIA_LIBRARY)
+        .select("id, drive_file_id, file_name, file_size_bytes, analyzed_at")
+        .eq("md5_checksum", md5_checksum)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0] if result.data else None
+
+
 def find_any_with_filename(filename: str) -> list[dict]:
     """Return all rows with this filename (any size). Used to detect name collisions."""
     client = get_supabase()
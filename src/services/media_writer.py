@@ -0,0 +1,161 @@
+"""
+Write-behind buffer for media_library upserts.
+
+Rows are queued and written in multi-row `upsert(..., on_conflict="drive_file_id")`
+calls, flushed when `max_rows` are waiting, when the oldest row is `max_delay`
+seconds old, on `flush()`, and at interpreter exit. One shared buffer serves
+the indexer pipeline and the batch indexer, so DB latency is paid once per
+batch instead of once per file. Interactive writers (the Upload Media page's
+process_image/video_bytes) upsert directly so failures reach the caller and
+sessions never flush each other's rows.
+
+Rows are grouped by their column set before writing — PostgREST fills missing
+columns with NULL in a multi-row upsert, which would wipe e.g. file_path on
+rows that don't carry it. If a bulk write fails, its rows are retried one by
+one so a single bad row can't sink the batch. `on_done(exc)` callbacks report
+each row's outcome (exc is None on success); failures from background and
+exit flushes, where no caller sees the return value, are printed.
+"""
+import atexit
+import threading
+import time
+from typing import Callable, Optional
+
+from src.database import get_supabase, TABLE_MEDIA_LIBRARY
+
+DEFAULT_MAX_ROWS = 50
+DEFAULT_MAX_DELAY = 2.0  # seconds
+
+
+class MediaWriteBuffer:
+    """Thread-safe write-behind buffer for one table's upserts."""
+
+    def __init__(
+        self,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        table: str = TABLE_MEDIA_LIBRARY,
+        on_conflict: str = "drive_file_id",
+    ):
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.table = table
+        self.on_conflict = on_conflict
+        self._pending: list[tuple[dict, Optional[Callable]]] = []
+        self._oldest: Optional[float] = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="media-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, row: dict, on_done: Optional[Callable[[Optional[Exception]], None]] = None):
+        """Queue a row for upsert. `on_done(exc)` runs after it is written."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MediaWriteBuffer is closed")
+            self._pending.append((row, on_done))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._pending) >= self.max_rows:
+                self._cond.notify()
+
+    def _run(self):
+        """Background flusher: wakes on size threshold or age deadline."""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if len(self._pending) >= self.max_rows:
+                        break
+                    if self._oldest is not None:
+                        remaining = self._oldest + self.max_delay - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+            _report_failures(self.flush())
+
+    def flush(self) -> list[tuple[dict, Exception]]:
+        """Write everything queued (including rows queued by callbacks during
+        the flush). Blocks until done. Returns the (row, exc) pairs that failed."""
+        failures = []
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                    self._oldest = None
+                if not batch:
+                    return failures
+                failures += self._write(batch)
+
+    def _write(self, batch: list[tuple[dict, Optional[Callable]]]) -> list[tuple[dict, Exception]]:
+        # Group by column set; within a group keep the last row per conflict key
+        groups: dict[tuple, dict] = {}
+        for row, cb in batch:
+            key = tuple(sorted(row))
+            group = groups.setdefault(key, {})
+            entry = group.setdefault(row.get(self.on_conflict), {"row": row, "cbs": []})
+            entry["row"] = row
+            if cb is not None:
+                entry["cbs"].append(cb)
+
+        client = get_supabase()
+        failures = []
+        for group in groups.values():
+            entries = list(group.values())
+            try:
+                client.table(self.table).upsert(
+                    [e["row"] for e in entries], on_conflict=self.on_conflict
+                ).execute()
+                outcomes = [None] * len(entries)
+            except Exception:
+                outcomes = []
+                for e in entries:  # isolate the bad row(s)
+                    try:
+                        client.table(self.table).upsert(
+                            e["row"], on_conflict=self.on_conflict
+                        ).execute()
+                        outcomes.append(None)
+                    except Exception as exc:
+                        outcomes.append(exc)
+            for e, exc in zip(entries, outcomes):
+                if exc is not None:
+                    failures.append((e["row"], exc))
+                for cb in e["cbs"]:
+                    try:
+                        cb(exc)
+                    except Exception:
+                        pass
+        return failures
+
+    def close(self):
+        """Flush remaining rows and stop the background thread."""
+        _report_failures(self.flush())
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+
+def _report_failures(failures: list[tuple[dict, Exception]]):
+    """Print failed rows from a flush whose return value nobody reads."""
+    for row, exc in failures:
+        print(f"media_library write failed for {row.get('drive_file_id')}: {exc}")
+
+
+# Singleton shared by the batch indexing paths in the process
+_media_writer: Optional[MediaWriteBuffer] = None
+_media_writer_lock = threading.Lock()
+
+
+def get_media_writer() -> MediaWriteBuffer:
+    """Get or create the shared media_library write buffer (singleton)."""
+    global _media_writer
+    with _media_writer_lock:
+        if _media_writer is None:
+            _media_writer = MediaWriteBuffer()
+            atexit.register(_media_writer.close)
+        return _media_writer
@@ -0,0 +1,230 @@
+"""
+Token-bucket rate limiter shared by every thread that calls Claude.
+
+The bucket refills at `rate` tokens per second up to `capacity`. When the
+provider answers 429 / overloaded with a `retry-after` header, `pause()`
+empties the bucket and blocks all callers until the provider's window
+reopens — so concurrent workers back off together instead of hammering
+the API one by one. Coroutines on an event loop share the same bucket
+through `acquire_async()` / `call_with_rate_limit_async()`.
+
+`observe_rate_limit_headers()` fits the bucket to the provider's
+`anthropic-ratelimit-requests-*` headers: the rate drops to the advertised
+requests-per-minute when that is below the configured maximum, and an
+exhausted window pauses the bucket until its reset time.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import anthropic
+
+# Default request rate for Claude vision calls (~50 requests/minute tier)
+DEFAULT_MAX_RPS = 0.8
+# Backoff for rate-limited calls
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BASE_DELAY = 5  # seconds, exponential backoff
+# HTTP statuses that mean "back off": rate limited / overloaded
+RATE_LIMIT_STATUSES = (429, 529)
+
+
+class TokenBucket:
+    """Thread-safe token bucket. `acquire()` blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.max_rate = rate  # ceiling for rates learned from the provider
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _try_acquire(self, tokens: float) -> float:
+        """Take `tokens` if available and return 0, else the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self._paused_until and self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return max(
+                self._paused_until - now,
+                (tokens - self._tokens) / self.rate,
+                1e-3,
+            )
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available. Returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Like acquire(), but yields to the event loop while waiting."""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (provider asked us to back off)."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+
+    def set_rate(self, rate: float):
+        """Change the refill rate (e.g. from the provider's advertised limit)."""
+        if rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.capacity = max(1.0, rate)
+            self._tokens = min(self._tokens, self.capacity)
+
+
+# Singleton — one bucket per process for all Claude vision calls
+_claude_limiter: Optional[TokenBucket] = None
+_claude_limiter_lock = threading.Lock()
+
+
+def get_claude_limiter() -> TokenBucket:
+    """Get or create the shared Claude rate limiter (singleton)."""
+    global _claude_limiter
+    with _claude_limiter_lock:
+        if _claude_limiter is None:
+            _claude_limiter = TokenBucket(DEFAULT_MAX_RPS)
+        return _claude_limiter
+
+
+def configure_claude_limiter(max_rps: float) -> TokenBucket:
+    """Set the shared limiter's rate and ceiling (creating it if needed) and return it."""
+    limiter = get_claude_limiter()
+    if max_rps > 0:
+        limiter.max_rate = max_rps
+    limiter.set_rate(max_rps)
+    return limiter
+
+
+def _header_float(headers, name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def observe_rate_limit_headers(headers, limiter: Optional[TokenBucket] = None):
+    """Fit the limiter to the provider's `anthropic-ratelimit-requests-*` headers.
+
+    The rate follows the advertised requests-per-minute, capped at the
+    limiter's `max_rate`; with no requests remaining, the bucket pauses
+    until the window resets.
+    """
+    if not headers:
+        return
+    limiter = limiter or get_claude_limiter()
+    limit = _header_float(headers, "anthropic-ratelimit-requests-limit")
+    if limit:
+        limiter.set_rate(min(limiter.max_rate, limit / 60.0))
+    if _header_float(headers, "anthropic-ratelimit-requests-remaining") == 0:
+        reset = headers.get("anthropic-ratelimit-requests-reset")
+        try:
+            wait = datetime.fromisoformat(reset).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return
+        if wait > 0:
+            limiter.pause(wait)
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Extract the provider's `retry-after` hint (seconds) from an API error."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    if isinstance(exc, anthropic.RateLimitError):
+        return True
+    return getattr(exc, "status_code", None) in RATE_LIMIT_STATUSES
+
+
+def _back_off(limiter: TokenBucket, exc: Exception, attempt: int, max_retries: int, base_delay: float):
+    observe_rate_limit_headers(getattr(getattr(exc, "response", None), "headers", None), limiter)
+    delay = retry_after_seconds(exc) or base_delay * (2 ** attempt)
+    print(f"    Rate limited, retrying in {delay}s (attempt {attempt + 1}/{max_retries})...")
+    limiter.pause(delay)
+
+
+def call_with_rate_limit(
+    fn,
+    *args,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+    **kwargs,
+):
+    """Call a Claude-bound function under the shared rate limiter, with
+    exponential backoff on rate limit errors.
+
+    A 429 carrying `retry-after` pauses the whole token bucket, so every
+    concurrent caller waits out the provider's window together.
+    """
+    limiter = get_claude_limiter()
+    for attempt in range(max_retries):
+        limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if not _is_rate_limited(e):
+                raise
+            _back_off(limiter, e, attempt, max_retries, base_delay)
+    # Final attempt without catch
+    limiter.acquire()
+    return fn(*args, **kwargs)
+
+
+async def call_with_rate_limit_async(
+    fn,
+    *args,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+    **kwargs,
+):
+    """call_with_rate_limit for a coroutine function, sharing the same bucket."""
+    limiter = get_claude_limiter()
+    for attempt in range(max_retries):
+        await limiter.acquire_async()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if not _is_rate_limited(e):
+                raise
+            _back_off(limiter, e, attempt, max_retries, base_delay)
+    await limiter.acquire_async()
+    return await fn(*args, **kwargs)
+
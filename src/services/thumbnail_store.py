@@ -0,0 +1,250 @@
+"""
+Precomputed WebP thumbnails, generated once per media at index time.
+
+Each media gets one thumbnail per THUMB_SIZES (longest side, px), stored as
+`<drive_file_id>/<size>.webp` in the public `media-thumbnails` Supabase
+Storage bucket and mirrored under `.thumbnail_cache/` on local disk. The
+storage paths are recorded in media_library.thumbnails ({"300": path, ...}).
+
+Pages go by the thumbnails column: media that have one are read from local
+disk → Supabase Storage; media without one (indexed before thumbnails
+existed) are backfilled from Drive on first view, so no request is spent
+probing Storage for thumbnails that were never generated.
+"""
+import io
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from PIL import Image
+
+from src.database import get_supabase, _get_secret, TABLE_MEDIA_LIBRARY
+from src.utils import _ensure_heif
+
+_project_root = Path(__file__).parent.parent.parent
+CACHE_DIR = _project_root / ".thumbnail_cache"
+
+THUMB_SIZES = (300, 600)  # grid tiles / previews
+THUMB_MIME = "image/webp"
+THUMB_QUALITY = 80
+THUMB_BUCKET = "media-thumbnails"
+
+# Drive's own thumbnail, used only to backfill media without a stored one
+_DRIVE_THUMB_SIZE = max(THUMB_SIZES)
+
+
+def thumbnail_path(drive_file_id: str, size: int) -> str:
+    """Storage path (and local cache path) of one thumbnail."""
+    return f"{drive_file_id}/{size}.webp"
+
+
+def _storage_base() -> tuple[str, str]:
+    url = _get_secret("SUPABASE_URL")
+    key = _get_secret("SUPABASE_KEY")
+    if not url or not key:
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
+    return url.rstrip("/"), key
+
+
+def thumbnail_url(path: str) -> str:
+    """Public URL of a stored thumbnail."""
+    base_url, _ = _storage_base()
+    return f"{base_url}/storage/v1/object/public/{THUMB_BUCKET}/{path}"
+
+
+def make_thumbnails(image_bytes: bytes, sizes: tuple[int, ...] = THUMB_SIZES) -> dict[int, bytes]:
+    """Decode once and encode a WebP per size, largest first (each is
+    downscaled from the previous one). Sizes above the source are not upscaled."""
+    _ensure_heif()
+    img = Image.open(io.BytesIO(image_bytes))
+    if img.format == "JPEG":
+        img.draft("RGB", (max(sizes), max(sizes)))
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    thumbs = {}
+    for size in sorted(sizes, reverse=True):
+        img.thumbnail((size, size), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="WEBP", quality=THUMB_QUALITY, method=4)
+        thumbs[size] = buf.getvalue()
+    return thumbs
+
+
+def _local_file(path: str) -> Path:
+    return CACHE_DIR / path
+
+
+def _write_local(path: str, data: bytes):
+    target = _local_file(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _upload(path: str, data: bytes):
+    base_url, key = _storage_base()
+    resp = httpx.post(
+        f"{base_url}/storage/v1/object/{THUMB_BUCKET}/{path}",
+        headers={
+            "Authorization": f"Bearer {key}",
+            "Content-Type": THUMB_MIME,
+            "x-upsert": "true",
+        },
+        content=data,
+        timeout=30,
+    )
+    if resp.status_code not in (200, 201):
+        raise RuntimeError(
+            f"Thumbnail upload failed ({resp.status_code}): {resp.text[:300]}"
+        )
+
+
+def store_thumbnails(drive_file_id: str, image_bytes: bytes) -> dict[str, str]:
+    """Generate, cache locally and upload all sizes. Local copies are written
+    first, so they still serve this machine if the upload fails.
+
+    Returns the media_library.thumbnails value: {"300": path, "600": path}.
+    """
+    paths = {}
+    thumbs = make_thumbnails(image_bytes)
+    for size, data in thumbs.items():
+        paths[str(size)] = thumbnail_path(drive_file_id, size)
+        _write_local(paths[str(size)], data)
+    for size, data in thumbs.items():
+        _upload(paths[str(size)], data)
+    return paths
+
+
+def stored_thumbnails(drive_file_ids: list[str]) -> dict[str, Optional[dict]]:
+    """media_library.thumbnails per drive_file_id (None when not generated)."""
+    ids = list(dict.fromkeys(drive_file_ids))
+    found: dict[str, Optional[dict]] = {fid: None for fid in ids}
+    client = get_supabase()
+    for i in range(0, len(ids), 200):
+        result = (
+            client.table(TABLE_MEDIA_LIBRARY)
+            .select("drive_file_id, thumbnails")
+            .in_("drive_file_id", ids[i:i + 200])
+            .execute()
+        )
+        for row in result.data:
+            found[row["drive_file_id"]] = row.get("thumbnails")
+    return found
+
+
+def load_thumbnail(thumbnails: Optional[dict], size: int = THUMB_SIZES[0]) -> Optional[bytes]:
+    """Thumbnail bytes for a media_library.thumbnails value (local disk, then
+    Supabase Storage), or None. Makes no request when it has no such size."""
+    path = (thumbnails or {}).get(str(size))
+    if not path:
+        return None
+    try:
+        return _local_file(path).read_bytes()
+    except OSError:
+        pass
+    try:
+        resp = httpx.get(thumbnail_url(path), timeout=10)
+    except (httpx.HTTPError, ValueError):
+        return None
+    if resp.status_code != 200:
+        return None
+    try:
+        _write_local(path, resp.content)
+    except OSError:
+        pass
+    return resp.content
+
+
+def drive_thumbnail_links(drive_file_ids: list[str]) -> dict[str, Optional[str]]:
+    """Drive thumbnailLinks at backfill size, batched (one round trip per 100)."""
+    from src.services.google_drive import get_thumbnail_links
+
+    try:
+        return get_thumbnail_links(drive_file_ids, size=_DRIVE_THUMB_SIZE)
+    except Exception:
+        return {}
+
+
+def _drive_source_bytes(drive_file_id: str, thumbnail_link: Optional[str] = None) -> bytes:
+    """Image to backfill from: Drive's thumbnail (works for videos too),
+    else the original."""
+    from src.services.google_drive import download_file_bytes
+
+    if thumbnail_link is None:
+        thumbnail_link = drive_thumbnail_links([drive_file_id]).get(drive_file_id)
+    if thumbnail_link:
+        try:
+            resp = httpx.get(thumbnail_link, timeout=10)
+            if resp.status_code == 200:
+                return resp.content
+        except httpx.HTTPError:
+            pass
+    return download_file_bytes(drive_file_id)
+
+
+def backfill_thumbnails(
+    drive_file_id: str,
+    thumbnail_link: Optional[str] = None,
+) -> Optional[dict[str, str]]:
+    """Build and store all sizes from Drive (media indexed before thumbnails
+    existed) and record them on the media_library row. Returns the paths, or
+    None if Drive had nothing usable. Pass `thumbnail_link` when it was
+    already resolved (see drive_thumbnail_links)."""
+    try:
+        paths = store_thumbnails(drive_file_id, _drive_source_bytes(drive_file_id, thumbnail_link))
+    except Exception:
+        return None
+    try:
+        get_supabase().table(TABLE_MEDIA_LIBRARY).update(
+            {"thumbnails": paths}
+        ).eq("drive_file_id", drive_file_id).execute()
+    except Exception:
+        pass
+    return paths
+
+
+def ensure_thumbnail(
+    drive_file_id: str,
+    size: int = THUMB_SIZES[0],
+    thumbnails: Optional[dict] = None,
+) -> Optional[bytes]:
+    """Stored thumbnail bytes, backfilling from Drive when there are none.
+    `thumbnails` is the row's media_library.thumbnails; read from the DB when
+    not given."""
+    known = {drive_file_id: thumbnails} if thumbnails is not None else None
+    return ensure_thumbnails([drive_file_id], size, known)[drive_file_id]
+
+
+def ensure_thumbnails(
+    drive_file_ids: list[str],
+    size: int = THUMB_SIZES[0],
+    thumbnails: Optional[dict[str, Optional[dict]]] = None,
+) -> dict[str, Optional[bytes]]:
+    """ensure_thumbnail for a whole page of media. `thumbnails` maps
+    drive_file_id → media_library.thumbnails for rows already in hand; the
+    rest are read in one query. The Drive thumbnail links of any that need a
+    backfill are resolved in one batch request."""
+    ids = list(dict.fromkeys(drive_file_ids))
+    known = dict(thumbnails or {})
+    unknown = [fid for fid in ids if fid not in known]
+    if unknown:
+        known.update(stored_thumbnails(unknown))
+    result = {fid: load_thumbnail(known.get(fid), size) for fid in ids}
+    missing = [fid for fid, data in result.items() if data is None]
+    if missing:
+        links = drive_thumbnail_links(missing)
+        for fid in missing:
+            paths = backfill_thumbnails(fid, links.get(fid) or "")  # "": no link, skip the lookup
+            result[fid] = load_thumbnail(paths, size)
+    return result
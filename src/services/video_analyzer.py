@@ -2,17 +2,28 @@
 Video analyzer — scene detection via OpenCV histogram diff, keyframe extraction,
 and per-scene Claude Vision analysis.
 """
+import atexit
+import multiprocessing
 import os
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import cv2
 import numpy as np
 
 from src.models import VisionAnalysis, SceneAnalysis
-from src.utils import encode_cv2_frame, get_aspect_ratio_from_dimensions
-from src.services.vision_analyzer import analyze_frames, _parse_json_response
+from src.utils import encode_cv2_frame, image_max_dim
+from src.services.video_probe import probe_file
+from src.services.vision_analyzer import (
+    analyze_frames,
+    analyze_frames_concurrent,
+    analyze_scenes,
+    _parse_json_response,
+)
 
 # Scene detection: histogram difference threshold (0-1, higher = fewer scenes)
 SCENE_THRESHOLD = 0.4
@@ -22,67 +33,323 @@ SCENE_SAMPLE_INTERVAL = 0.5
 FRAME_EXTRACT_INTERVAL = 5.0
 # Max frames per scene to send to Claude
 MAX_FRAMES_PER_SCENE = 5
+# Histograms are computed on frames downscaled to this width (cheap, scale-invariant)
+HIST_FRAME_WIDTH = 160
+# Avoid very short scenes (seconds)
+MIN_SCENE_DURATION = 2.0
+# Adaptive threshold: median + K robust std-devs of the clip's own distances,
+# never below the floor (keeps sensor noise from splitting static shots)
+ADAPTIVE_THRESHOLD_K = 5.0
+ADAPTIVE_THRESHOLD_FLOOR = 0.3
+# Keyframes whose 64-bit dHash differs by at most this many bits from an
+# already-kept frame of the same scene are dropped as near-duplicates
+KEYFRAME_HASH_DISTANCE = 6
+# Scene analyses in flight per video (all share the Claude rate limiter)
+SCENE_CONCURRENCY = 4
+# Multi-scene mode: max frames packed into one request
+MULTI_SCENE_MAX_FRAMES = 20
+# Worker processes for CPU-bound video preprocessing (decode, scenes, JPEG)
+VIDEO_PROCESSES = os.cpu_count() or 1
 
 
 def _compute_histogram(frame) -> np.ndarray:
-    """Compute normalized color histogram for a frame."""
+    """Compute normalized color histogram for a (downscaled) frame."""
+    h, w = frame.shape[:2]
+    if w > HIST_FRAME_WIDTH:
+        frame = cv2.resize(
+            frame, (HIST_FRAME_WIDTH, max(1, h * HIST_FRAME_WIDTH // w)),
+            interpolation=cv2.INTER_AREA,
+        )
     hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
     hist = cv2.calcHist([hsv], [0, 1], None, [50, 60], [0, 180, 0, 256])
     cv2.normalize(hist, hist)
     return hist.flatten()
 
 
-def detect_scenes(video_path: str) -> list[tuple[float, float]]:
+def bhattacharyya_distances(hists: np.ndarray) -> np.ndarray:
+    """Bhattacharyya distance between each consecutive pair of rows of an
+    (n, bins) histogram stack — same formula as cv2.HISTCMP_BHATTACHARYYA."""
+    h = np.asarray(hists, dtype=np.float32)
+    if len(h) < 2:
+        return np.zeros(0)
+    # sqrt(a·b) = sqrt(a)·sqrt(b): one sqrt per bin, then row-wise dot products
+    roots = np.sqrt(h)
+    coeff = np.einsum("ij,ij->i", roots[:-1], roots[1:]).astype(np.float64)
+    sums = h.sum(axis=1, dtype=np.float64)
+    norm = np.sqrt(sums[:-1] * sums[1:])
+    similarity = np.divide(coeff, norm, out=np.zeros_like(coeff), where=norm > 0)
+    return np.sqrt(np.clip(1.0 - similarity, 0.0, None))
+
+
+def adaptive_threshold(distances: np.ndarray, base: float = SCENE_THRESHOLD) -> float:
+    """Threshold from the clip's own distance distribution (median + K·MAD)."""
+    if len(distances) == 0:
+        return base
+    median = float(np.median(distances))
+    mad = float(np.median(np.abs(distances - median))) * 1.4826
+    return max(ADAPTIVE_THRESHOLD_FLOOR, median + ADAPTIVE_THRESHOLD_K * mad)
+
+
+def find_scene_boundaries(
+    times: np.ndarray,
+    distances: np.ndarray,
+    threshold: float = SCENE_THRESHOLD,
+    adaptive: bool = False,
+    min_scene: float = MIN_SCENE_DURATION,
+) -> list[float]:
     """
-    Detect scene boundaries using color histogram differences.
-    Returns list of (start_sec, end_sec) tuples.
+    Scene start times from sampled histogram distances.
+    `distances[i]` compares sample i with sample i+1, taken at `times[i]`.
+
+    Candidates are a vectorized threshold mask. The minimum scene duration is
+    applied by jumping (searchsorted) from each accepted boundary to the first
+    candidate at least `min_scene` later — one step per scene, not per sample.
     """
+    if adaptive:
+        threshold = adaptive_threshold(distances, threshold)
+    times = np.asarray(times, dtype=np.float64)
+    candidates = times[(np.asarray(distances) > threshold) & (times >= min_scene - 1e-9)]
+
+    boundaries = [0.0]
+    i = 0
+    while i < len(candidates):
+        boundaries.append(float(candidates[i]))
+        i = int(np.searchsorted(candidates, candidates[i] + min_scene - 1e-9, side="left"))
+    return boundaries
+
+
+def _open_video(video_path: str):
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise ValueError(f"Cannot open video: {video_path}")
-
     fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = total_frames / fps
+    return cap, fps, total_frames / fps
 
-    sample_interval_frames = int(fps * SCENE_SAMPLE_INTERVAL)
-    if sample_interval_frames < 1:
-        sample_interval_frames = 1
 
-    prev_hist = None
-    scene_boundaries = [0.0]  # always start at 0
+def _sample_histograms(video_path: str) -> tuple[float, float, np.ndarray, np.ndarray]:
+    """Sequential pass computing a histogram every SCENE_SAMPLE_INTERVAL.
+    Returns (fps, duration, sample frame indices, stacked histograms)."""
+    cap, fps, duration = _open_video(video_path)
+    sample_interval_frames = max(1, int(fps * SCENE_SAMPLE_INTERVAL))
+    indices, hists = [], []
+    frame_idx = 0
+    try:
+        while cap.grab():
+            if frame_idx % sample_interval_frames == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                indices.append(frame_idx)
+                hists.append(_compute_histogram(frame))
+            frame_idx += 1
+    finally:
+        cap.release()
+    return fps, duration, np.asarray(indices), np.asarray(hists)
+
+
+def dhash(frame: np.ndarray, size: int = 8) -> int:
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 grayscale thumbnail."""
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
 
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class _SceneKeyframes:
+    """One scene's keyframes: near-duplicates are dropped before JPEG encoding."""
+
+    def __init__(self):
+        self.frames: list[str] = []
+        self.hashes: list[int] = []
+        self.dropped = 0
+
+    @property
+    def considered(self) -> int:
+        return len(self.frames) + self.dropped
+
+    def offer(self, frame: np.ndarray):
+        h = dhash(frame)
+        if any(_hamming(h, kept) <= KEYFRAME_HASH_DISTANCE for kept in self.hashes):
+            self.dropped += 1
+            return
+        self.hashes.append(h)
+        self.frames.append(encode_cv2_frame(frame, image_max_dim("tagging")))
+
+
+def _keyframe_indices(boundaries: list[float], duration: float, fps: float) -> list[list[int]]:
+    """Frame indices of each scene's keyframes (every FRAME_EXTRACT_INTERVAL)."""
+    ends = boundaries[1:] + [duration]
+    out = []
+    for start, end in zip(boundaries, ends):
+        times = start + FRAME_EXTRACT_INTERVAL * np.arange(MAX_FRAMES_PER_SCENE)
+        # + 1e-6: start * fps lands just below the cut frame (e.g. 155.9999)
+        out.append([int(t * fps + 1e-6) for t in times[times < max(end, start + 1e-9)]])
+    return out
+
+
+def _read_keyframes(video_path: str, wanted: list[list[int]]) -> list[_SceneKeyframes]:
+    """Sequential grab() pass decoding only the wanted frames (no seeks)."""
+    targets = {idx: scene for scene, idxs in enumerate(wanted) for idx in idxs}
+    scene_frames = [_SceneKeyframes() for _ in wanted]
+    last = max(targets, default=-1)
+    cap, _, _ = _open_video(video_path)
     frame_idx = 0
-    while True:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if not ret:
-            break
+    try:
+        while frame_idx <= last and cap.grab():
+            if frame_idx in targets:
+                ret, frame = cap.retrieve()
+                if ret:
+                    scene_frames[targets[frame_idx]].offer(frame)
+            frame_idx += 1
+    finally:
+        cap.release()
+    return scene_frames
 
-        hist = _compute_histogram(frame)
-        if prev_hist is not None:
-            diff = cv2.compareHist(
-                prev_hist.reshape(-1, 1).astype(np.float32),
-                hist.reshape(-1, 1).astype(np.float32),
-                cv2.HISTCMP_BHATTACHARYYA,
-            )
-            if diff > SCENE_THRESHOLD:
-                timestamp = frame_idx / fps
-                # Avoid very short scenes (< 2s)
-                if timestamp - scene_boundaries[-1] >= 2.0:
-                    scene_boundaries.append(timestamp)
 
-        prev_hist = hist
-        frame_idx += sample_interval_frames
+def _shrink(frame: np.ndarray, max_dim: int) -> np.ndarray:
+    """Downscale a frame so its longest side is at most `max_dim`."""
+    h, w = frame.shape[:2]
+    if max(w, h) <= max_dim:
+        return frame
+    ratio = max_dim / max(w, h)
+    return cv2.resize(frame, (int(w * ratio), int(h * ratio)), interpolation=cv2.INTER_AREA)
 
-    cap.release()
 
-    # Build (start, end) pairs
-    scene_boundaries.append(duration)
-    scenes = []
-    for i in range(len(scene_boundaries) - 1):
-        scenes.append((scene_boundaries[i], scene_boundaries[i + 1]))
+def _scan_fixed(video_path: str) -> tuple[list[float], list[_SceneKeyframes], float]:
+    """One sequential pass for the fixed threshold (see scan_video).
+
+    Frames are read in blocks shorter than FRAME_EXTRACT_INTERVAL. Each
+    block's sampled histograms go through bhattacharyya_distances() in one
+    call, then the block is replayed in frame order to place cuts (2 s rule)
+    and offer keyframes. A block only holds its sampled frames — any may open
+    a scene — plus the current scene's scheduled keyframes, downscaled to
+    the encoding size; a scene opened inside a block cannot schedule its next
+    keyframe before the block ends.
+    """
+    cap, fps, duration = _open_video(video_path)
+    step = max(1, int(fps * SCENE_SAMPLE_INTERVAL))
+    block_frames = max(1, int(FRAME_EXTRACT_INTERVAL * fps) - 2)
+    max_dim = image_max_dim("tagging")
+
+    boundaries = [0.0]
+    scenes = [_SceneKeyframes()]
+    next_keyframe = 0  # frame index of the current scene's next keyframe
+    prev_hist = None
+    block: list[tuple[int, np.ndarray, Optional[np.ndarray]]] = []
+
+    def _flush():
+        nonlocal next_keyframe, prev_hist
+        hists = [h for _, _, h in block if h is not None]
+        if prev_hist is not None:
+            hists.insert(0, prev_hist)
+        distances = iter(bhattacharyya_distances(np.stack(hists)) if hists else [])
+        for frame_idx, frame, hist in block:
+            if hist is not None:
+                if prev_hist is not None:
+                    timestamp = frame_idx / fps
+                    if (next(distances) > SCENE_THRESHOLD
+                            and timestamp - boundaries[-1] >= MIN_SCENE_DURATION - 1e-9):
+                        boundaries.append(timestamp)
+                        scenes.append(_SceneKeyframes())
+                        next_keyframe = frame_idx
+                prev_hist = hist
+            current = scenes[-1]
+            if frame_idx >= next_keyframe and current.considered < MAX_FRAMES_PER_SCENE:
+                current.offer(frame)
+                next_keyframe = int(
+                    (boundaries[-1] + current.considered * FRAME_EXTRACT_INTERVAL) * fps
+                )
+        block.clear()
+
+    frame_idx = 0
+    block_start = 0
+    # The current scene's keyframe schedule, assuming no cut in this block
+    planned_next, planned_count = 0, 0
+    try:
+        while cap.grab():
+            if frame_idx - block_start >= block_frames:
+                _flush()
+                block_start = frame_idx
+                planned_next, planned_count = next_keyframe, scenes[-1].considered
+            sampled = frame_idx % step == 0
+            scheduled = frame_idx >= planned_next and planned_count < MAX_FRAMES_PER_SCENE
+            if sampled or scheduled:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    if sampled:
+                        break
+                else:
+                    hist = _compute_histogram(frame) if sampled else None
+                    block.append((frame_idx, _shrink(frame, max_dim), hist))
+                if scheduled:
+                    planned_count += 1
+                    planned_next = int(
+                        (boundaries[-1] + planned_count * FRAME_EXTRACT_INTERVAL) * fps
+                    )
+            frame_idx += 1
+        _flush()
+    finally:
+        cap.release()
+    return boundaries, scenes, duration
 
+
+def scan_video(
+    video_path: str,
+    keyframes: bool = True,
+    adaptive: bool = False,
+) -> tuple[list[tuple[float, float]], list[list[str]], list[int]]:
+    """
+    Detect scene boundaries (color histogram differences every
+    SCENE_SAMPLE_INTERVAL) and collect each scene's keyframes (every
+    FRAME_EXTRACT_INTERVAL from its start, max MAX_FRAMES_PER_SCENE) as
+    base64 JPEG. Keyframes within KEYFRAME_HASH_DISTANCE (dHash) of one
+    already kept for the scene are dropped before encoding — e.g. a static
+    tripod shot of a room yields a single frame.
+
+    Both thresholds compute distances with bhattacharyya_distances(). With
+    the fixed threshold this is one sequential decode pass: frames are read
+    with grab() and only decoded with retrieve() when sampled or due as a
+    keyframe, and distances are computed a block at a time (_scan_fixed).
+    With `adaptive=True` the threshold depends on the whole clip, so
+    histograms are gathered first, boundaries found with
+    find_scene_boundaries(), and keyframes read in a second sequential pass.
+    Returns (scenes as (start_sec, end_sec), keyframes per scene, dropped
+    near-duplicate count per scene).
+    """
+    if adaptive or not keyframes:
+        fps, duration, indices, hists = _sample_histograms(video_path)
+        distances = bhattacharyya_distances(hists)
+        boundaries = find_scene_boundaries(indices[1:] / fps, distances, adaptive=adaptive)
+        scene_frames = (
+            _read_keyframes(video_path, _keyframe_indices(boundaries, duration, fps))
+            if keyframes else [_SceneKeyframes() for _ in boundaries]
+        )
+    else:
+        boundaries, scene_frames, duration = _scan_fixed(video_path)
+    return (
+        _scene_pairs(boundaries, duration),
+        [s.frames for s in scene_frames],
+        [s.dropped for s in scene_frames],
+    )
+
+
+def _scene_pairs(boundaries: list[float], duration: float) -> list[tuple[float, float]]:
+    """Build (start, end) pairs; the last scene ends at the clip duration."""
+    ends = boundaries[1:] + [max(duration, boundaries[-1])]
+    return list(zip(boundaries, ends))
+
+
+def detect_scenes(video_path: str, adaptive: bool = False) -> list[tuple[float, float]]:
+    """
+    Detect scene boundaries using color histogram differences (vectorized
+    over all samples). Returns list of (start_sec, end_sec) tuples.
+    """
+    scenes, _, _ = scan_video(video_path, keyframes=False, adaptive=adaptive)
     return scenes
 
 
@@ -90,19 +357,31 @@ def extract_scene_frames(
     video_path: str,
     start_sec: float,
     end_sec: float,
+    prune: bool = True,
 ) -> list[np.ndarray]:
-    """Extract frames from a scene at regular intervals. Min 1 frame per scene."""
+    """Extract frames from a scene at regular intervals. Min 1 frame per scene.
+    With `prune`, near-duplicate frames (dHash) are skipped.
+
+    Seeks per frame — for whole videos use scan_video(), which collects every
+    scene's keyframes in one pass.
+    """
     cap = cv2.VideoCapture(video_path)
     fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
 
     frames = []
+    hashes = []
     t = start_sec
-    while t < end_sec and len(frames) < MAX_FRAMES_PER_SCENE:
+    considered = 0
+    while t < end_sec and considered < MAX_FRAMES_PER_SCENE:
         frame_idx = int(t * fps)
         cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
         ret, frame = cap.read()
         if ret:
-            frames.append(frame)
+            considered += 1
+            h = dhash(frame) if prune else None
+            if h is None or not any(_hamming(h, k) <= KEYFRAME_HASH_DISTANCE for k in hashes):
+                frames.append(frame)
+                hashes.append(h)
         t += FRAME_EXTRACT_INTERVAL
 
     # Ensure at least 1 frame
@@ -117,39 +396,38 @@ def extract_scene_frames(
     return frames
 
 
-def get_video_metadata(video_path: str) -> dict:
-    """Extract video metadata: duration, resolution, fps."""
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = total_frames / fps
-    cap.release()
+def get_video_metadata(video_path: Union[str, os.PathLike]) -> dict:
+    """Extract video metadata: duration, resolution, fps, codec, audio.
 
-    return {
-        "duration_seconds": round(duration, 2),
-        "width": width,
-        "height": height,
-        "fps": round(fps, 2),
-        "total_frames": total_frames,
-        "aspect_ratio": get_aspect_ratio_from_dimensions(width, height),
-    }
+    Reads container headers only (see video_probe.probe_file).
+    """
+    return probe_file(video_path)
 
 
-def analyze_video(video_bytes: bytes, file_name: str = "") -> dict:
+def analyze_video(
+    video: Union[bytes, str, os.PathLike],
+    file_name: str = "",
+    max_concurrency: int = SCENE_CONCURRENCY,
+    multi_scene: bool = False,
+) -> dict:
     """
     Full video analysis pipeline:
-    1. Save to temp file
+    1. Save to temp file (bytes only — a path is read in place)
     2. Detect scenes
     3. Extract frames per scene
-    4. Claude Vision call per scene
+    4. Claude Vision call per scene — up to `max_concurrency` in flight on one
+       event loop, under the shared rate limiter. With `multi_scene=True`, consecutive scenes are
+       packed into one request (max MULTI_SCENE_MAX_FRAMES frames) that
+       returns a JSON array; a failed group falls back to per-scene calls.
     5. Return aggregated results
 
     Returns dict with: scenes, category, subcategory, ambiance, elements,
     season, ig_quality, description_fr, duration_seconds, aspect_ratio,
     analysis_raw, analysis_model
     """
+    if isinstance(video, (str, os.PathLike)):
+        return _analyze_video_file(os.fspath(video), file_name, max_concurrency, multi_scene)
+
     # Save to temp file
     suffix = ".mp4"
     if file_name:
@@ -158,86 +436,220 @@ def analyze_video(video_bytes: bytes, file_name: str = "") -> dict:
             suffix = ext
 
     tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
-    tmp.write(video_bytes)
+    tmp.write(video)
     tmp.close()
     tmp_path = tmp.name
 
     try:
-        # Get metadata
-        meta = get_video_metadata(tmp_path)
-
-        # Detect scenes
-        scenes = detect_scenes(tmp_path)
-
-        # Analyze each scene
-        scene_results = []
-        all_raw = []
-
-        for idx, (start, end) in enumerate(scenes):
-            frames = extract_scene_frames(tmp_path, start, end)
-            if not frames:
-                continue
-
-            frames_b64 = [encode_cv2_frame(f) for f in frames]
-            context = f"Scène {idx + 1}/{len(scenes)} d'une vidéo de l'hôtel ({file_name}). Durée de la scène: {end - start:.1f}s."
-
-            try:
-                analysis = analyze_frames(frames_b64, context=context)
-                scene_data = {
-                    "scene_index": idx,
-                    "start_sec": round(start, 2),
-                    "end_sec": round(end, 2),
-                    "frame_count": len(frames),
-                    "category": analysis.category,
-                    "subcategory": analysis.subcategory,
-                    "ambiance": analysis.ambiance,
-                    "elements": analysis.elements,
-                    "description_fr": analysis.description_fr,
-                    "description_en": analysis.description_en,
-                    "ig_quality": analysis.ig_quality,
-                }
-                scene_results.append(scene_data)
-                all_raw.append({
-                    "scene_index": idx,
-                    "analysis": analysis.model_dump(),
-                })
-            except Exception as e:
-                scene_results.append({
-                    "scene_index": idx,
-                    "start_sec": round(start, 2),
-                    "end_sec": round(end, 2),
-                    "frame_count": len(frames),
-                    "error": str(e),
-                })
-
-        # Dominant scene = longest duration
-        if scene_results:
-            valid_scenes = [s for s in scene_results if "error" not in s]
-            if valid_scenes:
-                dominant = max(valid_scenes, key=lambda s: s["end_sec"] - s["start_sec"])
-            else:
-                dominant = scene_results[0]
-        else:
-            dominant = {}
-
-        return {
-            "scenes": scene_results,
-            "category": dominant.get("category"),
-            "subcategory": dominant.get("subcategory"),
-            "ambiance": dominant.get("ambiance", []),
-            "elements": dominant.get("elements", []),
-            "season": dominant.get("season", []),
-            "ig_quality": dominant.get("ig_quality"),
-            "description_fr": dominant.get("description_fr"),
-            "description_en": dominant.get("description_en"),
-            "duration_seconds": meta["duration_seconds"],
-            "aspect_ratio": meta["aspect_ratio"],
-            "analysis_raw": {"scenes": all_raw, "metadata": meta},
-            "analysis_model": "claude-sonnet-4-20250514",
-        }
+        return _analyze_video_file(tmp_path, file_name, max_concurrency, multi_scene)
     finally:
         # Cleanup temp file
         try:
             os.unlink(tmp_path)
         except OSError:
             pass
+
+
+def _group_scenes(work: list[tuple], max_frames: int) -> list[list[tuple]]:
+    """Pack consecutive (idx, start, end, frames) scenes into request groups."""
+    groups, current, count = [], [], 0
+    for item in work:
+        n = len(item[3])
+        if current and count + n > max_frames:
+            groups.append(current)
+            current, count = [], 0
+        current.append(item)
+        count += n
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _scene_context(item: tuple, n_scenes: int, file_name: str) -> str:
+    idx, start, end, _ = item
+    return f"Scène {idx + 1}/{n_scenes} d'une vidéo de l'hôtel ({file_name}). Durée de la scène: {end - start:.1f}s."
+
+
+def _analyze_scene_group(group: list[tuple], n_scenes: int, file_name: str) -> list[tuple]:
+    """Analyze one group of scenes. Returns [(item, VisionAnalysis | Exception)]."""
+    contexts = [_scene_context(item, n_scenes, file_name) for item in group]
+    if len(group) > 1:
+        try:
+            analyses = analyze_scenes([g[3] for g in group], contexts)
+            return list(zip(group, analyses))
+        except Exception:
+            pass  # fall back to one request per scene
+
+    results = []
+    for item, context in zip(group, contexts):
+        try:
+            results.append((item, analyze_frames(item[3], context=context)))
+        except Exception as e:
+            results.append((item, e))
+    return results
+
+
+def prepare_video(video_path: str) -> dict:
+    """
+    CPU-bound half of analyze_video: metadata, scene detection and keyframe
+    JPEG encoding. Returns a small picklable dict (meta, scenes, frames,
+    dropped) — safe to run in a worker process, see prepare_video_in_pool().
+    """
+    meta = get_video_metadata(video_path)
+    scenes, scene_frames, scene_dropped = scan_video(video_path)
+    return {
+        "meta": meta,
+        "scenes": scenes,
+        "frames": scene_frames,
+        "dropped": scene_dropped,
+    }
+
+
+# Process pool for prepare_video — one per process, created on first use
+_video_pool: Optional[ProcessPoolExecutor] = None
+_video_pool_lock = threading.Lock()
+
+
+def get_video_pool() -> ProcessPoolExecutor:
+    """Get or create the shared video preprocessing pool (singleton).
+
+    Uses the spawn start method: the indexer is multi-threaded, and forking
+    a process with live threads (HTTP clients, OpenCV) is unsafe.
+    """
+    global _video_pool
+    with _video_pool_lock:
+        if _video_pool is None:
+            _video_pool = ProcessPoolExecutor(
+                max_workers=VIDEO_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_video_pool.shutdown, cancel_futures=True)
+        return _video_pool
+
+
+def prepare_video_in_pool(video_path: str) -> dict:
+    """prepare_video() in the process pool; only the encoded frames come back.
+
+    Runs in-process on single-core hosts, and falls back to in-process if the
+    pool has died (e.g. a worker was killed by the OOM killer).
+    """
+    global _video_pool
+    if VIDEO_PROCESSES <= 1:
+        return prepare_video(video_path)  # single core: a pool only adds overhead
+    try:
+        return get_video_pool().submit(prepare_video, video_path).result()
+    except BrokenProcessPool:
+        with _video_pool_lock:
+            _video_pool = None
+        return prepare_video(video_path)
+
+
+def analyze_prepared_video(
+    prepared: dict,
+    file_name: str = "",
+    max_concurrency: int = SCENE_CONCURRENCY,
+    multi_scene: bool = False,
+) -> dict:
+    """Network-bound half of analyze_video: Claude calls on prepare_video() output."""
+    meta = prepared["meta"]
+    scenes = prepared["scenes"]
+    scene_frames = prepared["frames"]
+    scene_dropped = prepared["dropped"]
+
+    # Analyze scenes concurrently, then reassemble in scene order
+    work = [
+        (idx, start, end, scene_frames[idx])
+        for idx, (start, end) in enumerate(scenes)
+        if scene_frames[idx]
+    ]
+    outcomes = []
+    if work and not multi_scene:
+        # One request per scene, all on one event loop
+        results = analyze_frames_concurrent(
+            [item[3] for item in work],
+            [_scene_context(item, len(scenes), file_name) for item in work],
+            max_concurrency=max_concurrency,
+        )
+        outcomes = list(zip(work, results))
+    elif work:
+        groups = _group_scenes(work, MULTI_SCENE_MAX_FRAMES)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(groups)))) as pool:
+            for group_result in pool.map(
+                lambda g: _analyze_scene_group(g, len(scenes), file_name), groups
+            ):
+                outcomes.extend(group_result)
+
+    scene_results = []
+    all_raw = []
+    for (idx, start, end, frames_b64), analysis in outcomes:
+        if isinstance(analysis, Exception):
+            scene_results.append({
+                "scene_index": idx,
+                "start_sec": round(start, 2),
+                "end_sec": round(end, 2),
+                "frame_count": len(frames_b64),
+                "error": str(analysis),
+            })
+            continue
+        scene_results.append({
+            "scene_index": idx,
+            "start_sec": round(start, 2),
+            "end_sec": round(end, 2),
+            "frame_count": len(frames_b64),
+            "category": analysis.category,
+            "subcategory": analysis.subcategory,
+            "ambiance": analysis.ambiance,
+            "elements": analysis.elements,
+            "description_fr": analysis.description_fr,
+            "description_en": analysis.description_en,
+            "ig_quality": analysis.ig_quality,
+        })
+        all_raw.append({
+            "scene_index": idx,
+            "frames_dropped": scene_dropped[idx],
+            "analysis": analysis.model_dump(),
+        })
+
+    # Dominant scene = longest duration
+    if scene_results:
+        valid_scenes = [s for s in scene_results if "error" not in s]
+        if valid_scenes:
+            dominant = max(valid_scenes, key=lambda s: s["end_sec"] - s["start_sec"])
+        else:
+            dominant = scene_results[0]
+    else:
+        dominant = {}
+
+    return {
+        "scenes": scene_results,
+        "category": dominant.get("category"),
+        "subcategory": dominant.get("subcategory"),
+        "ambiance": dominant.get("ambiance", []),
+        "elements": dominant.get("elements", []),
+        "season": dominant.get("season", []),
+        "ig_quality": dominant.get("ig_quality"),
+        "description_fr": dominant.get("description_fr"),
+        "description_en": dominant.get("description_en"),
+        "duration_seconds": meta["duration_seconds"],
+        "aspect_ratio": meta["aspect_ratio"],
+        "video_probe": meta,
+        "analysis_raw": {
+            "scenes": all_raw,
+            "metadata": meta,
+            "multi_scene": multi_scene,
+            "keyframes_dropped": sum(scene_dropped),
+        },
+        "analysis_model": "claude-sonnet-4-20250514",
+    }
+
+
+def _analyze_video_file(
+    video_path: str,
+    file_name: str = "",
+    max_concurrency: int = SCENE_CONCURRENCY,
+    multi_scene: bool = False,
+) -> dict:
+    """analyze_video() on a video already on disk."""
+    return analyze_prepared_video(
+        prepare_video(video_path), file_name, max_concurrency, multi_scene,
+    )
@@ -11,6 +11,8 @@ import tempfile
 from pathlib import Path
 from typing import Optional
 
+from src.services.video_probe import content_md5, probe_file, probe_video, remember_probe
+
 
 def _find_ffmpeg() -> str:
     """Find ffmpeg executable. Checks PATH first, then known Windows location."""
@@ -28,21 +30,10 @@ def _find_ffmpeg() -> str:
 
 
 def get_video_duration(video_bytes: bytes) -> float:
-    """Get video duration in seconds using cv2 (no ffprobe needed)."""
+    """Get video duration in seconds (memoized probe — see video_probe)."""
     try:
-        import cv2
-        import numpy as np
-        tmp = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
-        tmp.write(video_bytes)
-        tmp.close()
-        cap = cv2.VideoCapture(tmp.name)
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30
-        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-        cap.release()
-        os.unlink(tmp.name)
-        return frames / fps if fps > 0 else 0
-    except ImportError:
-        # Fallback: assume duration from file if cv2 not available
+        return probe_video(video_bytes).get("duration_seconds") or 0
+    except Exception:
         return 0
 
 
@@ -199,7 +190,7 @@ def composite_video_audio(
         fade_out_sec: fade out audio N seconds before video ends
         audio_format: input audio format hint
 
-    Returns: {video_bytes, duration_sec, _cost}
+    Returns: {video_bytes, duration_sec, video_probe, _cost}
     """
     ffmpeg = _find_ffmpeg()
 
@@ -216,8 +207,12 @@ def composite_video_audio(
     output_path = tempfile.mktemp(suffix=".mp4")
 
     try:
-        # Get video duration for fade calculation
-        video_duration = get_video_duration(video_bytes)
+        # Get video duration for fade calculation (memoized by content hash)
+        try:
+            probe = probe_video(video_path, md5=content_md5(video_bytes))
+            video_duration = probe["duration_seconds"] or 0
+        except Exception:
+            video_duration = 0
 
         # Build audio filter: volume + optional fade out
         audio_filters = [f"volume={volume}"]
@@ -255,9 +250,16 @@ def composite_video_audio(
         with open(output_path, "rb") as f:
             output_bytes = f.read()
 
+        # Probe the composite while it is on disk; persisted with its job row
+        try:
+            output_probe = remember_probe(content_md5(output_bytes), probe_file(output_path))
+        except Exception:
+            output_probe = None
+
         return {
             "video_bytes": output_bytes,
             "duration_sec": video_duration,
+            "video_probe": output_probe,
             "_cost": {"operation": "video_composite", "cost_usd": 0.0},
         }
 
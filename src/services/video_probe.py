@@ -0,0 +1,236 @@
+"""
+Video probe — container metadata (duration, fps, dimensions, codec, audio)
+without decoding frames, memoized by content hash.
+
+ffprobe reads only the container headers; when it is not installed, OpenCV's
+VideoCapture properties are the fallback (no audio/codec-profile detail).
+Results are kept in-process by md5 and persisted as `video_probe` JSONB on
+media_library and creative_jobs rows — probe_video() looks there before
+touching the bytes, so a known file is never probed twice.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from src.database import get_supabase, TABLE_CREATIVE_JOBS, TABLE_MEDIA_LIBRARY
+from src.utils import get_aspect_ratio_from_dimensions
+
+# In-process memo: md5 → probe dict
+_probe_memo: dict[str, dict] = {}
+_probe_memo_lock = threading.Lock()
+_MEMO_MAX = 1000
+
+
+def content_md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+def _file_md5(path: str, chunk_size: int = 8 * 1024 * 1024) -> str:
+    h = hashlib.md5()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _find_ffprobe() -> Optional[str]:
+    """ffprobe on PATH, else next to the ffmpeg video_composer uses."""
+    found = shutil.which("ffprobe")
+    if found:
+        return found
+    try:
+        from src.services.video_composer import _find_ffmpeg
+        ffmpeg = Path(_find_ffmpeg())
+    except FileNotFoundError:
+        return None
+    candidate = ffmpeg.with_name(ffmpeg.name.replace("ffmpeg", "ffprobe"))
+    return str(candidate) if candidate.is_file() else None
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    """'30000/1001' → 29.97."""
+    if not rate:
+        return None
+    num, _, den = rate.partition("/")
+    try:
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return value or None
+
+
+def _ffprobe(target: str, data: Optional[bytes] = None) -> Optional[dict]:
+    """Run ffprobe on a path (or on `data` via stdin when target is 'pipe:0')."""
+    ffprobe = _find_ffprobe()
+    if ffprobe is None:
+        return None
+    cmd = [
+        ffprobe, "-v", "error", "-print_format", "json",
+        "-show_format", "-show_streams", target,
+    ]
+    try:
+        result = subprocess.run(cmd, input=data, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    info = json.loads(result.stdout or b"{}")
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        return None
+
+    fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate")) or 30.0
+    duration = float(info.get("format", {}).get("duration") or video.get("duration") or 0)
+    width, height = int(video.get("width", 0)), int(video.get("height", 0))
+    total_frames = int(video.get("nb_frames") or round(duration * fps))
+    return {
+        "duration_seconds": round(duration, 2),
+        "width": width,
+        "height": height,
+        "fps": round(fps, 2),
+        "total_frames": total_frames,
+        "aspect_ratio": get_aspect_ratio_from_dimensions(width, height) if height else None,
+        "codec": video.get("codec_name"),
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+        "probe": "ffprobe",
+    }
+
+
+def _cv2_probe(path: str) -> dict:
+    """Header properties via OpenCV (no frames are read)."""
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    cap.release()
+
+    codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip("\x00 ") or None
+    return {
+        "duration_seconds": round(total_frames / fps, 2),
+        "width": width,
+        "height": height,
+        "fps": round(fps, 2),
+        "total_frames": total_frames,
+        "aspect_ratio": get_aspect_ratio_from_dimensions(width, height) if height else None,
+        "codec": codec,
+        "has_audio": None,  # OpenCV does not expose audio streams
+        "probe": "opencv",
+    }
+
+
+def probe_file(path: Union[str, os.PathLike]) -> dict:
+    """Probe a video on disk (not memoized)."""
+    path = os.fspath(path)
+    return _ffprobe(path) or _cv2_probe(path)
+
+
+def _probe_parts(size: int, parts: list[tuple[int, bytes]]) -> dict:
+    """Probe a file rebuilt from (offset, bytes) parts as a sparse temp file
+    of `size` bytes — enough when the parts hold the container headers."""
+    tmp = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+    try:
+        tmp.truncate(size)
+        for offset, data in parts:
+            tmp.seek(offset)
+            tmp.write(data)
+        tmp.close()
+        return probe_file(tmp.name)
+    finally:
+        tmp.close()
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+
+
+def _probe_bytes(data: bytes) -> dict:
+    # Streamed through stdin first; MP4s with the moov atom at the end need
+    # seeking, so those fall back to a temp file.
+    probe = _ffprobe("pipe:0", data)
+    if probe is not None:
+        return probe
+    return _probe_parts(len(data), [(0, data)])
+
+
+def _load_persisted_probe(md5: str) -> Optional[dict]:
+    """A probe already stored on a media_library or creative_jobs row."""
+    try:
+        client = get_supabase()
+        result = (
+            client.table(TABLE_MEDIA_LIBRARY)
+            .select("video_probe")
+            .eq("md5_checksum", md5)
+            .not_.is_("video_probe", "null")
+            .limit(1)
+            .execute()
+        )
+        if result.data:
+            return result.data[0]["video_probe"]
+        result = (
+            client.table(TABLE_CREATIVE_JOBS)
+            .select("video_probe")
+            .eq("video_probe->>md5", md5)
+            .limit(1)
+            .execute()
+        )
+        if result.data:
+            return result.data[0]["video_probe"]
+    except Exception:
+        pass  # column not migrated yet / offline — probe instead
+    return None
+
+
+def remember_probe(md5: str, probe: dict) -> dict:
+    """Store a probe in the in-process memo. Returns it with `md5` set."""
+    probe = {**probe, "md5": md5}
+    with _probe_memo_lock:
+        if len(_probe_memo) >= _MEMO_MAX:
+            _probe_memo.pop(next(iter(_probe_memo)))
+        _probe_memo[md5] = probe
+    return probe
+
+
+def _memoized_probe(md5: Optional[str]) -> Optional[dict]:
+    """Probe from the in-process memo, then the persisted columns."""
+    if md5 is None:
+        return None
+    with _probe_memo_lock:
+        cached = _probe_memo.get(md5)
+    if cached is not None:
+        return dict(cached)
+    probe = _load_persisted_probe(md5)
+    return dict(remember_probe(md5, probe)) if probe is not None else None
+
+
+def probe_video(
+    source: Union[bytes, str, os.PathLike],
+    md5: Optional[str] = None,
+) -> dict:
+    """
+    Container metadata for a video given as bytes or a path.
+
+    Looks up the content hash (computed unless `md5` is given) in the
+    in-process memo, then in persisted `video_probe` columns, and only then
+    probes the container. Returns a dict with duration_seconds, width,
+    height, fps, total_frames, aspect_ratio, codec, has_audio, probe, md5.
+    """
+    is_bytes = isinstance(source, (bytes, bytearray))
+    if md5 is None:
+        md5 = content_md5(source) if is_bytes else _file_md5(os.fspath(source))
+
+    probe = _memoized_probe(md5)
+    if probe is not None:
+        return probe
+    probe = _probe_bytes(bytes(source)) if is_bytes else probe_file(source)
+    return dict(remember_probe(md5, probe))
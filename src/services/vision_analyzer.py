@@ -1,22 +1,48 @@
 """
 Claude Vision analyzer — sends hotel photos to Claude and parses structured JSON.
 """
+import asyncio
 import json
 import os
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Union
 
-import anthropic
 from dotenv import load_dotenv
 
 from src.models import VisionAnalysis
+from src.services.claude_client import (
+    get_anthropic_client,
+    get_async_anthropic_client,
+    run_on_background_loop,
+    token_cost,
+    usage_tokens,
+)
+from src.services.cost_tracker import log_cost
+from src.services.rate_limiter import (
+    call_with_rate_limit,
+    call_with_rate_limit_async,
+    observe_rate_limit_headers,
+)
+from src.services.vision_cache import cache_key, get_vision_cache
 
 _project_root = Path(__file__).parent.parent.parent
 load_dotenv(_project_root / ".env")
 
 MODEL = "claude-sonnet-4-20250514"
 
+# USD per MTok (input, output) for cost_log
+COST_RATES = {
+    "claude-sonnet-4-20250514": (3.0, 15.0),
+}
+
+# Library photos per analyze_images_batch request
+MAX_IMAGES_PER_REQUEST = 8
+# In-flight requests for the *_concurrent wrappers (rate limiter still applies)
+ASYNC_CONCURRENCY = 8
+
+# Sent without cache_control: system + schema prompts stay well under the
+# 1024-token minimum the API caches, so a breakpoint would be a no-op.
 SYSTEM_PROMPT = """You are an expert in hotel photography and Instagram marketing.
 You analyze photos and videos of Hotel Noucentista, a boutique Art Nouveau hotel in Sitges (Barcelona), Spain.
 
@@ -63,19 +89,21 @@ def _parse_json_response(text: str) -> dict:
     return json.loads(text)
 
 
-def analyze_image(
+def build_image_request(
     image_base64: str,
     media_type: str = "image/jpeg",
     model: str = MODEL,
-) -> VisionAnalysis:
-    """Send a single image to Claude Vision and return structured analysis."""
-    client = anthropic.Anthropic()
+) -> dict:
+    """Messages API params for a single-image analysis.
 
-    response = client.messages.create(
-        model=model,
-        max_tokens=500,
-        system=SYSTEM_PROMPT,
-        messages=[
+    Shared by analyze_image and the Message Batches indexer so both send
+    exactly the same request.
+    """
+    return {
+        "model": model,
+        "max_tokens": 500,
+        "system": SYSTEM_PROMPT,
+        "messages": [
             {
                 "role": "user",
                 "content": [
@@ -91,49 +119,374 @@ def analyze_image(
                 ],
             }
         ],
-    )
+    }
 
-    raw_text = response.content[0].text
+
+def parse_analysis(raw_text: str) -> VisionAnalysis:
+    """Parse and validate Claude's JSON answer into a VisionAnalysis."""
     data = _parse_json_response(raw_text)
-    analysis = VisionAnalysis(**data)
+    return VisionAnalysis(**data)
+
+
+def build_frames_request(
+    frames_base64: list[str],
+    context: str = "",
+    model: str = MODEL,
+) -> dict:
+    """Messages API params for a multi-frame (video scene) analysis."""
+    content = [
+        {
+            "type": "image",
+            "source": {"type": "base64", "media_type": "image/jpeg", "data": frame_b64},
+        }
+        for frame_b64 in frames_base64
+    ]
+    prompt = USER_PROMPT
+    if context:
+        prompt = f"{context}\n\n{USER_PROMPT}"
+    content.append({"type": "text", "text": prompt})
+    return {
+        "model": model,
+        "max_tokens": 500,
+        "system": SYSTEM_PROMPT,
+        "messages": [{"role": "user", "content": content}],
+    }
+
+
+def _image_cache_key(image_base64: str, media_type: str, model: str) -> str:
+    return cache_key([image_base64], f"{SYSTEM_PROMPT}\n{USER_PROMPT}\n{media_type}", model)
+
+
+def _frames_cache_key(frames_base64: list[str], context: str, model: str) -> str:
+    return cache_key(frames_base64, f"{SYSTEM_PROMPT}\n{USER_PROMPT}\n{context}", model)
+
+
+def _cached_analysis(use_cache: bool, key_fn) -> tuple[Optional[VisionAnalysis], Optional[str]]:
+    """(cached analysis or None, cache key or None when caching is off)."""
+    cache = get_vision_cache() if use_cache else None
+    if cache is None:
+        return None, None
+    key = key_fn()
+    cached = cache.get(key)
+    return (VisionAnalysis(**cached) if cached is not None else None), key
+
+
+def _log_usage(response, operation: str, model: str):
+    """Log a vision call's tokens (prompt-cache reads/writes included) to cost_log."""
+    tokens = usage_tokens(response.usage)
+    cost = token_cost(tokens, *COST_RATES.get(model, (3.0, 15.0)))
+    log_cost("claude", operation, cost, model=model,
+             params={"source": "real_tokens"}, **tokens)
+
+
+def _create(params: dict, operation: str):
+    """messages.create under the shared rate limiter (with 429 backoff).
+
+    Only real API calls go through here — cache lookups happen first, so a
+    hit never takes a limiter token or waits out a pause. The response's
+    rate-limit headers retune the limiter, and its usage is logged under
+    `operation`.
+    """
+    raw = call_with_rate_limit(
+        get_anthropic_client().messages.with_raw_response.create, **params
+    )
+    observe_rate_limit_headers(raw.headers)
+    response = raw.parse()
+    _log_usage(response, operation, params["model"])
+    return response
+
+
+async def _create_async(params: dict, operation: str):
+    """_create on the AsyncAnthropic client, sharing the same bucket."""
+    raw = await call_with_rate_limit_async(
+        get_async_anthropic_client().messages.with_raw_response.create, **params
+    )
+    observe_rate_limit_headers(raw.headers)
+    response = raw.parse()
+    _log_usage(response, operation, params["model"])
+    return response
+
+
+def _store_analysis(response, key: Optional[str], model: str) -> VisionAnalysis:
+    analysis = parse_analysis(response.content[0].text)
+    if key is not None:
+        get_vision_cache().put(key, analysis.model_dump(), model)
     return analysis
 
 
+def analyze_image(
+    image_base64: str,
+    media_type: str = "image/jpeg",
+    model: str = MODEL,
+    use_cache: bool = True,
+) -> VisionAnalysis:
+    """Send a single image to Claude Vision and return structured analysis.
+
+    Results are cached by (image payload, prompts, model) — see vision_cache.
+    Cache misses call Claude under the shared rate limiter.
+    """
+    cached, key = _cached_analysis(use_cache, lambda: _image_cache_key(image_base64, media_type, model))
+    if cached is not None:
+        return cached
+    response = _create(build_image_request(image_base64, media_type, model), "vision_analyze_image")
+    return _store_analysis(response, key, model)
+
+
 def analyze_frames(
     frames_base64: list[str],
     context: str = "",
     model: str = MODEL,
+    use_cache: bool = True,
 ) -> VisionAnalysis:
-    """Send multiple video frames to Claude Vision as a single scene analysis."""
-    client = anthropic.Anthropic()
+    """Send multiple video frames to Claude Vision as a single scene analysis.
+
+    Results are cached by (frame payloads, prompts + context, model).
+    """
+    cached, key = _cached_analysis(use_cache, lambda: _frames_cache_key(frames_base64, context, model))
+    if cached is not None:
+        return cached
+    response = _create(build_frames_request(frames_base64, context, model), "vision_analyze_frames")
+    return _store_analysis(response, key, model)
+
+
+# ---------------------------------------------------------------------------
+# Async API — many analyses on one event loop instead of one thread each
+# ---------------------------------------------------------------------------
+
+async def analyze_image_async(
+    image_base64: str,
+    media_type: str = "image/jpeg",
+    model: str = MODEL,
+    use_cache: bool = True,
+) -> VisionAnalysis:
+    """analyze_image on the AsyncAnthropic client (same request, parsing and cache)."""
+    cached, key = _cached_analysis(use_cache, lambda: _image_cache_key(image_base64, media_type, model))
+    if cached is not None:
+        return cached
+    response = await _create_async(
+        build_image_request(image_base64, media_type, model), "vision_analyze_image",
+    )
+    return _store_analysis(response, key, model)
+
+
+async def analyze_frames_async(
+    frames_base64: list[str],
+    context: str = "",
+    model: str = MODEL,
+    use_cache: bool = True,
+) -> VisionAnalysis:
+    """analyze_frames on the AsyncAnthropic client (same request, parsing and cache)."""
+    cached, key = _cached_analysis(use_cache, lambda: _frames_cache_key(frames_base64, context, model))
+    if cached is not None:
+        return cached
+    response = await _create_async(
+        build_frames_request(frames_base64, context, model), "vision_analyze_frames",
+    )
+    return _store_analysis(response, key, model)
+
+
+async def _gather_limited(calls: list, max_concurrency: int) -> list:
+    """Run coroutine factories with at most `max_concurrency` in flight.
+    Failures are returned, not raised."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run(fn, args, kwargs):
+        async with semaphore:
+            return await fn(*args, **kwargs)
+
+    return await asyncio.gather(
+        *(_run(fn, args, kwargs) for fn, args, kwargs in calls), return_exceptions=True,
+    )
+
+
+def analyze_images_concurrent(
+    images: list[str],
+    max_concurrency: int = ASYNC_CONCURRENCY,
+    media_type: str = "image/jpeg",
+    model: str = MODEL,
+    use_cache: bool = True,
+) -> list[Union[VisionAnalysis, Exception]]:
+    """Sync wrapper: analyze many images concurrently on one event loop.
+
+    Calls are rate limited and retried like call_with_rate_limit. Returns
+    one entry per image, in order — a VisionAnalysis or the exception raised.
+    """
+    calls = [(analyze_image_async, (b64, media_type, model, use_cache), {}) for b64 in images]
+    return run_on_background_loop(_gather_limited(calls, max_concurrency))
+
+
+def analyze_frames_concurrent(
+    frame_sets: list[list[str]],
+    contexts: Optional[list[str]] = None,
+    max_concurrency: int = ASYNC_CONCURRENCY,
+    model: str = MODEL,
+    use_cache: bool = True,
+) -> list[Union[VisionAnalysis, Exception]]:
+    """Sync wrapper: analyze many frame sets (scenes) concurrently on one event loop.
+
+    Returns one VisionAnalysis or exception per frame set, in order.
+    """
+    contexts = contexts or [""] * len(frame_sets)
+    calls = [
+        (analyze_frames_async, (frames, context, model, use_cache), {})
+        for frames, context in zip(frame_sets, contexts)
+    ]
+    return run_on_background_loop(_gather_limited(calls, max_concurrency))
+
+
+def _multi_scene_prompt(n_scenes: int) -> str:
+    return (
+        f"The images above come from {n_scenes} scenes of one hotel video; each scene's "
+        f"frames follow its \"Scène i/{n_scenes}\" label. Analyze every scene separately.\n\n"
+        f"{USER_PROMPT}\n\n"
+        f"Return a JSON array of exactly {n_scenes} such objects, one per scene in scene "
+        f"order — not a single object."
+    )
+
+
+def analyze_scenes(
+    scenes_frames: list[list[str]],
+    contexts: list[str],
+    model: str = MODEL,
+    use_cache: bool = True,
+) -> list[VisionAnalysis]:
+    """Analyze several video scenes in one request (JSON array answer).
+
+    `contexts[i]` labels scene i. Raises ValueError if the answer does not
+    hold exactly one analysis per scene, so callers can fall back to
+    analyze_frames per scene.
+    """
+    n = len(scenes_frames)
+    prompt = _multi_scene_prompt(n)
+    cache = get_vision_cache() if use_cache else None
+    key = None
+    if cache is not None:
+        payloads = [f for frames in scenes_frames for f in frames]
+        key = cache_key(payloads, f"{SYSTEM_PROMPT}\n{prompt}\n" + "\n".join(contexts), model)
+        cached = cache.get(key)
+        if cached is not None:
+            return [VisionAnalysis(**d) for d in cached["scenes"]]
 
     content = []
-    for frame_b64 in frames_base64:
+    for frames, context in zip(scenes_frames, contexts):
+        content.append({"type": "text", "text": context})
+        for frame_b64 in frames:
+            content.append({
+                "type": "image",
+                "source": {"type": "base64", "media_type": "image/jpeg", "data": frame_b64},
+            })
+    content.append({"type": "text", "text": prompt})
+
+    response = _create({
+        "model": model,
+        "max_tokens": 500 * n,
+        "system": SYSTEM_PROMPT,
+        "messages": [{"role": "user", "content": content}],
+    }, "vision_analyze_scenes")
+
+    data = _parse_json_response(response.content[0].text)
+    if not isinstance(data, list) or len(data) != n:
+        got = len(data) if isinstance(data, list) else type(data).__name__
+        raise ValueError(f"Expected a JSON array of {n} scene analyses, got {got}")
+    analyses = [VisionAnalysis(**d) for d in data]
+    if cache is not None:
+        cache.put(key, {"scenes": [a.model_dump() for a in analyses]}, model)
+    return analyses
+
+
+def _multi_image_prompt(n_images: int) -> str:
+    return (
+        f"The {n_images} images above are separate hotel photos, each after its "
+        f"\"Image i/{n_images}\" label. Analyze every image independently.\n\n"
+        f"{USER_PROMPT}\n\n"
+        f"Return a JSON array of exactly {n_images} such objects, one per image in "
+        f"image order — not a single object."
+    )
+
+
+def _analyze_image_group(
+    images: list[str],
+    media_type: str,
+    model: str,
+) -> list[Optional[VisionAnalysis]]:
+    """One request for several images. None marks an answer that needs a retry."""
+    n = len(images)
+    content = []
+    for i, image_b64 in enumerate(images, 1):
+        content.append({"type": "text", "text": f"Image {i}/{n}"})
         content.append({
             "type": "image",
-            "source": {
-                "type": "base64",
-                "media_type": "image/jpeg",
-                "data": frame_b64,
-            },
+            "source": {"type": "base64", "media_type": media_type, "data": image_b64},
         })
+    content.append({"type": "text", "text": _multi_image_prompt(n)})
 
-    prompt = USER_PROMPT
-    if context:
-        prompt = f"{context}\n\n{USER_PROMPT}"
-    content.append({"type": "text", "text": prompt})
+    response = _create({
+        "model": model,
+        "max_tokens": 500 * n,
+        "system": SYSTEM_PROMPT,
+        "messages": [{"role": "user", "content": content}],
+    }, "vision_analyze_images")
 
-    response = client.messages.create(
-        model=model,
-        max_tokens=500,
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": content}],
-    )
+    try:
+        data = _parse_json_response(response.content[0].text)
+    except json.JSONDecodeError:
+        return [None] * n
+    if not isinstance(data, list) or len(data) != n:
+        return [None] * n
+    results = []
+    for item in data:
+        try:
+            results.append(VisionAnalysis(**item))
+        except (TypeError, ValueError):  # pydantic ValidationError is a ValueError
+            results.append(None)
+    return results
 
-    raw_text = response.content[0].text
-    data = _parse_json_response(raw_text)
-    analysis = VisionAnalysis(**data)
-    return analysis
+
+def analyze_images_batch(
+    images: list[str],
+    max_per_request: int = MAX_IMAGES_PER_REQUEST,
+    media_type: str = "image/jpeg",
+    model: str = MODEL,
+    use_cache: bool = True,
+    fallback: Optional[Callable[[str], VisionAnalysis]] = None,
+) -> list[VisionAnalysis]:
+    """Analyze several library photos with one request per `max_per_request` images.
+
+    The model answers a JSON array; any image whose entry is missing or fails
+    validation is re-analyzed alone with `fallback` (default: analyze_image).
+    Results share analyze_image's per-image cache entries, so a photo is
+    never re-analyzed whichever path saw it first.
+    """
+    fallback = fallback or (lambda b64: analyze_image(b64, media_type, model, use_cache))
+    cache = get_vision_cache() if use_cache else None
+
+    results: list[Optional[VisionAnalysis]] = [None] * len(images)
+    keys: list[Optional[str]] = [None] * len(images)
+    pending = []
+    for i, image_b64 in enumerate(images):
+        if cache is not None:
+            keys[i] = _image_cache_key(image_b64, media_type, model)
+            cached = cache.get(keys[i])
+            if cached is not None:
+                results[i] = VisionAnalysis(**cached)
+                continue
+        pending.append(i)
+
+    step = max(1, max_per_request)
+    for start in range(0, len(pending), step):
+        group = pending[start:start + step]
+        if len(group) == 1:
+            answers = [None]
+        else:
+            answers = _analyze_image_group([images[i] for i in group], media_type, model)
+        for i, analysis in zip(group, answers):
+            if analysis is None:
+                results[i] = fallback(images[i])
+                continue
+            results[i] = analysis
+            if cache is not None:
+                cache.put(keys[i], analysis.model_dump(), model)
+    return results
 
 
 def get_raw_response(
@@ -142,7 +495,7 @@ def get_raw_response(
     model: str = MODEL,
 ) -> dict:
     """Like analyze_image but returns the raw dict (for storage in analysis_raw)."""
-    client = anthropic.Anthropic()
+    client = get_anthropic_client()
 
     response = client.messages.create(
         model=model,
@@ -166,13 +519,12 @@ def get_raw_response(
         ],
     )
 
+    _log_usage(response, "vision_raw_response", model)
+
     raw_text = response.content[0].text
     return {
         "raw_text": raw_text,
         "parsed": _parse_json_response(raw_text),
         "model": response.model,
-        "usage": {
-            "input_tokens": response.usage.input_tokens,
-            "output_tokens": response.usage.output_tokens,
-        },
+        "usage": usage_tokens(response.usage),
     }
@@ -0,0 +1,137 @@
+"""
+Persistent cache for Claude Vision analyses.
+
+Keyed on a hash of the encoded image payload(s), a hash of the prompts
+(SYSTEM_PROMPT + USER_PROMPT + any per-call context) and the model, so a
+prompt or model change naturally misses. Stored in a local SQLite file;
+least-recently-used entries are evicted beyond `max_entries`.
+
+Hits return the stored VisionAnalysis JSON without calling Claude — e.g. for
+`--reindex-errors`, the Upload page re-analysing a file already in Drive,
+or Enhancement re-analysis of an unchanged image.
+
+Set VISION_CACHE_DISABLED=1 to bypass it entirely.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+_project_root = Path(__file__).parent.parent.parent
+CACHE_PATH = _project_root / ".vision_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 20_000
+
+
+def cache_key(payloads: list[str], prompt: str, model: str) -> str:
+    """sha256 over (payload hashes, prompt hash, model)."""
+    h = hashlib.sha256()
+    for payload in payloads:
+        h.update(hashlib.sha256(payload.encode("ascii")).digest())
+    h.update(b"\0prompt:")
+    h.update(hashlib.sha256(prompt.encode("utf-8")).digest())
+    h.update(b"\0model:")
+    h.update(model.encode("utf-8"))
+    return h.hexdigest()
+
+
+class VisionCache:
+    """Thread-safe SQLite-backed LRU cache of analysis dicts."""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path or CACHE_PATH)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analyses_accessed ON analyses(accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE analyses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, data: dict, model: str = ""):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, model, data, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(data), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries beyond max_entries."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM analyses WHERE key IN ("
+                " SELECT key FROM analyses ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def stats(self) -> dict:
+        """Hit/miss counters (this process) and current size."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": count,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses")
+            self._conn.commit()
+
+
+# Singleton
+_vision_cache: Optional[VisionCache] = None
+_vision_cache_lock = threading.Lock()
+
+
+def get_vision_cache() -> Optional[VisionCache]:
+    """Get or create the shared cache. Returns None when disabled or unusable."""
+    global _vision_cache
+    if os.getenv("VISION_CACHE_DISABLED") == "1":
+        return None
+    with _vision_cache_lock:
+        if _vision_cache is None:
+            try:
+                _vision_cache = VisionCache()
+            except sqlite3.Error:
+                return None  # read-only filesystem etc. — run uncached
+        return _vision_cache
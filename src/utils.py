@@ -3,6 +3,8 @@ Utility functions: image encoding, aspect ratio detection, MIME type mapping.
 """
 import base64
 import io
+import os
+from dataclasses import dataclass
 from typing import Optional
 
 from PIL import Image
@@ -22,27 +24,95 @@ def _ensure_heif():
 # Maximum dimension for images sent to Claude (saves tokens)
 MAX_IMAGE_DIMENSION = 2048
 
-
-def encode_image_bytes(image_bytes: bytes, mime_type: str = "image/jpeg") -> str:
-    """Resize if needed and return base64-encoded string."""
+# Longest side (px) per use case. Claude bills ~w*h/750 tokens per image and
+# downsamples anything above ~1568 px itself, so larger uploads only cost
+# bytes and latency. Tune with scripts/eval_image_resolution.py; override
+# per deployment with IMAGE_MAX_DIM_<PROFILE> (e.g. IMAGE_MAX_DIM_TAGGING=768).
+IMAGE_PROFILES = {
+    "tagging": 1024,  # library indexing: category / elements / ig_quality
+    "captioning": 1568,  # caption writing from the photo
+    "scenario": 1024,  # motion prompts and video scenario ideation
+}
+
+
+# EXIF tag holding the camera orientation (1 = upright)
+_EXIF_ORIENTATION = 0x0112
+
+
+@dataclass
+class PreparedImage:
+    """Result of a single decode: Claude payload plus source metadata."""
+    b64: str
+    width: int  # original pixel dimensions (before resize)
+    height: int
+    aspect_ratio: str
+    orientation: int = 1
+
+
+def image_max_dim(profile: Optional[str] = None) -> int:
+    """Longest side for a use-case profile (None → MAX_IMAGE_DIMENSION)."""
+    if profile is None:
+        return MAX_IMAGE_DIMENSION
+    if profile not in IMAGE_PROFILES:
+        raise ValueError(f"Unknown image profile {profile!r} (expected one of {sorted(IMAGE_PROFILES)})")
+    override = os.getenv(f"IMAGE_MAX_DIM_{profile.upper()}")
+    return int(override) if override else IMAGE_PROFILES[profile]
+
+
+def _fit_within(w: int, h: int, max_dim: int) -> tuple[int, int]:
+    if max(w, h) <= max_dim:
+        return w, h
+    ratio = max_dim / max(w, h)
+    return int(w * ratio), int(h * ratio)
+
+
+def prepare_image(image_bytes: bytes, max_dim: int = MAX_IMAGE_DIMENSION) -> PreparedImage:
+    """
+    Open the image once and return base64 JPEG (max `max_dim` px), original
+    dimensions, aspect ratio and EXIF orientation.
+
+    JPEGs are decoded at a reduced DCT scale (draft mode) when the target is
+    much smaller than the source; other formats are shrunk with `reduce()`
+    before the final LANCZOS pass.
+    """
     _ensure_heif()
     img = Image.open(io.BytesIO(image_bytes))
+    w, h = img.size
+    try:
+        orientation = int(img.getexif().get(_EXIF_ORIENTATION, 1))
+    except Exception:
+        orientation = 1
+
+    new_w, new_h = _fit_within(w, h, max_dim)
+    if img.format == "JPEG" and (new_w, new_h) != (w, h):
+        # Decodes at 1/2, 1/4 or 1/8 scale, never below the requested size
+        img.draft("RGB", (new_w, new_h))
 
     # Convert HEIC/HEIF to JPEG (Pillow may not support HEIC natively)
     if img.mode not in ("RGB", "L"):
         img = img.convert("RGB")
 
-    # Resize if too large
-    w, h = img.size
-    if max(w, h) > MAX_IMAGE_DIMENSION:
-        ratio = MAX_IMAGE_DIMENSION / max(w, h)
-        new_w, new_h = int(w * ratio), int(h * ratio)
-        img = img.resize((new_w, new_h), Image.LANCZOS)
+    if img.size != (new_w, new_h):
+        img = img.resize((new_w, new_h), Image.LANCZOS, reducing_gap=3.0)
 
-    # Encode to JPEG
     buffer = io.BytesIO()
     img.save(buffer, format="JPEG", quality=85)
-    return base64.standard_b64encode(buffer.getvalue()).decode("utf-8")
+    return PreparedImage(
+        b64=base64.standard_b64encode(buffer.getvalue()).decode("utf-8"),
+        width=w,
+        height=h,
+        aspect_ratio=get_aspect_ratio_from_dimensions(w, h),
+        orientation=orientation,
+    )
+
+
+def encode_image_bytes(
+    image_bytes: bytes,
+    mime_type: str = "image/jpeg",
+    profile: Optional[str] = None,
+) -> str:
+    """Resize to the `profile`'s size (see IMAGE_PROFILES) and return base64."""
+    return prepare_image(image_bytes, image_max_dim(profile)).b64
 
 
 def get_aspect_ratio(image_bytes: bytes) -> str:
@@ -91,8 +161,8 @@ def get_aspect_ratio_from_dimensions(width: int, height: int) -> str:
         return f"{width}:{height}"
 
 
-def encode_cv2_frame(frame) -> str:
-    """Encode an OpenCV BGR frame to base64 JPEG string."""
+def encode_cv2_frame(frame, max_dim: int = MAX_IMAGE_DIMENSION) -> str:
+    """Encode an OpenCV BGR frame to base64 JPEG string (max `max_dim` px)."""
     import cv2
     # Convert BGR to RGB
     rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -100,8 +170,8 @@ def encode_cv2_frame(frame) -> str:
 
     # Resize if needed
     w, h = img.size
-    if max(w, h) > MAX_IMAGE_DIMENSION:
-        ratio = MAX_IMAGE_DIMENSION / max(w, h)
+    if max(w, h) > max_dim:
+        ratio = max_dim / max(w, h)
         new_w, new_h = int(w * ratio), int(h * ratio)
         img = img.resize((new_w, new_h), Image.LANCZOS)
 
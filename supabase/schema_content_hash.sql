@@ -0,0 +1,9 @@
+-- Migration: Content-hash dedup for media_library
+-- Purpose: Record the Drive md5Checksum of each original so identical bytes
+-- under another drive_file_id (copies, re-uploads, reorganised folders) reuse
+-- the existing analysis instead of a new Claude Vision call.
+
+ALTER TABLE media_library ADD COLUMN IF NOT EXISTS md5_checksum TEXT;
+COMMENT ON COLUMN media_library.md5_checksum IS 'MD5 of the original bytes (Drive md5Checksum, or computed locally)';
+
+CREATE INDEX IF NOT EXISTS idx_media_library_md5_checksum ON media_library(md5_checksum);
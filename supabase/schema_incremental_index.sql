@@ -0,0 +1,19 @@
+-- Migration: Incremental indexing via the Google Drive Changes feed
+-- Purpose: Persist the Drive changes page token between indexer runs and
+-- remember each file's Drive modifiedTime so only real edits get re-analysed.
+
+ALTER TABLE media_library ADD COLUMN IF NOT EXISTS drive_modified_time TIMESTAMPTZ;
+COMMENT ON COLUMN media_library.drive_modified_time IS 'Drive modifiedTime at last analysis — a newer value triggers re-analysis';
+
+-- Key/value state for background jobs (e.g. key = 'drive_changes_page_token')
+CREATE TABLE IF NOT EXISTS indexer_state (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- Files the Changes feed reports as trashed, deleted or moved out of the
+-- library tree. Kept apart from is_excluded (manual curation) and cleared
+-- when the file comes back.
+ALTER TABLE media_library ADD COLUMN IF NOT EXISTS drive_removed BOOLEAN NOT NULL DEFAULT false;
+COMMENT ON COLUMN media_library.drive_removed IS 'If true, the Drive file is trashed/deleted/outside the library folder — hidden like is_excluded, set and cleared by the incremental indexer';
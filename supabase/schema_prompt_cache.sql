@@ -0,0 +1,9 @@
+-- Migration: Prompt-cache token counts in cost_log
+-- Purpose: Record Claude prompt-cache reads and writes per call, so the
+-- savings from caching static prompt prefixes show up in cost dashboards.
+
+ALTER TABLE cost_log ADD COLUMN IF NOT EXISTS cache_read_tokens INTEGER;
+COMMENT ON COLUMN cost_log.cache_read_tokens IS 'Input tokens served from the Claude prompt cache (billed at 10% of the input rate)';
+
+ALTER TABLE cost_log ADD COLUMN IF NOT EXISTS cache_creation_tokens INTEGER;
+COMMENT ON COLUMN cost_log.cache_creation_tokens IS 'Input tokens written to the Claude prompt cache (billed at 125% of the input rate)';
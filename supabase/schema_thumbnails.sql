@@ -0,0 +1,11 @@
+-- Migration: Precomputed thumbnails
+-- Purpose: WebP thumbnails (300 and 600 px) generated by the indexer and
+-- stored in the public media-thumbnails bucket, so gallery / review /
+-- publish / carousel pages never call Drive to render a tile.
+
+ALTER TABLE media_library ADD COLUMN IF NOT EXISTS thumbnails JSONB;
+COMMENT ON COLUMN media_library.thumbnails IS 'Storage paths in the media-thumbnails bucket by size, e.g. {"300": "<drive_file_id>/300.webp", "600": "<drive_file_id>/600.webp"}';
+
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('media-thumbnails', 'media-thumbnails', true)
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,12 @@
+-- Migration: Persisted video probes
+-- Purpose: Store container metadata (duration, fps, dimensions, codec, audio)
+-- with the rows that own a video, keyed by content md5, so compositing and
+-- publishing never re-probe a known file.
+
+ALTER TABLE media_library ADD COLUMN IF NOT EXISTS video_probe JSONB;
+COMMENT ON COLUMN media_library.video_probe IS 'Container metadata from video_probe.probe_video() (duration, fps, width, height, codec, has_audio, md5)';
+
+ALTER TABLE creative_jobs ADD COLUMN IF NOT EXISTS video_probe JSONB;
+COMMENT ON COLUMN creative_jobs.video_probe IS 'Container metadata of the job''s result video, including its md5';
+
+CREATE INDEX IF NOT EXISTS idx_creative_jobs_video_probe_md5 ON creative_jobs ((video_probe->>'md5'));
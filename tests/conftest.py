@@ -0,0 +1,58 @@
+"""
+Shared fixtures for the unit tests. No network, no Supabase, no API key.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class FakeSupabase:
+    """Just enough of the supabase client for upserts into one table.
+
+    Every upsert call is recorded in `calls` as (table, rows, on_conflict).
+    A row whose drive_file_id is in `bad_ids` (or for which `reject(row)` is
+    true) makes the whole call fail.
+    """
+
+    def __init__(self, bad_ids=()):
+        self.calls: list[tuple[str, list[dict], str]] = []
+        self.rows: dict[str, dict] = {}
+        self.bad_ids = set(bad_ids)
+        self.reject = lambda row: row.get("drive_file_id") in self.bad_ids
+
+    def table(self, name: str):
+        return _FakeTable(self, name)
+
+
+class _FakeTable:
+    def __init__(self, db: FakeSupabase, name: str):
+        self.db = db
+        self.name = name
+        self._rows: list[dict] = []
+        self._on_conflict = ""
+
+    def upsert(self, rows, on_conflict: str = ""):
+        self._rows = rows if isinstance(rows, list) else [rows]
+        self._on_conflict = on_conflict
+        return self
+
+    def execute(self):
+        self.db.calls.append((self.name, self._rows, self._on_conflict))
+        if any(self.db.reject(r) for r in self._rows):
+            raise RuntimeError("bad row")
+        for row in self._rows:
+            self.db.rows[row[self._on_conflict]] = row
+        return self
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    """A FakeSupabase behind src.services.media_writer.get_supabase."""
+    db = FakeSupabase()
+    monkeypatch.setattr("src.services.media_writer.get_supabase", lambda: db)
+    return db
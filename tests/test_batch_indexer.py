@@ -0,0 +1,158 @@
+"""
+End-to-end run_batch_indexer against the fake Message Batches server:
+Drive, Supabase and the thumbnail store are replaced by in-memory fakes.
+"""
+import io
+
+import pytest
+from PIL import Image
+
+from src.services import media_indexer
+from src.services.fake_batch_api import MemoryMediaWriter, fake_analysis, start_fake_batch_server
+from src.services.media_writer import MediaWriteBuffer
+
+
+def _jpeg_bytes(color) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _image_files(n: int) -> list[dict]:
+    return [
+        {
+            "id": f"file-{i}",
+            "name": f"photo-{i}.jpg",
+            "mimeType": "image/jpeg",
+            "size": "1000",
+            "md5Checksum": f"md5-{i}",
+            "modifiedTime": "2026-01-01T00:00:00Z",
+            "_path": f"Hotel/photo-{i}.jpg",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def _start(**kwargs):
+        server, base_url = start_fake_batch_server(port=0, polls_until_ended=2, **kwargs)
+        servers.append(server)
+        return base_url
+
+    yield _start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def indexer_env(monkeypatch, fake_supabase):
+    """Patch media_indexer's Drive/Supabase seams; returns the saved state dict."""
+    state: dict = {}
+    monkeypatch.setattr(media_indexer, "_load_state", lambda key: state.get(key))
+    monkeypatch.setattr(media_indexer, "_save_state", lambda key, value: state.__setitem__(key, value))
+    monkeypatch.setattr(media_indexer, "_find_analyzed_by_md5", lambda md5s: {})
+    monkeypatch.setattr(media_indexer, "_make_thumbnails", lambda fid, b64: None)
+    monkeypatch.setattr(
+        media_indexer, "download_file_bytes",
+        lambda fid, md5=None, modified=None: _jpeg_bytes((int(fid.split("-")[1]) * 40, 90, 160)),
+    )
+    writer = MediaWriteBuffer(max_rows=1000, max_delay=3600)
+    monkeypatch.setattr(media_indexer, "get_media_writer", lambda: writer)
+    yield state
+    writer.close()
+
+
+def test_batch_run_writes_rows_and_errors(monkeypatch, indexer_env, fake_supabase, fake_server):
+    files = _image_files(3)
+    monkeypatch.setattr(media_indexer, "_list_pending", lambda *args: files)
+    base_url = fake_server(fail_ids={"img-000001"})
+
+    stats = media_indexer.run_batch_indexer(base_url=base_url, workers=2, poll_interval=0)
+
+    assert stats == {"processed": 2, "errors": 1, "images": 2, "videos": 0}
+    rows = fake_supabase.rows
+    assert set(rows) == {"file-0", "file-1", "file-2"}
+    assert rows["file-1"]["status"] == "error"
+    for fid, custom_id in (("file-0", "img-000000"), ("file-2", "img-000002")):
+        expected = fake_analysis(custom_id)
+        assert rows[fid]["status"] == "analyzed"
+        assert rows[fid]["category"] == expected["category"]
+        assert rows[fid]["ig_quality"] == expected["ig_quality"]
+        assert rows[fid]["md5_checksum"] == f"md5-{fid[-1]}"
+        assert rows[fid]["file_path"] == f"Hotel/photo-{fid[-1]}.jpg"
+    assert indexer_env[media_indexer.STATE_PENDING_BATCH] == {}
+
+
+def test_pending_batch_is_resumed_not_resubmitted(monkeypatch, indexer_env, fake_supabase, fake_server):
+    files = _image_files(2)
+    base_url = fake_server()
+    client = media_indexer._get_batch_client(base_url)
+    pending = media_indexer._submit_batches(client, files, workers=1)
+    pending.pop("errors")
+    indexer_env[media_indexer.STATE_PENDING_BATCH] = pending
+
+    def _no_listing(*args):
+        raise AssertionError("a pending batch must be collected, not resubmitted")
+
+    monkeypatch.setattr(media_indexer, "_list_pending", _no_listing)
+    stats = media_indexer.run_batch_indexer(base_url=base_url, poll_interval=0)
+
+    assert stats["processed"] == 2 and stats["errors"] == 0
+    assert {r["status"] for r in fake_supabase.rows.values()} == {"analyzed"}
+    assert indexer_env[media_indexer.STATE_PENDING_BATCH] == {}
+
+
+def test_failed_write_leaves_an_error_row(monkeypatch, indexer_env, fake_supabase, fake_server):
+    monkeypatch.setattr(media_indexer, "_list_pending", lambda *args: _image_files(2))
+    fake_supabase.reject = lambda row: row["drive_file_id"] == "file-1" and row["status"] == "analyzed"
+
+    stats = media_indexer.run_batch_indexer(base_url=fake_server(), poll_interval=0)
+
+    assert stats["processed"] == 1 and stats["errors"] == 1
+    assert fake_supabase.rows["file-0"]["status"] == "analyzed"
+    assert fake_supabase.rows["file-1"]["status"] == "error"
+
+
+def test_missing_batch_marks_its_files_and_is_dropped(indexer_env, fake_supabase, fake_server):
+    files = _image_files(2)
+    indexer_env[media_indexer.STATE_PENDING_BATCH] = {
+        "batch_ids": ["msgbatch_gone"],
+        "files": {
+            f"img-{i:06d}": {"file_info": f, "aspect_ratio": "4:3", "batch_id": "msgbatch_gone"}
+            for i, f in enumerate(files)
+        },
+    }
+
+    stats = media_indexer.run_batch_indexer(base_url=fake_server(), poll_interval=0)
+
+    assert stats["errors"] == 2
+    assert {r["status"] for r in fake_supabase.rows.values()} == {"error"}
+    assert "NotFoundError" in fake_supabase.rows["file-0"]["error_message"]
+    assert indexer_env[media_indexer.STATE_PENDING_BATCH] == {}
+
+
+def test_injected_store_and_writer_keep_production_untouched(monkeypatch, fake_server):
+    def _no_supabase():
+        raise AssertionError("the fake batch flow must not touch Supabase")
+
+    monkeypatch.setattr(media_indexer, "get_supabase", _no_supabase)
+    monkeypatch.setattr("src.services.media_writer.get_supabase", _no_supabase)
+    monkeypatch.setattr(media_indexer, "_list_pending", lambda *args: _image_files(2))
+    monkeypatch.setattr(media_indexer, "_find_analyzed_by_md5", lambda md5s: {})
+    monkeypatch.setattr(media_indexer, "store_thumbnails", lambda *args: pytest.fail("thumbnails stored"))
+    monkeypatch.setattr(
+        media_indexer, "download_file_bytes", lambda fid, md5=None, modified=None: _jpeg_bytes((10, 20, 30)),
+    )
+    state_store: dict = {}
+    writer = MemoryMediaWriter()
+
+    stats = media_indexer.run_batch_indexer(
+        base_url=fake_server(), poll_interval=0, state_store=state_store, writer=writer,
+    )
+
+    assert stats["processed"] == 2
+    assert {r["status"] for r in writer.rows.values()} == {"analyzed"}
+    assert state_store == {media_indexer.STATE_PENDING_BATCH: {}}
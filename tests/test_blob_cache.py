@@ -0,0 +1,66 @@
+import hashlib
+
+import pytest
+
+from src.services import google_drive
+from src.services.blob_cache import BlobCache
+
+
+def _md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BlobCache(tmp_path, max_bytes=1000)
+
+
+def test_hit_only_for_the_same_version(cache):
+    v1, v2 = b"version one", b"version two"
+    cache.put("f", v1, _md5(v1), "2026-01-01")
+    assert cache.get("f", _md5(v1), "2026-01-01") == v1
+    assert cache.get("f", _md5(v2), "2026-02-01") is None  # file edited on Drive
+
+    # files without an md5 (Google-native formats) match on modifiedTime
+    cache.put("doc", v2, None, "2026-01-01")
+    assert cache.get("doc", None, "2026-01-01") == v2
+    assert cache.get("doc", None, "2026-02-01") is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 2)
+
+
+def test_blobs_are_shared_by_content(cache, tmp_path):
+    data = b"same bytes"
+    cache.put("original", data, _md5(data))
+    assert cache.get("copy", _md5(data)) == data
+    assert cache.stats()["blobs"] == 1
+
+
+def test_put_skips_bytes_that_do_not_match(cache):
+    cache.put("f", b"changed mid-download", "0" * 32)
+    assert cache.stats()["blobs"] == 0
+
+
+def test_lru_eviction_by_size(cache, monkeypatch):
+    clock = iter(range(100, 200))
+    monkeypatch.setattr("src.services.blob_cache.time.time", lambda: next(clock))
+    a, b, c = b"a" * 400, b"b" * 400, b"c" * 400
+    cache.put("a", a, _md5(a))
+    cache.put("b", b, _md5(b))
+    cache.get("a", _md5(a))  # b is now least recently used
+    cache.put("c", c, _md5(c))
+
+    assert cache.get("b", _md5(b)) is None
+    assert cache.get("a", _md5(a)) == a and cache.get("c", _md5(c)) == c
+    assert not (cache.root / "blobs" / _md5(b)[:2] / _md5(b)).exists()
+    assert cache.stats()["bytes"] == 800
+
+
+def test_download_goes_through_the_cache(cache, monkeypatch):
+    data = b"drive original"
+    downloads = []
+    monkeypatch.setattr(google_drive, "get_blob_cache", lambda: cache)
+    monkeypatch.setattr(google_drive, "_download_bytes", lambda fid: downloads.append(fid) or data)
+
+    for _ in range(3):
+        assert google_drive.download_file_bytes("f", _md5(data), "2026-01-01") == data
+    assert downloads == ["f"]
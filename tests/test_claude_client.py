@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from src.services import claude_client, vision_analyzer
+
+
+async def _client():
+    return claude_client.get_async_anthropic_client()
+
+
+def test_background_loop_keeps_one_async_client(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    first = claude_client.run_on_background_loop(_client())
+    second = claude_client.run_on_background_loop(_client())
+    assert first is second
+    assert not first.is_closed()
+
+
+def test_callable_from_a_running_loop(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    sync_client = claude_client.run_on_background_loop(_client())
+
+    async def _inside_loop():
+        return claude_client.run_on_background_loop(_client())
+
+    assert asyncio.run(_inside_loop()) is sync_client
+
+
+def test_refuses_to_block_its_own_loop():
+    async def _nested():
+        return claude_client.run_on_background_loop(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        claude_client.run_on_background_loop(_nested())
+
+
+def test_concurrent_wrapper_returns_failures_in_order(monkeypatch):
+    async def _fake_analyze(b64, *args):
+        if b64 == "bad":
+            raise ValueError(b64)
+        return b64.upper()
+
+    monkeypatch.setattr(vision_analyzer, "analyze_image_async", _fake_analyze)
+    result = vision_analyzer.analyze_images_concurrent(["a", "bad", "c"], max_concurrency=2)
+    assert result[0] == "A" and result[2] == "C"
+    assert isinstance(result[1], ValueError)
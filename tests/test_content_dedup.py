@@ -0,0 +1,53 @@
+from src.services import media_indexer
+from src.services.fake_batch_api import MemoryMediaWriter
+from src.services.index_journal import IndexJournal
+
+SOURCE = {
+    "drive_file_id": "orig", "md5_checksum": "same", "media_type": "image",
+    "category": "room", "subcategory": "suite", "ambiance": ["warm"], "season": ["any_season"],
+    "elements": ["bed"], "ig_quality": 8, "aspect_ratio": "4:3",
+    "description_fr": "Suite", "description_en": "Suite", "thumbnails": {"256": "t/orig.webp"},
+}
+
+
+def test_clone_copies_analysis_and_sets_identity():
+    info = {"id": "copy", "name": "copy.jpg", "mimeType": "image/jpeg", "size": "42",
+            "_path": "Rooms/copy.jpg", "modifiedTime": "2026-01-01T00:00:00Z"}
+    row = media_indexer._clone_analysis_row(SOURCE, info, "same")
+
+    assert row["drive_file_id"] == "copy" and row["file_path"] == "Rooms/copy.jpg"
+    assert row["category"] == "room" and row["ig_quality"] == 8
+    assert row["thumbnails"] == SOURCE["thumbnails"]
+    assert row["file_size_bytes"] == 42 and row["md5_checksum"] == "same"
+    assert row["status"] == "analyzed"
+    assert row["drive_modified_time"] == "2026-01-01T00:00:00Z"
+
+
+def test_uploaded_duplicate_skips_vision(monkeypatch):
+    data = b"identical bytes"
+    md5 = media_indexer.hashlib.md5(data).hexdigest()
+    written = []
+    monkeypatch.setattr(media_indexer, "_find_analyzed_by_md5", lambda md5s: {md5: SOURCE})
+    monkeypatch.setattr(media_indexer, "_upsert_media", written.append)
+    monkeypatch.setattr(media_indexer, "analyze_image", lambda *a, **kw: 1 / 0)
+
+    row = media_indexer.process_image_bytes(data, "dup.jpg", "image/jpeg", "dup", len(data))
+
+    assert written == [row]
+    assert row["category"] == "room" and row["md5_checksum"] == md5
+
+
+def test_pipeline_clones_known_hashes_without_downloading(monkeypatch, tmp_path):
+    files = [{"id": f"f{i}", "name": f"f{i}.jpg", "mimeType": "image/jpeg", "size": "1",
+              "md5Checksum": "same"} for i in range(3)]
+    monkeypatch.setattr(media_indexer, "_find_analyzed_by_md5",
+                        lambda md5s: {"same": SOURCE} if "same" in md5s else {})
+    monkeypatch.setattr(media_indexer, "download_file_bytes", lambda *a, **kw: 1 / 0)
+    monkeypatch.setattr(media_indexer, "IndexJournal", lambda: IndexJournal(tmp_path))
+    writer = MemoryMediaWriter()
+
+    stats = media_indexer._run_pipeline(files, workers=2, writer=writer)
+
+    assert stats["cloned"] == 3 and stats["errors"] == 0
+    assert {r["category"] for r in writer.rows.values()} == {"room"}
+    assert set(writer.rows) == {"f0", "f1", "f2"}
@@ -0,0 +1,110 @@
+from src.services import google_drive
+
+
+class _Request:
+    """files().get stand-in; `result` is returned, or raised if an exception."""
+
+    def __init__(self, key, result=None):
+        self.key = key
+        self.result = {"id": key} if result is None else result
+        self.executions = 0
+
+    def execute(self):
+        self.executions += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service, self.callback, self.items = service, callback, []
+
+    def add(self, request, request_id):
+        self.items.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append([r.key for _, r in self.items])
+        if self.service.fail_batches:
+            raise ConnectionError("batch request failed")
+        for request_id, request in reversed(self.items):  # any order
+            try:
+                self.callback(request_id, request.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class _FakeService:
+    def __init__(self, fail_batches=False, metadata=None):
+        self.batches = []
+        self.fail_batches = fail_batches
+        self.metadata = metadata or {}
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields):
+        return _Request(fileId, self.metadata.get(fileId))
+
+
+def test_results_keep_request_order_across_batches(monkeypatch):
+    monkeypatch.setattr(google_drive, "DRIVE_BATCH_SIZE", 3)
+    service = _FakeService()
+    requests = [_Request(f"f{i}") for i in range(7)]
+
+    results = google_drive.execute_batched(requests, service)
+
+    assert [r for r, _ in results] == [{"id": f"f{i}"} for i in range(7)]
+    assert service.batches == [["f0", "f1", "f2"], ["f3", "f4", "f5"], ["f6"]]
+
+
+def test_failed_item_does_not_fail_the_others():
+    missing = ValueError("gone")
+    requests = [_Request("a"), _Request("b", missing), _Request("c")]
+
+    results = google_drive.execute_batched(requests, _FakeService())
+
+    assert results[0] == ({"id": "a"}, None) and results[2] == ({"id": "c"}, None)
+    assert results[1][1] is not None
+
+
+def test_failed_batch_falls_back_to_single_requests():
+    service = _FakeService(fail_batches=True)
+    requests = [_Request("a"), _Request("b")]
+
+    results = google_drive.execute_batched(requests, service)
+
+    assert results == [({"id": "a"}, None), ({"id": "b"}, None)]
+    assert [r.executions for r in requests] == [1, 1]
+
+
+def test_single_request_skips_the_batch():
+    service = _FakeService()
+    assert google_drive.execute_batched([_Request("a")], service) == [({"id": "a"}, None)]
+    assert service.batches == []
+
+
+def test_metadata_lookups_are_deduplicated(monkeypatch):
+    service = _FakeService()
+    monkeypatch.setattr(google_drive, "get_drive_service", lambda: service)
+
+    meta = google_drive.get_files_metadata(["a", "b", "a"], "id")
+
+    assert meta == {"a": {"id": "a"}, "b": {"id": "b"}}
+    assert service.batches == [["a", "b"]]
+    assert google_drive.get_files_metadata([], "id") == {}
+
+
+def test_thumbnail_links_are_resized(monkeypatch):
+    service = _FakeService(metadata={
+        "a": {"thumbnailLink": "https://lh3.example/a=s220"},
+        "b": {"name": "no thumbnail"},
+    })
+    monkeypatch.setattr(google_drive, "get_drive_service", lambda: service)
+
+    assert google_drive.get_thumbnail_links(["a", "b"], size=800) == {
+        "a": "https://lh3.example/a=s800", "b": None,
+    }
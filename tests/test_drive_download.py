@@ -0,0 +1,76 @@
+import hashlib
+
+import pytest
+
+from src.services import google_drive
+
+DATA = bytes(range(256)) * 1000  # 256 KB
+
+
+class _FakeDownloader:
+    """MediaIoBaseDownload stand-in: writes the payload in `chunksize` pieces."""
+
+    instances = []
+
+    def __init__(self, fd, request, chunksize):
+        self.fd, self.chunksize, self.pos = fd, chunksize, 0
+        self.writes = 0
+        _FakeDownloader.instances.append(self)
+
+    def next_chunk(self):
+        self.fd.write(DATA[self.pos:self.pos + self.chunksize])
+        self.writes += 1
+        self.pos += self.chunksize
+        return None, self.pos >= len(DATA)
+
+
+class _FakeService:
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        return object()
+
+
+@pytest.fixture
+def streamed(monkeypatch):
+    _FakeDownloader.instances.clear()
+    monkeypatch.setattr(google_drive, "MediaIoBaseDownload", _FakeDownloader)
+    monkeypatch.setattr(google_drive, "get_drive_service", lambda: _FakeService())
+    monkeypatch.setattr(google_drive, "DOWNLOAD_CHUNK_SIZE", 64 * 1024)
+    return _FakeDownloader.instances
+
+
+def test_streamed_download_hashes_while_writing(streamed, tmp_path):
+    dest = tmp_path / "video.mp4"
+    md5 = google_drive.download_file_to_path(
+        "f1", str(dest), size=len(DATA), md5_checksum=hashlib.md5(DATA).hexdigest(),
+    )
+
+    assert md5 == hashlib.md5(DATA).hexdigest()
+    assert dest.read_bytes() == DATA
+    # bounded memory: the payload arrived in DOWNLOAD_CHUNK_SIZE pieces
+    assert streamed[0].chunksize == 64 * 1024 and streamed[0].writes == 4
+
+
+def test_streamed_download_rejects_md5_mismatch(streamed, tmp_path):
+    with pytest.raises(IOError, match="md5 mismatch"):
+        google_drive.download_file_to_path("f1", str(tmp_path / "v.mp4"), size=len(DATA), md5_checksum="0" * 32)
+
+
+def test_temp_file_download_returns_path_and_md5(streamed):
+    path, md5 = google_drive.download_to_temp_file("f1", suffix=".mp4", size=len(DATA))
+    try:
+        assert path.endswith(".mp4")
+        assert md5 == hashlib.md5(DATA).hexdigest()
+        with open(path, "rb") as fh:
+            assert fh.read() == DATA
+    finally:
+        google_drive.os.unlink(path)
+
+
+def test_temp_file_removed_on_mismatch(streamed, monkeypatch, tmp_path):
+    monkeypatch.setattr(google_drive.tempfile, "tempdir", str(tmp_path))
+    with pytest.raises(IOError):
+        google_drive.download_to_temp_file("f1", size=len(DATA), md5_checksum="0" * 32)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from src.services import google_drive, media_indexer
+
+FOLDER = google_drive.FOLDER_MIME
+
+# folder id → pages of children (a page is a list of (id, name, mimeType))
+TREE = {
+    "root": [[("a", "A", FOLDER), ("r1", "r1.jpg", "image/jpeg"), ("b", "B", FOLDER),
+              ("doc", "notes.pdf", "application/pdf")]],
+    "a": [[("a1", "a1.mp4", "video/mp4"), ("aa", "AA", FOLDER)],
+          [("a2", "a2.jpg", "image/jpeg")]],
+    "b": [[("b1", "b1.png", "image/png")]],
+    "aa": [[("aa1", "deep.jpg", "image/jpeg")]],
+}
+
+
+@pytest.fixture
+def serve_tree(monkeypatch):
+    """Serve a tree through _list_folder_pages; returns the chunks it was asked for."""
+    chunks = []
+    lock = threading.Lock()
+
+    def _serve(tree):
+        def _pages(chunk):
+            with lock:
+                chunks.append(chunk)
+            results = []
+            for fid, path, token in chunk:
+                index = int(token or 0)
+                children = tree[fid][index]
+                resp = {"files": [{"id": i, "name": n, "mimeType": m} for i, n, m in children]}
+                if index + 1 < len(tree[fid]):
+                    resp["nextPageToken"] = str(index + 1)
+                results.append((fid, path, resp))
+            return results
+
+        monkeypatch.setattr(google_drive, "_list_folder_pages", _pages)
+        return chunks
+
+    return _serve
+
+
+def test_breadth_first_with_paths_and_paging(serve_tree):
+    chunks = serve_tree(TREE)
+    files = list(google_drive.iter_media_files("root", max_concurrency=1, batch_size=1))
+
+    # level by level; a folder's next page queues behind the folders already found
+    assert [f["id"] for f in files] == ["r1", "a1", "b1", "aa1", "a2"]
+    assert [c[0][:2] for c in chunks] == [("root", ""), ("a", "/A"), ("b", "/B"), ("aa", "/A/AA"), ("a", "/A")]
+    assert files[3]["_path"] == "/A/AA/deep.jpg"
+
+
+def test_sibling_folders_share_batch_requests(serve_tree):
+    tree = {"root": [[(f"d{i}", f"D{i}", FOLDER) for i in range(6)]]}
+    tree.update({f"d{i}": [[(f"f{i}", f"f{i}.jpg", "image/jpeg")]] for i in range(6)})
+    chunks = serve_tree(tree)
+
+    files = list(google_drive.iter_media_files("root", max_concurrency=2, batch_size=100))
+
+    assert sorted(f["id"] for f in files) == [f"f{i}" for i in range(6)]
+    # root alone, then the six folders spread over the two free slots
+    assert [len(c) for c in chunks] == [1, 3, 3]
+
+
+def test_limit_stops_the_listing_early():
+    consumed = []
+
+    def _listing():
+        for i in range(100):
+            consumed.append(i)
+            yield {"id": f"f{i}"}
+
+    listed = []
+    pending = list(media_indexer._iter_pending(
+        _listing(), indexed_ids={"f0", "f2", "f3"}, error_ids={"f3"}, limit=3, listed=listed,
+    ))
+
+    assert [f["id"] for f in pending] == ["f1", "f3", "f4"]
+    assert len(consumed) == 5 and len(listed) == 5
@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src.services import google_drive
+
+
+class _HttpError(Exception):
+    """googleapiclient HttpError stand-in: `resp.status` and a JSON body."""
+
+    def __init__(self, status, reason=None):
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+        errors = [{"reason": reason}] if reason else []
+        self.content = json.dumps({"error": {"code": status, "errors": errors}}).encode()
+
+
+@pytest.mark.parametrize("exc, retryable", [
+    (_HttpError(404, "notFound"), False),
+    (_HttpError(403, "forbidden"), False),
+    (_HttpError(403, "rateLimitExceeded"), True),
+    (_HttpError(403, "userRateLimitExceeded"), True),
+    (_HttpError(403), False),
+    (_HttpError(429, "rateLimitExceeded"), True),
+    (_HttpError(500), True),
+    (ConnectionError("reset"), True),
+])
+def test_retry_rules(exc, retryable):
+    assert google_drive._is_retryable(exc) is retryable
+
+
+class _Request:
+    def __init__(self, first_error):
+        self.first_error, self.executions = first_error, 0
+
+    def execute(self):
+        self.executions += 1
+        return {"ok": True}
+
+
+class _FakeService:
+    """Batches fail every item with its request's `first_error`."""
+
+    def new_batch_http_request(self, callback):
+        items = []
+        batch = type("Batch", (), {})()
+        batch.add = lambda request, request_id: items.append((request_id, request))
+        batch.execute = lambda: [callback(rid, None, r.first_error) for rid, r in items]
+        return batch
+
+
+def test_only_retryable_items_are_retried():
+    requests = [
+        _Request(_HttpError(404, "notFound")),
+        _Request(_HttpError(403, "forbidden")),
+        _Request(_HttpError(403, "userRateLimitExceeded")),
+        _Request(_HttpError(503)),
+    ]
+
+    results = google_drive.execute_batched(requests, _FakeService())
+
+    assert [r.executions for r in requests] == [0, 0, 1, 1]
+    assert [response for response, _ in results] == [None, None, {"ok": True}, {"ok": True}]
+    assert results[0][1].resp.status == 404
+
+
+class _Credentials:
+    """Expired credentials whose refresh is slow enough for threads to pile up."""
+
+    def __init__(self):
+        self.token, self.refreshes = "old", 0
+
+    @property
+    def valid(self):
+        return self.token != "old"
+
+    def refresh(self, request):
+        self.refreshes += 1
+        time.sleep(0.1)
+        self.token = f"new-{self.refreshes}"
+
+
+def test_concurrent_refreshes_collapse_to_one():
+    refreshed = []
+    creds = _Credentials()
+    pool = google_drive._DriveServicePool(lambda: creds, on_refresh=refreshed.append)
+    shared = pool._share_refresh(creds)
+    start = threading.Barrier(6)
+
+    def _worker():
+        start.wait()
+        shared.refresh(None)
+
+    threads = [threading.Thread(target=_worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert creds.refreshes == 1 and creds.token == "new-1"
+    assert refreshed == [creds]
+
+
+def test_credentials_refresh_an_expired_token(monkeypatch):
+    monkeypatch.setattr(google_drive, "Request", lambda: None)
+    creds = _Credentials()
+    pool = google_drive._DriveServicePool(lambda: creds)
+
+    assert pool.credentials() is creds and creds.valid
+    assert pool.credentials() is creds and creds.refreshes == 1
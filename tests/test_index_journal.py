@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+
+from src.services.index_journal import (
+    IndexJournal,
+    JournalLockedError,
+    STAGE_ANALYSED,
+    STAGE_DOWNLOADED,
+    STAGE_ENCODED,
+    STAGE_FAILED,
+    STAGE_PERSISTED,
+)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    j = IndexJournal(tmp_path)
+    yield j
+    j.close()
+
+
+def _info(file_id: str, md5: str = "m1") -> dict:
+    return {"id": file_id, "md5Checksum": md5}
+
+
+def test_resume_point_by_stage(journal):
+    journal.record("dl", STAGE_DOWNLOADED, "m1")
+    journal.save_payload("enc", "QUJD")
+    journal.record("enc", STAGE_ENCODED, "m1", aspect_ratio=1.5)
+    journal.record("ana", STAGE_ANALYSED, "m1", row={"drive_file_id": "ana"})
+    journal.record("done", STAGE_ANALYSED, "m1", row={})
+    journal.record("done", STAGE_PERSISTED, "m1")
+
+    assert journal.resume_point(_info("dl")) is None
+    assert journal.resume_point(_info("enc"))["aspect_ratio"] == 1.5
+    assert journal.load_payload("enc") == "QUJD"
+    assert journal.resume_point(_info("ana"))["row"] == {"drive_file_id": "ana"}
+    assert journal.resume_point(_info("done")) is None
+    assert journal.resume_point(_info("unknown")) is None
+    assert journal.pending_count() == 3
+
+
+def test_resume_point_rejects_edited_file(journal):
+    journal.record("ana", STAGE_ANALYSED, "m1", row={})
+    assert journal.resume_point(_info("ana", md5="m2")) is None
+
+
+def test_encoded_without_payload_starts_over(journal):
+    journal.record("enc", STAGE_ENCODED, "m1")
+    assert journal.resume_point(_info("enc")) is None
+
+
+def test_state_survives_reopen(tmp_path):
+    j = IndexJournal(tmp_path)
+    j.record("ana", STAGE_ANALYSED, "m1", row={"category": "room"})
+    j.close()
+    with open(tmp_path / "journal.jsonl", "a") as fh:
+        fh.write('{"file_id": "torn", "sta')  # crash mid-write
+    j = IndexJournal(tmp_path)
+    assert j.resume_point(_info("ana"))["row"] == {"category": "room"}
+    j.close()
+
+
+def test_terminal_stages_delete_payloads(journal):
+    for fid, stage in (("ok", STAGE_PERSISTED), ("bad", STAGE_FAILED), ("ana", STAGE_ANALYSED)):
+        journal.save_payload(fid, "QUJD")
+        journal.record(fid, STAGE_ENCODED, "m1")
+        journal.record(fid, stage, "m1")
+        assert journal.load_payload(fid) is None
+
+
+def test_compact_keeps_only_unfinished(journal, tmp_path):
+    journal.save_payload("enc", "QUJD")
+    journal.record("enc", STAGE_ENCODED, "m1")
+    journal.record("ok", STAGE_PERSISTED, "m1")
+    journal.record("bad", STAGE_FAILED, "m1", error="boom")
+    (tmp_path / "payloads" / "orphan.b64").write_text("x")
+
+    journal.compact()
+
+    lines = (tmp_path / "journal.jsonl").read_text().splitlines()
+    assert len(lines) == 1 and '"enc"' in lines[0]
+    assert sorted(p.name for p in (tmp_path / "payloads").iterdir()) == ["enc.b64"]
+    assert journal.resume_point(_info("enc")) is not None
+
+
+def test_compact_expires_old_entries(journal, tmp_path):
+    journal.save_payload("enc", "QUJD")
+    journal.record("enc", STAGE_ENCODED, "m1")
+    journal.compact(max_age=timedelta(seconds=-1))
+    assert journal.pending_count() == 0
+    assert list((tmp_path / "payloads").iterdir()) == []
+
+
+def test_one_run_at_a_time(journal, tmp_path):
+    with pytest.raises(JournalLockedError):
+        IndexJournal(tmp_path)
+    journal.close()
+    IndexJournal(tmp_path).close()
@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.services import video_analyzer
+
+
+def _textured(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, (9, 16, 3), dtype=np.uint8)
+    return cv2.resize(small, (320, 180), interpolation=cv2.INTER_NEAREST)
+
+
+def test_near_duplicates_dropped_before_encoding():
+    scene = video_analyzer._SceneKeyframes()
+    base = _textured(0)
+    brighter = np.clip(base.astype(np.int16) + 4, 0, 255).astype(np.uint8)
+
+    scene.offer(base)
+    scene.offer(brighter)  # same shot, slightly different exposure
+    scene.offer(_textured(1))
+
+    assert len(scene.frames) == 2 and scene.dropped == 1
+    assert scene.considered == 3
+
+
+@pytest.fixture
+def static_then_cut(tmp_path):
+    """12 s of one still shot, then 6 s of another, at 10 fps."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (320, 180))
+    for i in range(180):
+        writer.write(_textured(0 if i < 120 else 1))
+    writer.release()
+    return path
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_static_shot_yields_one_keyframe(static_then_cut, adaptive):
+    scenes, frames, dropped = video_analyzer.scan_video(static_then_cut, adaptive=adaptive)
+
+    assert [round(start) for start, _ in scenes] == [0, 12]
+    # keyframes at 0, 5, 10 s of the still shot collapse into one
+    assert [len(f) for f in frames] == [1, 1]
+    assert dropped == [2, 1]
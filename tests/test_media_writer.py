@@ -0,0 +1,58 @@
+from src.services.media_writer import MediaWriteBuffer
+
+
+def _writer():
+    # Large thresholds: only explicit flush() writes
+    return MediaWriteBuffer(max_rows=1000, max_delay=3600)
+
+
+def test_rows_grouped_by_column_set(fake_supabase):
+    writer = _writer()
+    writer.add({"drive_file_id": "a", "status": "analyzed", "file_path": "x/a.jpg"})
+    writer.add({"drive_file_id": "b", "status": "analyzed", "file_path": "x/b.jpg"})
+    writer.add({"drive_file_id": "c", "status": "error"})
+    assert writer.flush() == []
+    writer.close()
+
+    batches = sorted(len(rows) for _, rows, _ in fake_supabase.calls)
+    assert batches == [1, 2]
+    assert all(conflict == "drive_file_id" for _, _, conflict in fake_supabase.calls)
+    assert "file_path" not in fake_supabase.rows["c"]
+
+
+def test_last_row_wins_per_conflict_key(fake_supabase):
+    writer = _writer()
+    writer.add({"drive_file_id": "a", "status": "error"})
+    writer.add({"drive_file_id": "a", "status": "analyzed"})
+    writer.flush()
+    writer.close()
+
+    assert len(fake_supabase.calls) == 1
+    assert fake_supabase.rows["a"]["status"] == "analyzed"
+
+
+def test_failed_batch_falls_back_to_single_rows(fake_supabase):
+    fake_supabase.bad_ids = {"bad"}
+    outcomes = {}
+    writer = _writer()
+    for fid in ("a", "bad", "c"):
+        writer.add({"drive_file_id": fid, "status": "analyzed"},
+                   on_done=lambda exc, fid=fid: outcomes.__setitem__(fid, exc))
+    failures = writer.flush()
+    writer.close()
+
+    assert [row["drive_file_id"] for row, _ in failures] == ["bad"]
+    assert outcomes["a"] is None and outcomes["c"] is None
+    assert isinstance(outcomes["bad"], RuntimeError)
+    assert set(fake_supabase.rows) == {"a", "c"}
+    # one failed bulk write, then one write per row
+    assert [len(rows) for _, rows, _ in fake_supabase.calls] == [3, 1, 1, 1]
+
+
+def test_background_flush_on_size(fake_supabase):
+    done = []
+    writer = MediaWriteBuffer(max_rows=2, max_delay=3600)
+    writer.add({"drive_file_id": "a"}, on_done=done.append)
+    writer.add({"drive_file_id": "b"}, on_done=done.append)
+    writer.close()
+    assert done == [None, None]
@@ -0,0 +1,73 @@
+import queue
+
+import pytest
+
+from src.services import media_indexer
+from src.services.index_journal import IndexJournal, STAGE_ANALYSED
+from src.services.media_writer import MediaWriteBuffer
+
+
+def _job(file_id: str, **kwargs) -> media_indexer._IndexJob:
+    info = {"id": file_id, "name": f"{file_id}.jpg", "md5Checksum": "m1"}
+    return media_indexer._IndexJob(file_info=info, media_type="image", **kwargs)
+
+
+def _run(jobs, journal=None, writer=None) -> list:
+    inbox, outbox = queue.Queue(), queue.Queue()
+    for job in jobs:
+        inbox.put(job)
+    inbox.put(media_indexer._STAGE_DONE)
+    thread = media_indexer._start_persist_worker(inbox, outbox, journal=journal, writer=writer)
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    out = []
+    while True:
+        item = outbox.get(timeout=1)
+        if item is media_indexer._STAGE_DONE:
+            return out
+        out.append(item)
+
+
+@pytest.fixture
+def writer(fake_supabase):
+    w = MediaWriteBuffer(max_rows=1000, max_delay=3600)
+    yield w
+    w.close()
+
+
+def test_failed_write_of_journaled_analysis_leaves_file_pending(tmp_path, writer, fake_supabase):
+    journal = IndexJournal(tmp_path)
+    row = {"drive_file_id": "a", "status": "analyzed"}
+    journal.record("a", STAGE_ANALYSED, "m1", row=row)
+    fake_supabase.bad_ids = {"a"}
+
+    [job] = _run([_job("a", row=row)], journal=journal, writer=writer)
+
+    assert isinstance(job.error, RuntimeError)
+    assert "a" not in fake_supabase.rows  # no error row hides it from the next run
+    assert journal.resume_point(job.file_info)["stage"] == STAGE_ANALYSED
+    journal.close()
+
+
+def test_failed_write_without_journal_writes_error_row(writer, fake_supabase):
+    fake_supabase.reject = lambda row: row["status"] == "analyzed"
+
+    [job] = _run([_job("a", row={"drive_file_id": "a", "status": "analyzed"})], writer=writer)
+
+    assert job.error is not None
+    assert fake_supabase.rows["a"]["status"] == "error"
+
+
+def test_done_marker_forwarded_when_a_job_blows_up():
+    class BrokenWriter:
+        def add(self, row, on_done=None):
+            raise RuntimeError("writer down")
+
+        def flush(self):
+            return []
+
+    jobs = [_job("a", row={"drive_file_id": "a"}), _job("b", error=ValueError("bad"))]
+    out = _run(jobs, writer=BrokenWriter())
+
+    assert [j.file_info["id"] for j in out] == ["a", "b"]
+    assert all(j.error is not None for j in out)
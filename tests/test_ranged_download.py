@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+
+import pytest
+
+from src.services import google_drive
+
+DATA = bytes(range(256)) * 1000  # 256 KB
+PART = 16 * 1024
+
+
+@pytest.fixture
+def ranged(monkeypatch):
+    """Serve read_file_range from DATA with small parts; track parts in flight."""
+    state = {"in_flight": 0, "peak": 0, "ranges": []}
+    lock = threading.Lock()
+
+    def _read(file_id, start, end):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            state["ranges"].append((start, end))
+        time.sleep(0.005)
+        with lock:
+            state["in_flight"] -= 1
+        return DATA[start:end + 1]
+
+    monkeypatch.setattr(google_drive, "read_file_range", _read)
+    monkeypatch.setattr(google_drive, "RANGE_PART_SIZE", PART)
+    monkeypatch.setattr(google_drive, "RANGED_DOWNLOAD_MIN_BYTES", PART)
+    return state
+
+
+def test_ranged_download_reassembles_the_file(ranged, tmp_path):
+    dest = tmp_path / "video.mp4"
+    md5 = google_drive.download_file_to_path(
+        "f1", str(dest), size=len(DATA), md5_checksum=hashlib.md5(DATA).hexdigest(), concurrency=3,
+    )
+
+    assert md5 == hashlib.md5(DATA).hexdigest()
+    assert dest.read_bytes() == DATA
+    assert sorted(ranged["ranges"])[-1] == (len(DATA) - len(DATA) % PART, len(DATA) - 1)
+    assert len(ranged["ranges"]) == -(-len(DATA) // PART)
+    assert 1 < ranged["peak"] <= 3
+
+
+def test_ranged_download_rejects_md5_mismatch(ranged, tmp_path):
+    with pytest.raises(IOError, match="md5 mismatch"):
+        google_drive.download_file_to_path("f1", str(tmp_path / "v.mp4"), size=len(DATA), md5_checksum="0" * 32)
+
+
+def test_short_range_read_fails_the_download(ranged, monkeypatch, tmp_path):
+    monkeypatch.setattr(google_drive, "read_file_range", lambda fid, start, end: DATA[start:end])
+    with pytest.raises(IOError, match="Short range read"):
+        google_drive.download_file_to_path("f1", str(tmp_path / "v.mp4"), size=len(DATA))
+
+
+def test_range_executor_is_shared():
+    assert google_drive._get_range_executor() is google_drive._get_range_executor()
+
+
+class _HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+class _MediaRequest:
+    def __init__(self, outcomes):
+        self.outcomes, self.headers = outcomes, {}
+
+    def execute(self):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def media(monkeypatch):
+    outcomes = []
+    service = type("Service", (), {
+        "files": lambda self: self,
+        "get_media": lambda self, fileId: _MediaRequest(outcomes),
+    })()
+    monkeypatch.setattr(google_drive, "get_drive_service", lambda: service)
+    monkeypatch.setattr(google_drive.time, "sleep", lambda s: None)
+    return outcomes
+
+
+def test_read_file_range_retries_server_errors(media):
+    media.extend([_HttpError(503), DATA[:10]])
+    assert google_drive.read_file_range("f1", 0, 9) == DATA[:10]
+
+
+def test_read_file_range_gives_up_on_client_errors(media):
+    media.extend([_HttpError(404), DATA[:10]])
+    with pytest.raises(_HttpError):
+        google_drive.read_file_range("f1", 0, 9)
+
+
+def test_read_file_range_trims_an_ignored_range(media):
+    media.append(DATA)
+    assert google_drive.read_file_range("f1", 100, 199) == DATA[100:200]
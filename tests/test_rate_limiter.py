@@ -0,0 +1,66 @@
+import time
+
+import anthropic
+import httpx
+import pytest
+
+from src.services.rate_limiter import (
+    TokenBucket,
+    _is_rate_limited,
+    observe_rate_limit_headers,
+)
+
+
+def _api_error(status: int) -> anthropic.APIStatusError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status, request=request)
+    return anthropic.APIStatusError("error", response=response, body=None)
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_burst_then_paced_at_rate():
+    bucket = TokenBucket(rate=20.0, capacity=2)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    start = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert time.monotonic() - start == pytest.approx(0.1, abs=0.05)
+
+
+def test_pause_blocks_and_empties_bucket():
+    bucket = TokenBucket(rate=100.0, capacity=10)
+    bucket.pause(0.2)
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.2
+
+
+def test_set_rate_ignores_non_positive():
+    bucket = TokenBucket(rate=2.0)
+    bucket.set_rate(0)
+    assert bucket.rate == 2.0
+    bucket.set_rate(5.0)
+    assert bucket.rate == 5.0 and bucket.capacity == 5.0
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (_api_error(429), True),
+    (_api_error(529), True),
+    (_api_error(400), False),
+    (ValueError("boom"), False),
+])
+def test_is_rate_limited(exc, expected):
+    assert _is_rate_limited(exc) is expected
+
+
+def test_headers_lower_rate_but_not_above_ceiling():
+    bucket = TokenBucket(rate=2.0)
+    observe_rate_limit_headers({"anthropic-ratelimit-requests-limit": "60"}, bucket)
+    assert bucket.rate == pytest.approx(1.0)
+    observe_rate_limit_headers({"anthropic-ratelimit-requests-limit": "4000"}, bucket)
+    assert bucket.rate == pytest.approx(2.0)
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.services.video_analyzer import (
+    ADAPTIVE_THRESHOLD_FLOOR,
+    adaptive_threshold,
+    bhattacharyya_distances,
+    dhash,
+    find_scene_boundaries,
+)
+
+
+def test_bhattacharyya_matches_opencv():
+    rng = np.random.default_rng(0)
+    hists = rng.random((20, 3000)).astype(np.float32)
+    hists[5] = hists[4]  # identical pair
+    expected = [
+        cv2.compareHist(hists[i], hists[i + 1], cv2.HISTCMP_BHATTACHARYYA)
+        for i in range(len(hists) - 1)
+    ]
+    got = bhattacharyya_distances(hists)
+    assert got.shape == (19,)
+    np.testing.assert_allclose(got, expected, atol=1e-4)
+    assert got[4] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_bhattacharyya_short_and_empty_inputs():
+    assert len(bhattacharyya_distances(np.zeros((1, 10)))) == 0
+    # all-zero histograms have no overlap to measure: distance 1, not NaN
+    assert bhattacharyya_distances(np.zeros((2, 10)))[0] == pytest.approx(1.0)
+
+
+def test_adaptive_threshold():
+    assert adaptive_threshold(np.array([]), base=0.4) == 0.4
+    # a quiet clip never drops below the floor
+    assert adaptive_threshold(np.full(50, 0.01)) == ADAPTIVE_THRESHOLD_FLOOR
+    noisy = np.concatenate([np.full(50, 0.3), np.full(50, 0.5)])
+    assert adaptive_threshold(noisy) > 0.5
+
+
+def test_scene_boundaries_apply_minimum_duration():
+    times = np.arange(1, 21) * 0.5
+    distances = np.zeros(20)
+    distances[[1, 2, 9, 10, 15]] = 0.9  # cuts at 1.0 s (too early), 1.5, 5.0, 5.5, 8.0 s
+    assert find_scene_boundaries(times, distances, threshold=0.4) == [0.0, 5.0, 8.0]
+
+
+def test_dhash_is_stable_and_discriminates():
+    rng = np.random.default_rng(1)
+    frame = rng.integers(0, 256, (90, 160, 3), dtype=np.uint8)
+    noisy = np.clip(frame.astype(np.int16) + rng.integers(-3, 4, frame.shape), 0, 255).astype(np.uint8)
+    other = rng.integers(0, 256, (90, 160, 3), dtype=np.uint8)
+
+    h = dhash(frame)
+    assert 0 <= h < 2 ** 64
+    assert dhash(frame) == h
+    assert bin(h ^ dhash(noisy)).count("1") <= 6
+    assert bin(h ^ dhash(other)).count("1") > 6
+    # horizontal gradient: every pixel brighter than its left neighbour
+    ramp = np.tile(np.arange(0, 180, 20, dtype=np.uint8), (8, 1))
+    assert dhash(ramp) == 2 ** 64 - 1
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.services import video_probe
+
+
+@pytest.fixture(autouse=True)
+def clean_memo(monkeypatch):
+    monkeypatch.setattr(video_probe, "_probe_memo", {})
+    monkeypatch.setattr(video_probe, "_load_persisted_probe", lambda md5: None)
+
+
+@pytest.fixture
+def count_probes(monkeypatch):
+    calls = []
+
+    def _probe(data):
+        calls.append(data)
+        return {"duration_seconds": 3.0, "fps": 10.0, "probe": "fake"}
+
+    monkeypatch.setattr(video_probe, "_probe_bytes", _probe)
+    return calls
+
+
+def test_same_bytes_probed_once(count_probes):
+    first = video_probe.probe_video(b"clip")
+    second = video_probe.probe_video(b"clip")
+
+    assert len(count_probes) == 1
+    assert first == second and first["md5"] == video_probe.content_md5(b"clip")
+    second["fps"] = 0  # callers get copies, not the memo entry
+    assert video_probe.probe_video(b"clip")["fps"] == 10.0
+
+
+def test_persisted_probe_skips_probing(monkeypatch, count_probes):
+    monkeypatch.setattr(video_probe, "_load_persisted_probe",
+                        lambda md5: {"duration_seconds": 7.5, "probe": "ffprobe"})
+    assert video_probe.probe_video(b"known")["duration_seconds"] == 7.5
+    assert count_probes == []
+
+
+def test_memo_is_bounded(monkeypatch, count_probes):
+    monkeypatch.setattr(video_probe, "_MEMO_MAX", 2)
+    for data in (b"a", b"b", b"c"):
+        video_probe.probe_video(data)
+    assert set(video_probe._probe_memo) == {video_probe.content_md5(b) for b in (b"b", b"c")}
+
+
+def test_probe_file_reads_headers(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 90))
+    for _ in range(30):
+        writer.write(np.zeros((90, 160, 3), dtype=np.uint8))
+    writer.release()
+
+    probe = video_probe.probe_file(path)
+
+    assert (probe["width"], probe["height"]) == (160, 90)
+    assert probe["fps"] == pytest.approx(10.0)
+    assert probe["duration_seconds"] == pytest.approx(3.0, abs=0.1)
+    assert probe["aspect_ratio"] == "16:9"
@@ -0,0 +1,56 @@
+import asyncio
+
+from src.models import VisionAnalysis
+from src.services import video_analyzer, vision_analyzer
+from src.services.fake_batch_api import fake_analysis
+
+
+def _prepared(n_scenes: int) -> dict:
+    scenes = [(i * 10.0, i * 10.0 + 2.0 + i) for i in range(n_scenes)]  # scene i lasts 2+i s
+    return {
+        "meta": {"duration_seconds": n_scenes * 10.0, "aspect_ratio": "16:9"},
+        "scenes": scenes,
+        "frames": [[f"frame-{i}"] for i in range(n_scenes)],
+        "dropped": [0] * n_scenes,
+    }
+
+
+def test_scenes_run_concurrently_and_come_back_in_order(monkeypatch):
+    in_flight = peak = 0
+
+    async def _fake(frames, context, *args):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        scene = int(frames[0].split("-")[1])
+        await asyncio.sleep(0.05 * (6 - scene))  # later scenes finish first
+        in_flight -= 1
+        if scene == 5:
+            raise RuntimeError("scene failed")
+        return VisionAnalysis(**fake_analysis(f"scene-{scene}"))
+
+    monkeypatch.setattr(vision_analyzer, "analyze_frames_async", _fake)
+
+    result = video_analyzer.analyze_prepared_video(_prepared(6), "clip.mp4", max_concurrency=3)
+
+    assert peak == 3
+    assert [s["scene_index"] for s in result["scenes"]] == list(range(6))
+    assert result["scenes"][5]["error"] == "scene failed"
+    # dominant = longest scene that did not fail
+    assert result["description_en"] == fake_analysis("scene-4")["description_en"]
+    assert result["analysis_raw"]["keyframes_dropped"] == 0
+
+
+def test_scene_context_labels_each_request(monkeypatch):
+    contexts = []
+
+    async def _fake(frames, context, *args):
+        contexts.append(context)
+        return VisionAnalysis(**fake_analysis("x"))
+
+    monkeypatch.setattr(vision_analyzer, "analyze_frames_async", _fake)
+    video_analyzer.analyze_prepared_video(_prepared(2), "clip.mp4")
+
+    assert len(contexts) == 2
+    assert all("clip.mp4" in c for c in contexts)
+    assert len(set(contexts)) == 2
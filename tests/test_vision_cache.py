@@ -0,0 +1,35 @@
+from src.services.vision_cache import VisionCache, cache_key
+
+
+def test_key_depends_on_payload_prompt_and_model():
+    base = cache_key(["aW1n"], "prompt", "model-a")
+    assert cache_key(["aW1n"], "prompt", "model-a") == base
+    assert cache_key(["b3RoZXI="], "prompt", "model-a") != base
+    assert cache_key(["aW1n"], "other prompt", "model-a") != base
+    assert cache_key(["aW1n"], "prompt", "model-b") != base
+    # payload boundaries matter: ["ab", "c"] is not ["a", "bc"]
+    assert cache_key(["ab", "c"], "p", "m") != cache_key(["a", "bc"], "p", "m")
+
+
+def test_get_put_and_stats(tmp_path):
+    cache = VisionCache(tmp_path / "cache.sqlite3")
+    assert cache.get("k") is None
+    cache.put("k", {"category": "room"}, "model-a")
+    assert cache.get("k") == {"category": "room"}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    clock = iter(range(100, 200))
+    monkeypatch.setattr("src.services.vision_cache.time.time", lambda: next(clock))
+    cache = VisionCache(tmp_path / "cache.sqlite3", max_entries=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")  # b is now least recently used
+    cache.put("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.get("c") == {"n": 3}
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import vision_analyzer
+from src.services.fake_batch_api import fake_analysis
+
+
+class _FakeRaw:
+    headers = {}
+
+    def __init__(self, params):
+        self.params = params
+
+    def parse(self):
+        usage = SimpleNamespace(input_tokens=1000, output_tokens=100,
+                                cache_read_input_tokens=500, cache_creation_input_tokens=0)
+        text = json.dumps(fake_analysis("x"))
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=usage, model=self.params["model"])
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    calls, requests = [], []
+
+    def _call(fn, **params):
+        requests.append(params)
+        return _FakeRaw(params)
+
+    monkeypatch.setattr(vision_analyzer, "call_with_rate_limit", _call)
+    monkeypatch.setattr(vision_analyzer, "log_cost", lambda *a, **kw: calls.append((a, kw)))
+    return calls, requests
+
+
+def test_analyze_image_logs_usage_with_cache_tokens(logged):
+    calls, requests = logged
+    vision_analyzer.analyze_image("aW1n", use_cache=False)
+
+    [(args, kwargs)] = calls
+    assert args[:2] == ("claude", "vision_analyze_image")
+    assert kwargs["cache_read_tokens"] == 500 and kwargs["input_tokens"] == 1000
+    # 1000 in + 500 cached reads at 10% + 100 out, at $3 / $15 per MTok
+    assert args[2] == pytest.approx((1000 + 50) * 3 / 1e6 + 100 * 15 / 1e6)
+    assert requests[0]["system"] == vision_analyzer.SYSTEM_PROMPT
+
+
+def test_cache_hits_log_nothing(logged, tmp_path, monkeypatch):
+    from src.services.vision_cache import VisionCache
+
+    calls, _ = logged
+    cache = VisionCache(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(vision_analyzer, "get_vision_cache", lambda: cache)
+    vision_analyzer.analyze_frames(["Zg=="], context="scene 1")
+    vision_analyzer.analyze_frames(["Zg=="], context="scene 1")
+    assert [a[1] for a, _ in calls] == ["vision_analyze_frames"]